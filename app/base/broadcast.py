@@ -0,0 +1,37 @@
+import asyncio
+from typing import Any
+
+
+class Broadcast:
+    """Рассылка событий всем подписчикам через их очереди.
+
+    Подписчик, который не успевает разбирать очередь, отключается, чтобы
+    медленный клиент не копил события в памяти.
+    """
+
+    def __init__(self, max_queue: int = 1000) -> None:
+        self.max_queue = max_queue
+        self._queues: set[asyncio.Queue] = set()
+
+    def __len__(self) -> int:
+        return len(self._queues)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(self.max_queue)
+        self._queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._queues.discard(queue)
+
+    def publish(self, event: Any) -> None:
+        for queue in list(self._queues):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._queues.discard(queue)
+                # Недоставленные события отбрасываются: подписчик сразу
+                # получает None — знак отключения.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
@@ -0,0 +1,81 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class BatchLoader:
+    """Склеивает загрузки по ключу, запрошенные за один проход цикла событий.
+
+    Все ключи, запрошенные до следующей итерации цикла, загружаются одним
+    вызовом load_many, повторные ключи — один раз.
+    """
+
+    def __init__(
+        self,
+        load_many: Callable[[list[Hashable]], Awaitable[dict[Hashable, Any]]],
+    ) -> None:
+        self._load_many = load_many
+        self._pending: dict[Hashable, asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.loads = 0
+        self.batches = 0
+
+    async def load(self, key: Hashable) -> Any | None:
+        self.loads += 1
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                loop.call_soon(self._dispatch)
+            future = loop.create_future()
+            self._pending[key] = future
+        # Отмена одного ожидающего не должна отменять загрузку для всех.
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        batch, self._pending = self._pending, {}
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[Hashable, asyncio.Future]) -> None:
+        self.batches += 1
+        try:
+            result = await self._load_many(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(result.get(key))
+
+
+class SingleFlight:
+    """Не более одной выполняющейся операции на ключ.
+
+    Вызовы с ключом, по которому операция уже идёт, дожидаются её
+    результата вместо повторного запуска.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    def running(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def run(
+        self, key: Hashable, operation: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(operation())
+            self._calls[key] = call
+            call.add_done_callback(lambda _: self._forget(key, call))
+        return await asyncio.shield(call)
+
+    def _forget(self, key: Hashable, call: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -0,0 +1,83 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from typing import Any, NamedTuple
+
+from marshmallow import ValidationError, fields
+from sqlalchemy import ColumnElement, Select, tuple_
+
+
+class Page(NamedTuple):
+    items: list
+    # Ключ последней строки страницы, если за ней есть ещё строки.
+    next_key: list | None
+
+
+def encode_cursor(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> dict:
+    padded = token + "=" * (-len(token) % 4)
+    data = json.loads(base64.urlsafe_b64decode(padded))
+    if not isinstance(data, dict):
+        raise ValueError("cursor is not an object")
+    return data
+
+
+class Cursor(fields.Field):
+    """Непрозрачный курсор страницы в строке запроса."""
+
+    def _serialize(self, value: Any, attr, obj, **kwargs) -> str | None:
+        return None if value is None else encode_cursor(value)
+
+    def _deserialize(self, value: Any, attr, data, **kwargs) -> dict:
+        try:
+            return decode_cursor(value)
+        except (ValueError, binascii.Error) as e:
+            raise ValidationError("Invalid cursor.") from e
+
+
+def keyset(
+    request: Select,
+    columns: Sequence[ColumnElement],
+    *,
+    after: Sequence | None,
+    limit: int,
+    desc: bool,
+) -> Select:
+    """Страница после ключа after в порядке columns.
+
+    Последняя колонка должна быть уникальной, чтобы порядок был
+    однозначным. Выбирается на строку больше limit — по ней видно,
+    есть ли следующая страница.
+    """
+    if after is not None:
+        key, bound = tuple_(*columns), tuple_(*after)
+        request = request.where(key < bound if desc else key > bound)
+    order = [column.desc() for column in columns] if desc else columns
+    return request.order_by(*order).limit(limit + 1)
+
+
+def make_page(rows: Sequence, keys: Sequence[str], limit: int) -> Page:
+    items = list(rows[:limit])
+    if len(rows) <= limit:
+        return Page(items, None)
+    return Page(items, [getattr(items[-1], key) for key in keys])
+
+
+def cursor_key(cursor: dict | None, sort: str, size: int) -> list | None:
+    """Ключ из курсора, выданного для того же порядка сортировки."""
+    if cursor is None:
+        return None
+    key = cursor.get("key")
+    if (
+        cursor.get("sort") != sort
+        or not isinstance(key, list)
+        or len(key) != size
+        or not all(isinstance(value, int) for value in key)
+    ):
+        raise ValueError("cursor does not match the query")
+    return key
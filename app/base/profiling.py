@@ -0,0 +1,241 @@
+import asyncio
+import sys
+import threading
+import time
+import tracemalloc
+import typing
+from collections import Counter, deque
+from collections.abc import Callable
+from logging import Logger
+from types import (
+    BuiltinFunctionType,
+    FrameType,
+    FunctionType,
+    MethodType,
+    ModuleType,
+)
+
+if typing.TYPE_CHECKING:
+    from app.web.app import Application
+
+# Объекты, в которые подсчёт размера не спускается: через них достижимо
+# почти всё приложение.
+OPAQUE = (
+    type,
+    ModuleType,
+    FunctionType,
+    BuiltinFunctionType,
+    MethodType,
+    FrameType,
+    Logger,
+    asyncio.AbstractEventLoop,
+    asyncio.Future,
+)
+# Служебное состояние ORM-объектов ссылается на сессию и мапперы.
+SKIP_ATTRIBUTES = ("_sa_instance_state",)
+# Объектов за один проход подсчёта размера, между проходами работает цикл.
+SIZE_CHUNK = 1_000
+
+
+def frame_name(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+def collapse(frame: FrameType | None) -> str:
+    """Стек в свёрнутом виде для flamegraph: от корня, через `;`."""
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Статистический профилировщик потока цикла событий.
+
+    Пока включён, отдельный поток раз в interval снимает стек потока
+    цикла. Выключенный профилировщик не имеет ни потока, ни хуков.
+    """
+
+    def __init__(self) -> None:
+        self.stacks: Counter[str] = Counter()
+        self.started_at: float | None = None
+        self.duration = 0.0
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float, max_duration: float) -> None:
+        if self.running:
+            raise RuntimeError("profiler is already running")
+        self.stacks = Counter()
+        self.started_at = time.monotonic()
+        self.duration = 0.0
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._sample,
+            args=(threading.get_ident(), interval, max_duration),
+            name="sampling-profiler",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Останавливает сбор и отдаёт стеки: `стек число` на строку."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+    def _sample(self, thread_id: int, interval: float, max_duration: float):
+        deadline = self.started_at + max_duration
+        while not self._stop.wait(interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                self.stacks[collapse(frame)] += 1
+            # Забытый профилировщик останавливается сам.
+            if time.monotonic() >= deadline:
+                break
+        self.duration = time.monotonic() - self.started_at
+
+
+class SizeWalk:
+    """Обход объекта и всего, что в нём лежит, который можно вести частями.
+
+    Общие для нескольких владельцев объекты учитываются у каждого.
+    """
+
+    def __init__(self, root: object) -> None:
+        self.size = self.objects = 0
+        self._seen: set[int] = set()
+        self._stack = [root]
+
+    @property
+    def done(self) -> bool:
+        return not self._stack
+
+    def step(self, budget: int) -> None:
+        """Учитывает не больше budget объектов."""
+        stack, seen = self._stack, self._seen
+        last = self.objects + budget
+        while stack and self.objects < last:
+            obj = stack.pop()
+            if id(obj) in seen or isinstance(obj, OPAQUE):
+                continue
+            seen.add(id(obj))
+            self.size += sys.getsizeof(obj)
+            self.objects += 1
+            if isinstance(obj, dict):
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, list | tuple | set | frozenset | deque):
+                stack.extend(obj)
+            elif (attributes := getattr(obj, "__dict__", None)) is not None:
+                self.size += sys.getsizeof(attributes)
+                stack.extend(
+                    value
+                    for name, value in attributes.items()
+                    if name not in SKIP_ATTRIBUTES
+                )
+
+
+def deep_sizeof(root: object) -> tuple[int, int]:
+    """Размер объекта вместе со всем, что в нём лежит, и число объектов."""
+    walk = SizeWalk(root)
+    while not walk.done:
+        walk.step(SIZE_CHUNK)
+    return walk.size, walk.objects
+
+
+class MemoryProfiler:
+    """Снимки tracemalloc с разницей между соседними снимками и размеры
+    зарегистрированных структур приложения.
+
+    tracemalloc включается только на время профилирования.
+    """
+
+    def __init__(self) -> None:
+        self.owners: dict[str, Callable[[], object]] = {}
+        self._snapshot: tracemalloc.Snapshot | None = None
+
+    def track(self, name: str, get: Callable[[], object]) -> None:
+        """Структура, чей размер показывается в отчёте под именем name."""
+        self.owners[name] = get
+
+    @property
+    def running(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._snapshot = self._take()
+
+    def stop(self) -> None:
+        self._snapshot = None
+        tracemalloc.stop()
+
+    @staticmethod
+    def _take() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(
+                    inclusive=False, filename_pattern=tracemalloc.__file__
+                ),
+                tracemalloc.Filter(
+                    inclusive=False, filename_pattern="<frozen importlib._*>"
+                ),
+            )
+        )
+
+    async def sizes(self, max_objects: int) -> dict[str, dict]:
+        """Размеры структур; обход отдаёт управление циклу событий.
+
+        Структуры меняются во время обхода, поэтому размер приблизительный.
+        Обход структуры останавливается на max_objects объектах — такой
+        размер помечен truncated.
+        """
+        result = {}
+        for name, get in self.owners.items():
+            walk = SizeWalk(get())
+            while not walk.done and walk.objects < max_objects:
+                walk.step(min(SIZE_CHUNK, max_objects - walk.objects))
+                await asyncio.sleep(0)
+            result[name] = {
+                "size": walk.size,
+                "objects": walk.objects,
+                "truncated": not walk.done,
+            }
+        return result
+
+    def diff(self, top: int) -> list[dict]:
+        """Места выделения памяти с наибольшим ростом с прошлого снимка."""
+        snapshot = self._take()
+        previous, self._snapshot = self._snapshot, snapshot
+        stats = snapshot.compare_to(previous, "traceback")
+        return [
+            {
+                "size": stat.size,
+                "size_diff": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff,
+                "traceback": [
+                    f"{frame.filename}:{frame.lineno}"
+                    for frame in stat.traceback
+                ],
+            }
+            for stat in stats[:top]
+        ]
+
+
+def setup_profiling(app: "Application") -> None:
+    app.cpu_profiler = SamplingProfiler()
+    app.memory_profiler = MemoryProfiler()
+    app.memory_profiler.track("trace_spans", lambda: app.tracer.spans)
@@ -0,0 +1,157 @@
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+import typing
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+from typing import NamedTuple
+
+if typing.TYPE_CHECKING:
+    from app.web.app import Application
+
+FORMATS = ("json", "chrome")
+
+
+class Span(NamedTuple):
+    trace_id: int
+    span_id: int
+    parent_id: int | None
+    name: str
+    # Секунды по time.perf_counter.
+    start: float
+    duration: float
+
+
+# Трасса и открытый в ней спан; None — текущая задача не трассируется.
+_current: ContextVar[tuple[int, int] | None] = ContextVar("trace", default=None)
+
+
+def untraced_context() -> Context:
+    """Контекст для долгих фоновых задач, запущенных из обработчика.
+
+    Иначе их спаны попадали бы в трассу обновления, создавшего задачу.
+    """
+    context = copy_context()
+    context.run(_current.set, None)
+    return context
+
+
+class Tracer:
+    """Спаны выбранных трасс в кольцевом буфере.
+
+    Решение о записи принимается один раз на трассу. Вне трассы спан —
+    одно чтение ContextVar.
+    """
+
+    def __init__(self, sample_rate: float, size: int) -> None:
+        self.sample_rate = sample_rate
+        self.spans: deque[Span] = deque(maxlen=size)
+        self._ids = itertools.count(1)
+
+    @contextmanager
+    def trace(self, name: str) -> Iterator[int | None]:
+        """Корневой спан трассы; отдаёт номер трассы или None."""
+        if random.random() >= self.sample_rate:
+            token = _current.set(None)
+            try:
+                yield None
+            finally:
+                _current.reset(token)
+            return
+
+        trace_id = next(self._ids)
+        with self._span(trace_id, None, name):
+            yield trace_id
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        current = _current.get()
+        if current is None:
+            yield
+            return
+        with self._span(current[0], current[1], name):
+            yield
+
+    def record(self, name: str, start: float, duration: float) -> None:
+        """Спан, время которого уже измерено, например в событиях движка."""
+        current = _current.get()
+        if current is not None:
+            self.spans.append(
+                Span(
+                    current[0],
+                    next(self._ids),
+                    current[1],
+                    name,
+                    start,
+                    duration,
+                )
+            )
+
+    @contextmanager
+    def _span(
+        self, trace_id: int, parent_id: int | None, name: str
+    ) -> Iterator[None]:
+        span_id = next(self._ids)
+        token = _current.set((trace_id, span_id))
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            _current.reset(token)
+            self.spans.append(
+                Span(trace_id, span_id, parent_id, name, start, duration)
+            )
+
+    def export(self, fmt: str) -> dict | list:
+        """Спаны буфера списком или в формате Chrome trace (about:tracing).
+
+        В Chrome trace каждая трасса — отдельная строка (tid).
+        """
+        spans = list(self.spans)
+        if fmt == "json":
+            return [span._asdict() for span in spans]
+
+        pid = os.getpid()
+        return {
+            "displayTimeUnit": "ms",
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "cat": span.name.split()[0],
+                    "ph": "X",
+                    "ts": span.start * 1_000_000,
+                    "dur": span.duration * 1_000_000,
+                    "pid": pid,
+                    "tid": span.trace_id,
+                    "args": {
+                        "span_id": span.span_id,
+                        "parent_id": span.parent_id,
+                    },
+                }
+                for span in spans
+            ],
+        }
+
+    def write(self, path: str, fmt: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.export(fmt), f)
+
+
+def setup_tracing(app: "Application") -> None:
+    config = app.config.tracing
+    app.tracer = Tracer(sample_rate=config.sample_rate, size=config.buffer_size)
+
+    if config.export_path:
+
+        async def write_traces(_: "Application") -> None:
+            await asyncio.to_thread(
+                app.tracer.write, config.export_path, config.export_format
+            )
+
+        app.on_cleanup.append(write_traces)
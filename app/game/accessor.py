@@ -1,50 +1,188 @@
 import random
+import time
+from collections.abc import AsyncIterator
+from typing import NamedTuple
 
-from sqlalchemy import func, insert, select, update
+from sqlalchemy import (
+    BigInteger,
+    String,
+    any_,
+    bindparam,
+    column,
+    func,
+    select,
+    text,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import DBAPIError
 
 from app.base.base_accessor import BaseAccessor
+from app.base.coalesce import SingleFlight
+from app.base.pagination import Page, keyset, make_page
+from app.game.archiver import ALL_GAMES
+from app.game.fast_path import GameFastPath
+from app.game.importer import QuestionRow, RowError
 from app.game.models import GameModel, GameState, PlayerModel, QuestionModel
+from app.store.database.query_stats import timed_query
 from app.users.models import UserModel
 
+# Запросы горячего пути строятся один раз: SQLAlchemy не пересобирает
+# конструкцию и ключ кэша, а asyncpg переиспользует подготовленный запрос.
+ACTIVE_GAMES = select(GameModel).where(GameModel.game_state == GameState.ACTIVE)
+GAME_BY_ID = select(GameModel).where(GameModel.id == bindparam("game_id"))
+QUESTION_BY_ID = select(QuestionModel).where(
+    QuestionModel.id == bindparam("question_id")
+)
+PLAYERS_BY_GAME = (
+    select(PlayerModel, UserModel)
+    .join(UserModel, PlayerModel.user_id == UserModel.id)
+    .where(
+        PlayerModel.in_game.is_(True),
+        PlayerModel.game_id == bindparam("game_id"),
+    )
+)
+QUESTION_IDS = select(QuestionModel.id)
+# Импорты не должны пересекаться, иначе оба пропустят один и тот же ответ.
+LOCK_QUESTIONS = text("LOCK TABLE questions IN SHARE ROW EXCLUSIVE MODE")
+EXISTING_ANSWERS = select(func.lower(QuestionModel.answer)).where(
+    func.lower(QuestionModel.answer)
+    == any_(bindparam("answers", type_=ARRAY(String)))
+)
+ROUND_BY_GAME = (
+    select(
+        GameModel.id,
+        QuestionModel.text,
+        QuestionModel.answer,
+        PlayerModel.id,
+        PlayerModel.user_id,
+        PlayerModel.points,
+        UserModel.username,
+    )
+    .join(QuestionModel, GameModel.question_id == QuestionModel.id)
+    .outerjoin(
+        PlayerModel,
+        (PlayerModel.game_id == GameModel.id) & PlayerModel.in_game.is_(True),
+    )
+    .outerjoin(UserModel, PlayerModel.user_id == UserModel.id)
+    .where(
+        GameModel.game_state == GameState.ACTIVE,
+        GameModel.id == bindparam("game_id"),
+    )
+    .order_by(PlayerModel.id)
+)
+
+_games = GameModel.__table__
+_players = PlayerModel.__table__
+UPDATE_WORD_STATE = (
+    update(_games)
+    .where(
+        _games.c.game_state == GameState.ACTIVE,
+        _games.c.id == bindparam("b_id"),
+    )
+    .values(word_state=bindparam("b_word_state"))
+)
+UPDATE_PLAYER_POINTS = (
+    update(_players)
+    .where(_players.c.in_game.is_(True), _players.c.id == bindparam("b_id"))
+    .values(points=bindparam("b_points"))
+)
+UPDATE_NEXT_PLAYER = (
+    update(_players)
+    .where(_players.c.in_game.is_(True), _players.c.id == bindparam("b_id"))
+    .values(next_player_id=bindparam("b_next_player_id"))
+)
+
+EXPORT_BATCH_SIZE = 1000
+SERIALIZATION_FAILURE = "40001"
+QUESTION_IDS_TTL = 60.0
+
+
+class RoundPlayer(NamedTuple):
+    id: int
+    user_id: int
+    points: int
+
+
+class RoundUser(NamedTuple):
+    id: int
+    username: str
+
+
+class GameRound(NamedTuple):
+    """Всё, что нужно для начала раунда: вопрос и игроки по порядку."""
+
+    game_id: int
+    question: str
+    answer: str
+    players: list[tuple[RoundPlayer, RoundUser]]
+
 
 class GameAccessor(BaseAccessor):
+    def __init__(self, app, *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+
+        self._question_ids: list[int] = []
+        self._question_ids_expire_at = 0.0
+        self._question_ids_version = None
+        self.fast_path = GameFastPath(app)
+        # Для игр склеивается только создание: активную игру чата бот
+        # читает из ChatRegistry, пакетная загрузка ей не нужна.
+        self._creating = SingleFlight()
+
+    @property
+    def _fast(self) -> bool:
+        return self.app.config.game.fast_path
+
     async def question_count(self) -> int:
-        request = select(QuestionModel)
-        async with self.app.database.session as session:
-            res = await session.execute(request)
+        return len(await self.get_question_ids())
 
-            return len(res.all())
+    async def get_question_ids(self) -> list[int]:
+        # Вопросы, добавленные другим процессом, меняют версию коллекции.
+        version = self.app.database.versions.get("questions")
+        if (
+            self._question_ids_expire_at <= time.monotonic()
+            or self._question_ids_version != version
+        ):
+            async with self.app.database.session as session:
+                res = await session.execute(QUESTION_IDS)
+                self._question_ids = list(res.scalars().all())
+            self._question_ids_expire_at = time.monotonic() + QUESTION_IDS_TTL
+            self._question_ids_version = version
+        return self._question_ids
 
-    async def create_game(self, chat_id: int) -> None:
-        question_count = await self.question_count()
-        question_id = random.randint(1, question_count)
+    def invalidate_questions(self) -> None:
+        self._question_ids_expire_at = 0.0
 
-        request = insert(GameModel).values(
-            chat_id=chat_id, question_id=question_id
+    async def create_game(self, chat_id: int) -> GameModel:
+        # Одновременные вызовы для одного чата получают одну и ту же игру.
+        return await self._creating.run(
+            chat_id, lambda: self._create_game(chat_id)
         )
-        async with self.app.database.session as session:
-            await session.execute(request)
-            await session.commit()
 
-    async def get_active_game_by_chat_id(
-        self, chat_id: int
-    ) -> GameModel | None:
-        request = select(GameModel).where(
-            GameModel.game_state == GameState.ACTIVE
-            and GameModel.chat_id == chat_id
+    async def _create_game(self, chat_id: int) -> GameModel:
+        question_id = random.choice(await self.get_question_ids())
+
+        request = (
+            insert(GameModel)
+            .values(chat_id=chat_id, question_id=question_id)
+            .returning(GameModel)
         )
         async with self.app.database.session as session:
             res = await session.execute(request)
-            row = res.first()
-            if row is not None:
-                return row[0]
+            game = res.scalar_one()
+            await session.commit()
+        return game
 
-        return None
+    async def list_active_games(self) -> list[GameModel]:
+        async with self.app.database.session as session:
+            res = await session.execute(ACTIVE_GAMES)
+            return list(res.scalars().all())
 
     async def get_game_by_id(self, game_id: int) -> GameModel | None:
-        request = select(GameModel).where(GameModel.id == game_id)
         async with self.app.database.session as session:
-            res = await session.execute(request)
+            res = await session.execute(GAME_BY_ID, {"game_id": game_id})
             row = res.first()
             if row is not None:
                 return row[0]
@@ -55,108 +193,316 @@ class GameAccessor(BaseAccessor):
         request = insert(QuestionModel).values(text=text, answer=answer)
         async with self.app.database.session as session:
             await session.execute(request)
+            await self.app.database.notify_changed(session, "questions")
+            await session.commit()
+        self.invalidate_questions()
+
+    async def import_questions(self, rows: list[QuestionRow]) -> list[RowError]:
+        """Загружает вопросы через COPY в одной транзакции.
+
+        Вопросы с ответом, который уже есть в БД, пропускаются и
+        возвращаются как ошибки строк.
+        """
+        async with self.app.database.session as session:
+            await session.execute(LOCK_QUESTIONS)
+            res = await session.execute(
+                EXISTING_ANSWERS, {"answers": [row.answer for row in rows]}
+            )
+            existing = set(res.scalars())
+            errors = [
+                RowError(row.row, "answer already exists")
+                for row in rows
+                if row.answer in existing
+            ]
+            records = [
+                (row.text, row.answer)
+                for row in rows
+                if row.answer not in existing
+            ]
+            if records:
+                conn = await session.connection()
+                raw = await conn.get_raw_connection()
+                with timed_query():
+                    await raw.driver_connection.copy_records_to_table(
+                        "questions", records=records, columns=["text", "answer"]
+                    )
+                await self.app.database.notify_changed(session, "questions")
             await session.commit()
+        self.invalidate_questions()
+        return errors
 
     async def get_question_by_id(
         self, question_id: int
     ) -> QuestionModel | None:
-        request = select(QuestionModel).where(QuestionModel.id == question_id)
         async with self.app.database.session as session:
-            res = await session.execute(request)
+            res = await session.execute(
+                QUESTION_BY_ID, {"question_id": question_id}
+            )
             row = res.first()
             if row is not None:
                 return row[0]
 
         return None
 
-    async def list_questions(self):
+    async def list_questions(
+        self,
+        *,
+        limit: int = 100,
+        desc: bool = False,
+        after: list | None = None,
+        text: str | None = None,
+    ) -> Page:
         request = select(QuestionModel)
-        async with self.app.database.session as session:
+        if text:
+            request = request.where(
+                QuestionModel.text.icontains(text, autoescape=True)
+            )
+        request = keyset(
+            request, [QuestionModel.id], after=after, limit=limit, desc=desc
+        )
+        async with self.app.database.read_session as session:
             res = await session.execute(request)
-            return res.all()
+            return make_page(res.scalars().all(), ("id",), limit)
+
+    async def iter_questions(
+        self, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[dict]:
+        request = select(QuestionModel.__table__).execution_options(
+            yield_per=batch_size
+        )
+        async with self.app.database.read_session as session:
+            res = await session.stream(request)
+            async for row in res.mappings():
+                yield dict(row)
+
+    async def iter_games(
+        self, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[dict]:
+        request = select(ALL_GAMES).execution_options(yield_per=batch_size)
+        async with self.app.database.read_session as session:
+            res = await session.stream(request)
+            async for row in res.mappings():
+                yield dict(row)
 
     async def create_player(self, user_id: int, game_id: int) -> None:
-        request = insert(PlayerModel).values(user_id=user_id, game_id=game_id)
+        request = (
+            insert(PlayerModel)
+            .values(user_id=user_id, game_id=game_id)
+            .on_conflict_do_nothing()
+        )
         async with self.app.database.session as session:
             await session.execute(request)
             await session.commit()
 
     async def get_players_by_game_id(self, game_id: int):
-        request = (
-            select(PlayerModel, UserModel)
-            .join(UserModel, PlayerModel.user_id == UserModel.id)
-            .where(PlayerModel.game_id == game_id)
-        )
         async with self.app.database.session as session:
-            res = await session.execute(request)
+            res = await session.execute(PLAYERS_BY_GAME, {"game_id": game_id})
 
-            return [
-                [player, user]
-                for player, user in res.all()
-                if player.game_id == game_id
-            ]
+            return [[player, user] for player, user in res.all()]
 
-    async def update_word_state(self, game_id: int, word_state: int) -> None:
+    async def load_round(self, game_id: int) -> GameRound | None:
+        """Загружает игру, вопрос и игроков одним запросом."""
         async with self.app.database.session as session:
-            await session.execute(
-                update(GameModel)
-                .where(GameModel.id == game_id)
-                .values(word_state=word_state)
-            )
-            await session.commit()
+            res = await session.execute(ROUND_BY_GAME, {"game_id": game_id})
+            rows = res.all()
+
+        if not rows:
+            return None
+
+        _, question, answer, *_ = rows[0]
+        return GameRound(
+            game_id=game_id,
+            question=question,
+            answer=answer,
+            players=[
+                (
+                    RoundPlayer(player_id, user_id, points or 0),
+                    RoundUser(user_id, username),
+                )
+                for _, _, _, player_id, user_id, points, username in rows
+                if player_id is not None
+            ],
+        )
+
+    async def update_word_state(self, game_id: int, word_state: int) -> None:
+        await self.apply_game_writes(
+            word_states={game_id: word_state}, player_points={}, next_players={}
+        )
 
     async def update_next_player(
         self, player_id: int, next_player_id: int
     ) -> None:
-        async with self.app.database.session as session:
-            await session.execute(
-                update(PlayerModel)
-                .where(PlayerModel.id == player_id)
-                .values(next_player_id=next_player_id)
-            )
-            await session.commit()
+        await self.apply_game_writes(
+            word_states={},
+            player_points={},
+            next_players={player_id: next_player_id},
+        )
 
     async def update_player_points(self, player_id: int, points: int) -> None:
+        await self.apply_game_writes(
+            word_states={}, player_points={player_id: points}, next_players={}
+        )
+
+    async def end_game(
+        self, game_id: int, winner_id: int | None = None, word_state: int = 0
+    ) -> None:
+        """Закрывает игру без расчёта итогов (используется в бенчмарках)."""
         async with self.app.database.session as session:
             await session.execute(
-                update(PlayerModel)
-                .where(PlayerModel.id == player_id)
-                .values(points=points)
+                update(GameModel)
+                .where(
+                    GameModel.game_state == GameState.ACTIVE,
+                    GameModel.id == game_id,
+                )
+                .values(
+                    game_state=GameState.ENDED,
+                    winner_id=winner_id,
+                    word_state=word_state,
+                    ended_at=func.now(),
+                )
             )
             await session.commit()
 
-    async def update_user_points_and_score(
-        self, user_id: int, points: int, score: int
+    async def apply_game_writes(
+        self,
+        word_states: dict[int, int],
+        player_points: dict[int, int],
+        next_players: dict[int, int],
     ) -> None:
-        async with self.app.database.session as session:
-            await session.execute(
-                update(UserModel)
-                .where(UserModel.id == user_id)
-                .values(points=points, score=score)
+        if self._fast:
+            await self.fast_path.apply_game_writes(
+                word_states, player_points, next_players
             )
-            await session.commit()
+            return
 
-    async def update_player_status(self, player_id: int, in_game: bool) -> None:
         async with self.app.database.session as session:
-            await session.execute(
-                update(PlayerModel)
-                .where(PlayerModel.id == player_id)
-                .values(in_game=in_game)
-            )
+            if word_states:
+                await session.execute(
+                    UPDATE_WORD_STATE,
+                    [
+                        {"b_id": game_id, "b_word_state": word_state}
+                        for game_id, word_state in word_states.items()
+                    ],
+                )
+            if player_points:
+                await session.execute(
+                    UPDATE_PLAYER_POINTS,
+                    [
+                        {"b_id": player_id, "b_points": points}
+                        for player_id, points in player_points.items()
+                    ],
+                )
+            if next_players:
+                await session.execute(
+                    UPDATE_NEXT_PLAYER,
+                    [
+                        {"b_id": player_id, "b_next_player_id": next_id}
+                        for player_id, next_id in next_players.items()
+                    ],
+                )
             await session.commit()
 
-    async def end_game(
-        self, game_id: int, winner_id: int | None = None, word_state: int = 0
-    ) -> None:
+    async def settle_game(
+        self,
+        game_id: int,
+        totals: dict[int, tuple[int, int]],
+        winner_id: int | None = None,
+        word_state: int = 0,
+        turns: int | None = None,
+    ) -> list[UserModel]:
+        """Закрывает игру и начисляет итоги игрокам одной транзакцией.
+
+        totals: user_id -> (прибавка к points, прибавка к score).
+        Игра хотя бы с одним ходом считается сыгранной и попадает
+        в статистику. Возвращает обновлённых пользователей; повторный
+        расчёт уже закрытой игры ничего не меняет и возвращает пустой
+        список.
+        """
+        users = []
         async with self.app.database.session as session:
+            # Игру закрывает только первый расчёт: одновременный второй
+            # ждёт блокировку строки, перепроверяет статус и не находит
+            # активной игры. Ошибка сериализации (при более строгой
+            # изоляции) тоже значит, что игру закрыл другой расчёт.
+            try:
+                res = await session.execute(
+                    update(GameModel)
+                    .where(
+                        GameModel.game_state == GameState.ACTIVE,
+                        GameModel.id == game_id,
+                    )
+                    .values(
+                        game_state=GameState.ENDED,
+                        winner_id=winner_id,
+                        word_state=word_state,
+                        ended_at=func.now(),
+                        turns=turns or 0,
+                    )
+                    .returning(
+                        GameModel.chat_id,
+                        GameModel.question_id,
+                        GameModel.created_at,
+                        GameModel.ended_at,
+                    )
+                )
+            except DBAPIError as error:
+                if (
+                    getattr(error.orig, "sqlstate", None)
+                    != SERIALIZATION_FAILURE
+                ):
+                    raise
+                return users
+            game = res.one_or_none()
+            if game is None:
+                return users
             await session.execute(
-                update(GameModel)
-                .where(GameModel.id == game_id)
-                .values(
-                    game_state=GameState.ENDED,
-                    winner_id=winner_id,
-                    word_state=word_state,
-                    ended_at=func.now(),
+                update(PlayerModel)
+                .where(
+                    PlayerModel.in_game.is_(True),
+                    PlayerModel.game_id == game_id,
                 )
+                .values(in_game=False)
+                .execution_options(synchronize_session=False)
             )
+            if totals:
+                settlement = values(
+                    column("user_id", BigInteger),
+                    column("points", BigInteger),
+                    column("score", BigInteger),
+                    name="settlement",
+                ).data(
+                    [
+                        (user_id, points, score)
+                        for user_id, (points, score) in totals.items()
+                    ]
+                )
+                res = await session.execute(
+                    update(UserModel)
+                    .where(UserModel.id == settlement.c.user_id)
+                    .values(
+                        points=UserModel.points + settlement.c.points,
+                        score=UserModel.score + settlement.c.score,
+                    )
+                    .returning(UserModel)
+                    .execution_options(synchronize_session=False)
+                )
+                users = res.scalars().all()
+                await self.app.database.notify_changed(session, "users")
+            # Сыгранная игра — хотя бы один ход; пересчёт статистики
+            # отбирает игры по тому же признаку (turns > 0).
+            if turns:
+                await self.app.store.stats.record_game(
+                    session,
+                    game_id=game_id,
+                    chat_id=game.chat_id,
+                    question_id=game.question_id,
+                    created_at=game.created_at,
+                    ended_at=game.ended_at,
+                    winner_id=winner_id,
+                    turns=turns,
+                    user_ids=list(totals),
+                )
             await session.commit()
+
+        self.app.store.users.remember_users(users)
+        return users
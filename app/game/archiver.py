@@ -0,0 +1,291 @@
+import asyncio
+import re
+import typing
+from contextlib import suppress
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import (
+    BigInteger,
+    any_,
+    bindparam,
+    delete,
+    func,
+    insert,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.base.base_accessor import BaseAccessor
+from app.game.models import (
+    GameHistoryModel,
+    GameModel,
+    GameState,
+    PlayerHistoryModel,
+    PlayerModel,
+)
+
+if typing.TYPE_CHECKING:
+    from app.web.app import Application
+
+# Таблицы истории и столбец, по месяцам которого они секционированы.
+HISTORY_PARENTS = {
+    "games_history": "created_at",
+    "players_history": "game_created_at",
+}
+ARCHIVE_SCHEMA = "archive"
+
+_PARTITION_RE = re.compile(
+    r"^(?P<parent>\w+)_y(?P<year>\d{4})m(?P<month>\d{2})$"
+)
+
+_games = GameModel.__table__
+_players = PlayerModel.__table__
+_games_history = GameHistoryModel.__table__
+_players_history = PlayerHistoryModel.__table__
+_ids = bindparam("ids", type_=ARRAY(BigInteger))
+# Месяц игры; у старых игр created_at мог остаться пустым.
+_game_month = func.coalesce(_games.c.created_at, _games.c.ended_at)
+
+# Все игры и игроки: живые таблицы вместе с перенесённой историей.
+ALL_GAMES = union_all(
+    select(*_games.c),
+    select(*(_games_history.c[column.name] for column in _games.c)),
+).subquery("all_games")
+ALL_PLAYERS = union_all(
+    select(*_players.c),
+    select(*(_players_history.c[column.name] for column in _players.c)),
+).subquery("all_players")
+
+# Игры, завершённые раньше cutoff; занятые другой транзакцией пропускаем.
+ENDED_GAMES = (
+    select(_games.c.id)
+    .where(
+        _games.c.game_state == GameState.ENDED,
+        _games.c.ended_at < bindparam("cutoff"),
+    )
+    .order_by(_games.c.id)
+    .limit(bindparam("limit"))
+    .with_for_update(skip_locked=True)
+)
+COPY_PLAYERS = insert(_players_history).from_select(
+    [column.name for column in _players_history.c],
+    select(*_players.c, _game_month)
+    .join_from(_players, _games, _games.c.id == _players.c.game_id)
+    .where(_games.c.id == any_(_ids)),
+)
+COPY_GAMES = insert(_games_history).from_select(
+    [column.name for column in _games_history.c],
+    select(
+        *(
+            _game_month if column.name == "created_at" else column
+            for column in _games.c
+        )
+    ).where(_games.c.id == any_(_ids)),
+)
+DELETE_PLAYERS = delete(_players).where(_players.c.game_id == any_(_ids))
+DELETE_GAMES = delete(_games).where(_games.c.id == any_(_ids))
+MOVE_STATEMENTS = (COPY_PLAYERS, COPY_GAMES, DELETE_PLAYERS, DELETE_GAMES)
+
+LIST_PARTITIONS = text(
+    "SELECT child.relname FROM pg_inherits "
+    "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+    "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+    "WHERE parent.relname = ANY(:parents)"
+)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(parent: str, month: date) -> str:
+    return f"{parent}_y{month:%Y}m{month:%m}"
+
+
+def default_partition(parent: str) -> str:
+    return f"{parent}_default"
+
+
+def parse_partition(name: str) -> tuple[str, date] | None:
+    match = _PARTITION_RE.match(name)
+    if match is None:
+        return None
+    return match["parent"], date(int(match["year"]), int(match["month"]), 1)
+
+
+def default_months(parent: str):
+    """Месяцы строк, попавших в секцию по умолчанию."""
+    key = HISTORY_PARENTS[parent]
+    return text(
+        f"SELECT DISTINCT date_trunc('month', {key} AT TIME ZONE 'UTC') "
+        f"FROM {default_partition(parent)}"
+    )
+
+
+def create_partition(parent: str, month: date) -> list:
+    """Создаёт месячную секцию, забирая её строки из секции по умолчанию.
+
+    CREATE TABLE ... PARTITION OF не проходит, если такие строки уже
+    лежат в секции по умолчанию, поэтому секция собирается отдельно
+    и присоединяется.
+    """
+    name = partition_name(parent, month)
+    key = HISTORY_PARENTS[parent]
+    start, stop = f"{month}+00", f"{add_months(month, 1)}+00"
+    return [
+        text(
+            f"CREATE TABLE {name} (LIKE {parent} "
+            f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ),
+        text(
+            f"WITH moved AS (DELETE FROM {default_partition(parent)} "
+            f"WHERE {key} >= '{start}' AND {key} < '{stop}' RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        text(
+            f"ALTER TABLE {parent} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start}') TO ('{stop}')"
+        ),
+    ]
+
+
+class GameArchiver(BaseAccessor):
+    """Переносит завершённые игры в историю и обслуживает её секции.
+
+    Расчёт игры меняет строку в games на месте; архиватор позже
+    переносит завершённые игры вместе с игроками в games_history и
+    players_history пачками. Секции истории создаются заранее на
+    несколько месяцев вперёд, а секции старше archive_after_months
+    отцепляются (или удаляются) целиком.
+    """
+
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+
+        self._task: asyncio.Task | None = None
+
+    async def connect(self, app: "Application") -> None:
+        self._task = asyncio.create_task(self._run_periodically())
+
+    async def disconnect(self, app: "Application") -> None:
+        if self._task:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+
+    async def move_ended(self, cutoff: datetime) -> int:
+        """Переносит игры, завершённые раньше cutoff. Возвращает их число.
+
+        Каждая пачка переносится своей транзакцией.
+        """
+        limit = self.app.config.game.archive_batch_size
+        moved = 0
+        while True:
+            async with self.app.database.session as session:
+                res = await session.execute(
+                    ENDED_GAMES, {"cutoff": cutoff, "limit": limit}
+                )
+                ids = list(res.scalars().all())
+                if ids:
+                    for statement in MOVE_STATEMENTS:
+                        await session.execute(statement, {"ids": ids})
+                    await session.commit()
+            moved += len(ids)
+            if len(ids) < limit:
+                return moved
+
+    async def list_partitions(self) -> list[tuple[str, str, date]]:
+        """Месячные секции истории: (родитель, секция, месяц)."""
+        async with self.app.database.session as session:
+            res = await session.execute(
+                LIST_PARTITIONS, {"parents": list(HISTORY_PARENTS)}
+            )
+            names = res.scalars().all()
+
+        partitions = []
+        for name in names:
+            parsed = parse_partition(name)
+            if parsed is not None and parsed[0] in HISTORY_PARENTS:
+                partitions.append((parsed[0], name, parsed[1]))
+        return sorted(partitions)
+
+    async def ensure_partitions(self, months: list[date]) -> list[str]:
+        """Создаёт секции на months и на месяцы строк из секций по
+        умолчанию. Возвращает имена созданных секций.
+        """
+        existing = {name for _, name, _ in await self.list_partitions()}
+        created = []
+        async with self.app.database.session as session:
+            for parent in HISTORY_PARENTS:
+                res = await session.execute(default_months(parent))
+                needed = set(months)
+                needed.update(month.date() for month in res.scalars().all())
+                for month in sorted(needed):
+                    name = partition_name(parent, month)
+                    if name in existing:
+                        continue
+                    for statement in create_partition(parent, month):
+                        await session.execute(statement)
+                    created.append(name)
+            await session.commit()
+
+        if created:
+            self.logger.info("created partitions: %s", ", ".join(created))
+        return created
+
+    async def archive(self, before: date) -> list[str]:
+        """Отцепляет секции за месяцы раньше before. Возвращает их имена.
+
+        DETACH блокирует только таблицу истории, в которую пишет лишь
+        сам архиватор; расчёт игр её не касается. CONCURRENTLY здесь
+        недоступен из-за секции по умолчанию.
+        """
+        drop = self.app.config.game.archive_mode == "drop"
+        archived = []
+        for parent, name, month in await self.list_partitions():
+            if month >= before:
+                continue
+            async with self.app.database.session as session:
+                await session.execute(
+                    text(f"ALTER TABLE {parent} DETACH PARTITION {name}")
+                )
+                if drop:
+                    await session.execute(text(f"DROP TABLE {name}"))
+                else:
+                    await session.execute(
+                        text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}")
+                    )
+                await session.commit()
+            archived.append(name)
+
+        if archived:
+            self.logger.info("archived partitions: %s", ", ".join(archived))
+        return archived
+
+    async def run(self, now: datetime | None = None) -> list[str]:
+        config = self.app.config.game
+        now = now or datetime.now(UTC)
+        month = date(now.year, now.month, 1)
+        await self.ensure_partitions(
+            [
+                add_months(month, offset)
+                for offset in range(-1, config.archive_months_ahead + 1)
+            ]
+        )
+        await self.move_ended(
+            now - timedelta(seconds=config.archive_move_after)
+        )
+        return await self.archive(
+            add_months(month, -config.archive_after_months)
+        )
+
+    async def _run_periodically(self) -> None:
+        while True:
+            try:
+                await self.run()
+            except Exception:
+                self.logger.exception("games archiving failed")
+            await asyncio.sleep(self.app.config.game.archive_interval)
@@ -0,0 +1,57 @@
+import typing
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from app.store.database.query_stats import timed_query
+
+if typing.TYPE_CHECKING:
+    from asyncpg import Connection
+
+    from app.web.app import Application
+
+
+UPDATE_WORD_STATE = (
+    "UPDATE games SET word_state = $2 WHERE game_state = 'ACTIVE' AND id = $1"
+)
+UPDATE_PLAYER_POINTS = (
+    "UPDATE players SET points = $2 WHERE in_game IS true AND id = $1"
+)
+UPDATE_NEXT_PLAYER = (
+    "UPDATE players SET next_player_id = $2 WHERE in_game IS true AND id = $1"
+)
+
+
+class GameFastPath:
+    """Записи хода напрямую через asyncpg-соединение из пула движка.
+
+    Минует ORM и Core: SQL заранее написан. Подготовленные запросы
+    кэширует сам asyncpg. Чтений здесь нет: активную игру чата бот
+    берёт из ChatRegistry и в БД за ней не ходит.
+    """
+
+    def __init__(self, app: "Application") -> None:
+        self.app = app
+
+    @asynccontextmanager
+    async def _connection(self) -> AsyncIterator["Connection"]:
+        async with self.app.database.engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            yield raw.driver_connection
+
+    async def apply_game_writes(
+        self,
+        word_states: dict[int, int],
+        player_points: dict[int, int],
+        next_players: dict[int, int],
+    ) -> None:
+        async with self._connection() as conn, conn.transaction():
+            for statement, values in (
+                (UPDATE_WORD_STATE, word_states),
+                (UPDATE_PLAYER_POINTS, player_points),
+                (UPDATE_NEXT_PLAYER, next_players),
+            ):
+                if values:
+                    with timed_query():
+                        await conn.executemany(statement, list(values.items()))
+        # Запись мимо SQLAlchemy не видна событию commit движка.
+        self.app.database.mark_write()
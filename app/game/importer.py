@@ -0,0 +1,124 @@
+import csv
+import json
+from collections.abc import AsyncIterator
+from typing import NamedTuple
+
+FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/json": "ndjson",
+}
+
+
+# Строки длиннее лимита не разбираются, а попадают в ошибки.
+MAX_LINE = 64 * 1024
+
+
+class QuestionRow(NamedTuple):
+    row: int
+    text: str
+    answer: str
+
+
+class RowError(NamedTuple):
+    row: int
+    error: str
+
+
+def normalize_answer(answer: str) -> str:
+    """Ответ в том виде, в каком его угадывают: одно слово из букв."""
+    answer = answer.strip().lower()
+    if len(answer) < 2:
+        raise ValueError("answer must be at least 2 letters long")
+    if not answer.isalpha():
+        raise ValueError("answer must consist of letters only")
+    return answer
+
+
+def _validate(row: int, fields: object) -> QuestionRow:
+    if not isinstance(fields, dict):
+        raise ValueError("row must be an object with text and answer")
+    text, answer = fields.get("text"), fields.get("answer")
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("text is required")
+    if not isinstance(answer, str):
+        raise ValueError("answer is required")
+    return QuestionRow(row, text.strip(), normalize_answer(answer))
+
+
+async def split_lines(
+    chunks: AsyncIterator[bytes], limit: int = MAX_LINE
+) -> AsyncIterator[bytes | None]:
+    """Строки из кусков тела; вместо строки длиннее limit — None.
+
+    Длинная строка не копится в памяти: её начало отбрасывается сразу,
+    а остаток пропускается до перевода строки.
+    """
+    buffer = b""
+    skipping = False
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", start)) != -1:
+            line = buffer[start : end + 1]
+            start = end + 1
+            if skipping or len(line) > limit:
+                skipping = False
+                yield None
+            else:
+                yield line
+        buffer = buffer[start:]
+        if len(buffer) > limit:
+            skipping = True
+            buffer = b""
+    if skipping:
+        yield None
+    elif buffer:
+        yield buffer
+
+
+async def read_rows(
+    chunks: AsyncIterator[bytes], fmt: str
+) -> AsyncIterator[QuestionRow | RowError]:
+    """Разбирает загрузку построчно; row — номер строки в файле.
+
+    В CSV первая строка — заголовок с колонками text и answer.
+    Поля CSV с переводом строки внутри не поддерживаются.
+    """
+    header = None
+    row = 0
+    async for raw in split_lines(chunks):
+        row += 1
+        if raw is None:
+            yield RowError(row, f"line is longer than {MAX_LINE} bytes")
+            continue
+        try:
+            line = raw.decode().lstrip("\ufeff").strip()
+            if not line:
+                continue
+            if fmt == "ndjson":
+                yield _validate(row, json.loads(line))
+            elif header is None:
+                header = next(csv.reader([line]))
+            else:
+                values = next(csv.reader([line]))
+                yield _validate(row, dict(zip(header, values, strict=False)))
+        except ValueError as e:
+            yield RowError(row, str(e))
+
+
+async def collect_rows(
+    rows: AsyncIterator[QuestionRow | RowError],
+) -> tuple[list[QuestionRow], list[RowError]]:
+    """Годные строки без повторов ответа внутри загрузки и ошибки."""
+    valid, errors = [], []
+    answers: set[str] = set()
+    async for row in rows:
+        if isinstance(row, RowError):
+            errors.append(row)
+        elif row.answer in answers:
+            errors.append(RowError(row.row, "duplicate answer in upload"))
+        else:
+            answers.add(row.answer)
+            valid.append(row)
+    return valid, errors
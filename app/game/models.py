@@ -6,8 +6,11 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     String,
+    UniqueConstraint,
     func,
+    text,
 )
 from sqlalchemy.dialects.postgresql import ENUM
 from sqlalchemy.orm import relationship
@@ -22,6 +25,11 @@ class GameState(Enum):
 
 class PlayerModel(BaseModel):
     __tablename__ = "players"
+    __table_args__ = (
+        UniqueConstraint(
+            "game_id", "user_id", name="players_game_id_user_id_key"
+        ),
+    )
 
     id = Column(BigInteger, primary_key=True, index=True)
     game_id = Column(BigInteger, ForeignKey("games.id", ondelete="CASCADE"))
@@ -34,6 +42,14 @@ class PlayerModel(BaseModel):
 
 class GameModel(BaseModel):
     __tablename__ = "games"
+    # Завершённые игры, которые архиватор перенесёт в историю.
+    __table_args__ = (
+        Index(
+            "ix_games_ended_at",
+            "ended_at",
+            postgresql_where=text("game_state = 'ENDED'"),
+        ),
+    )
 
     id = Column(BigInteger, primary_key=True, index=True)
     question_id = Column(
@@ -50,6 +66,48 @@ class GameModel(BaseModel):
     players = relationship(PlayerModel, uselist=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     ended_at = Column(DateTime(timezone=True), default=None)
+    turns = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+
+class GameHistoryModel(BaseModel):
+    """Завершённые игры, перенесённые архиватором из games.
+
+    Секционирована по месяцам created_at; внешних ключей нет, чтобы
+    секции можно было отцеплять целиком.
+    """
+
+    __tablename__ = "games_history"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+
+    id = Column(BigInteger, primary_key=True, index=True)
+    question_id = Column(BigInteger)
+    chat_id = Column(BigInteger, nullable=False)
+    word_state = Column(BigInteger)
+    game_state = Column(ENUM(GameState, name="gamestate"), nullable=False)
+    winner_id = Column(BigInteger)
+    created_at = Column(DateTime(timezone=True), primary_key=True)
+    ended_at = Column(DateTime(timezone=True))
+    turns = Column(BigInteger, nullable=False, server_default="0")
+
+
+class PlayerHistoryModel(BaseModel):
+    """Игроки перенесённых игр, секционированы по месяцу своей игры.
+
+    Игра и её игроки всегда лежат в секциях одного месяца и отцепляются
+    вместе.
+    """
+
+    __tablename__ = "players_history"
+    __table_args__ = {"postgresql_partition_by": "RANGE (game_created_at)"}
+
+    id = Column(BigInteger, primary_key=True)
+    game_id = Column(BigInteger, index=True)
+    user_id = Column(BigInteger)
+    next_player_id = Column(BigInteger)
+    in_game = Column(Boolean)
+    active = Column(Boolean)
+    points = Column(BigInteger)
+    game_created_at = Column(DateTime(timezone=True), primary_key=True)
 
 
 class QuestionModel(BaseModel):
@@ -59,3 +117,13 @@ class QuestionModel(BaseModel):
     text = Column(String)
     answer = Column(String)
     games = relationship(GameModel, uselist=True)
+
+    # Поиск по подстроке в тексте вопроса (ILIKE) через pg_trgm.
+    __table_args__ = (
+        Index(
+            "ix_questions_text_trgm",
+            "text",
+            postgresql_using="gin",
+            postgresql_ops={"text": "gin_trgm_ops"},
+        ),
+    )
@@ -1,6 +1,12 @@
 import typing
 
-from app.game.views import QuestionAddView, QuestionListView
+from app.game.views import (
+    GameExportView,
+    QuestionAddView,
+    QuestionExportView,
+    QuestionImportView,
+    QuestionListView,
+)
 
 if typing.TYPE_CHECKING:
     from app.web.app import Application
@@ -9,3 +15,6 @@ if typing.TYPE_CHECKING:
 def setup_routes(app: "Application"):
     app.router.add_view("/game.add_question", QuestionAddView)
     app.router.add_view("/game.list_questions", QuestionListView)
+    app.router.add_view("/game.import_questions", QuestionImportView)
+    app.router.add_view("/game.export_questions", QuestionExportView)
+    app.router.add_view("/game.export_games", GameExportView)
@@ -1,4 +1,6 @@
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, validate
+
+from app.base.pagination import Cursor
 
 
 class QuestionSchema(Schema):
@@ -9,3 +11,23 @@ class QuestionSchema(Schema):
 
 class ListQuestionSchema(Schema):
     questions = fields.Nested("QuestionSchema", many=True)
+    next_cursor = fields.Str(allow_none=True)
+
+
+class ListQuestionQuerySchema(Schema):
+    limit = fields.Int(load_default=100, validate=validate.Range(1, 1000))
+    order = fields.Str(
+        load_default="asc", validate=validate.OneOf(["asc", "desc"])
+    )
+    cursor = Cursor(load_default=None)
+    text = fields.Str()
+
+
+class RowErrorSchema(Schema):
+    row = fields.Int()
+    error = fields.Str()
+
+
+class QuestionImportSchema(Schema):
+    imported = fields.Int()
+    errors = fields.Nested(RowErrorSchema, many=True)
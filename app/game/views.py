@@ -1,13 +1,25 @@
 from aiohttp.web_exceptions import HTTPBadRequest
-from aiohttp_apispec import docs, request_schema, response_schema
+from aiohttp_apispec import (
+    docs,
+    querystring_schema,
+    request_schema,
+    response_schema,
+)
 
+from app.base.pagination import cursor_key, encode_cursor
+from app.game.importer import FORMATS, collect_rows, read_rows
 from app.game.schemes import (
+    ListQuestionQuerySchema,
     ListQuestionSchema,
+    QuestionImportSchema,
     QuestionSchema,
+    RowErrorSchema,
 )
 from app.web.app import View
-from app.web.mixins import AuthRequiredMixin
-from app.web.utils import json_response
+from app.web.mixins import AuthRequiredMixin, ConditionalGetMixin
+from app.web.schemes import ExportQuerySchema
+from app.web.serializers import serializer
+from app.web.utils import json_response, list_response, ndjson_response
 
 
 class QuestionAddView(AuthRequiredMixin, View):
@@ -29,22 +41,102 @@ class QuestionAddView(AuthRequiredMixin, View):
         question = await self.store.game.create_question(
             text=text, answer=answer
         )
-        return json_response(data=QuestionSchema().dump(question))
+        return json_response(data=serializer(QuestionSchema).dump(question))
+
+
+class QuestionImportView(AuthRequiredMixin, View):
+    @docs(
+        tags=["Game"],
+        summary="Import questions",
+        description="Add questions in bulk from a CSV (text/csv, with a "
+        "text,answer header) or NDJSON (application/x-ndjson) body. "
+        "Rows that fail validation or repeat an existing answer are "
+        "skipped and reported.",
+    )
+    @response_schema(QuestionImportSchema, 200)
+    async def post(self):
+        fmt = FORMATS.get(self.request.content_type)
+        if fmt is None:
+            raise HTTPBadRequest(reason="expected a CSV or NDJSON body")
+
+        rows, errors = await collect_rows(
+            read_rows(self.request.content.iter_any(), fmt)
+        )
+        existing = []
+        if rows:
+            existing = await self.store.game.import_questions(rows)
+        return json_response(
+            data={
+                "imported": len(rows) - len(existing),
+                "errors": serializer(RowErrorSchema).dump_many(
+                    sorted(errors + existing)
+                ),
+            }
+        )
+
 
+class QuestionListView(AuthRequiredMixin, ConditionalGetMixin, View):
+    collections = ("questions",)
 
-class QuestionListView(AuthRequiredMixin, View):
     @docs(
         tags=["Game"],
         summary="Question list",
-        description="Get list of questions.",
+        description="Get a page of questions. "
+        "Pass next_cursor to get the next one.",
     )
+    @querystring_schema(ListQuestionQuerySchema)
     @response_schema(ListQuestionSchema, 200)
     async def get(self):
-        questions = await self.request.app.store.game.list_questions()
-        if not questions:
-            return json_response(data={"questions": questions})
-
-        raw_questions = [
-            QuestionSchema().dump(question[0]) for question in questions
-        ]
-        return json_response(data={"questions": raw_questions})
+        sort = f"id {self.data['order']}"
+        try:
+            after = cursor_key(self.data["cursor"], sort, 1)
+        except ValueError as e:
+            raise HTTPBadRequest(reason=str(e)) from e
+
+        page = await self.store.game.list_questions(
+            limit=self.data["limit"],
+            desc=self.data["order"] == "desc",
+            after=after,
+            text=self.data.get("text"),
+        )
+        next_cursor = None
+        if page.next_key is not None:
+            next_cursor = encode_cursor({"sort": sort, "key": page.next_key})
+        return await list_response(
+            "questions",
+            serializer(QuestionSchema),
+            page.items,
+            {"next_cursor": next_cursor},
+        )
+
+
+class QuestionExportView(AuthRequiredMixin, View):
+    @docs(
+        tags=["Game"],
+        summary="Export questions",
+        description="Stream all questions as NDJSON, optionally gzipped.",
+    )
+    @querystring_schema(ExportQuerySchema)
+    async def get(self):
+        return await ndjson_response(
+            self.request,
+            self.store.game.iter_questions(),
+            "questions",
+            compress=self.data["gzip"],
+        )
+
+
+class GameExportView(AuthRequiredMixin, View):
+    @docs(
+        tags=["Game"],
+        summary="Export games",
+        description="Stream all games as NDJSON, optionally gzipped.",
+    )
+    @querystring_schema(ExportQuerySchema)
+    async def get(self):
+        return await ndjson_response(
+            self.request,
+            self.store.game.iter_games(),
+            "games",
+            compress=self.data["gzip"],
+        )
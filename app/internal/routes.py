@@ -0,0 +1,37 @@
+import typing
+
+from app.internal.views import (
+    CpuProfileStartView,
+    CpuProfileStopView,
+    GameEventsView,
+    GameSummaryView,
+    LiveView,
+    MemoryProfileStartView,
+    MemoryProfileStopView,
+    MemoryProfileView,
+    ReadyView,
+    SlowQueryListView,
+    TraceExportView,
+)
+
+if typing.TYPE_CHECKING:
+    from app.web.app import Application
+
+
+def setup_routes(app: "Application"):
+    app.router.add_view("/internal/slow_queries", SlowQueryListView)
+    app.router.add_view("/internal/profile/cpu/start", CpuProfileStartView)
+    app.router.add_view("/internal/profile/cpu/stop", CpuProfileStopView)
+    app.router.add_view("/internal/profile/memory", MemoryProfileView)
+    app.router.add_view(
+        "/internal/profile/memory/start", MemoryProfileStartView
+    )
+    app.router.add_view("/internal/profile/memory/stop", MemoryProfileStopView)
+
+
+def setup_bot_manager_routes(app: "Application"):
+    app.router.add_view("/internal/health/live", LiveView)
+    app.router.add_view("/internal/health/ready", ReadyView)
+    app.router.add_view("/internal/games", GameSummaryView)
+    app.router.add_view("/internal/games/events", GameEventsView)
+    app.router.add_view("/internal/traces", TraceExportView)
@@ -0,0 +1,14 @@
+from marshmallow import Schema, fields
+
+
+class SlowQuerySchema(Schema):
+    statement = fields.Str()
+    parameters = fields.Raw()
+    duration = fields.Float()
+    origin = fields.Str(allow_none=True)
+    at = fields.DateTime()
+    plan = fields.List(fields.Str(), allow_none=True)
+
+
+class ListSlowQuerySchema(Schema):
+    queries = fields.Nested(SlowQuerySchema, many=True)
@@ -0,0 +1,199 @@
+import asyncio
+import time
+import tracemalloc
+
+from aiohttp.web_response import Response, StreamResponse
+from aiohttp_apispec import docs, response_schema
+
+from app.base.tracing import FORMATS
+from app.internal.schemes import ListSlowQuerySchema, SlowQuerySchema
+from app.store.bot.registry import ChatPhase
+from app.web.app import View
+from app.web.mixins import InternalTokenMixin
+from app.web.serializers import serializer
+from app.web.utils import (
+    dumps,
+    error_json_response,
+    json_response,
+    list_response,
+    sse_event,
+)
+
+SSE_KEEPALIVE = 15.0
+
+
+class SlowQueryListView(InternalTokenMixin, View):
+    @docs(
+        tags=["Internal"],
+        summary="Slow queries",
+        description="Get the latest queries over the slow query threshold.",
+    )
+    @response_schema(ListSlowQuerySchema, 200)
+    async def get(self):
+        return await list_response(
+            "queries",
+            serializer(SlowQuerySchema),
+            list(reversed(self.database.slow_queries.entries)),
+        )
+
+
+class LiveView(View):
+    async def get(self):
+        poller = self.store.telegram_api.poller
+        if not poller.alive(self.request.app.config.internal.poll_max_age):
+            return error_json_response(503, message="poller is not running")
+        return json_response()
+
+
+class ReadyView(View):
+    async def get(self):
+        config = self.request.app.config.internal
+        checks = {
+            "poller": self.store.telegram_api.poller.alive(config.poll_max_age),
+            "database": await self.database.ping(config.db_ping_timeout),
+        }
+        if not all(checks.values()):
+            return error_json_response(503, message="not ready", data=checks)
+        return json_response(data=checks)
+
+
+class GameSummaryView(InternalTokenMixin, View):
+    async def get(self):
+        manager = self.store.bots_manager
+        chats = manager.chats
+        poller = self.store.telegram_api.poller
+
+        oldest = None
+        if (first := chats.oldest()) is not None:
+            chat_id, entry = first
+            oldest = {
+                "chat_id": chat_id,
+                "game_id": entry.game_id,
+                "phase": entry.phase.value,
+                "age": time.time() - entry.started_at,
+            }
+        last_poll_age = None
+        if poller.last_poll is not None:
+            last_poll_age = time.monotonic() - poller.last_poll
+
+        return json_response(
+            data={
+                "chats": len(chats),
+                "phases": {
+                    phase.value: chats.count(phase)
+                    for phase in (ChatPhase.REGISTERING, ChatPhase.PLAYING)
+                },
+                "oldest": oldest,
+                "shards": chats.shards(),
+                "registration_tasks": len(manager.registration_tasks),
+                "game_tasks": len(manager.game_tasks),
+                "pending_writes": self.store.game_writes.pending_games,
+                "event_subscribers": len(chats.events),
+                "poller": {
+                    "last_poll_age": last_poll_age,
+                    "restarts": poller.restarts,
+                },
+            }
+        )
+
+
+class GameEventsView(InternalTokenMixin, View):
+    async def get(self):
+        response = StreamResponse(
+            headers={
+                "Content-Type": "text/event-stream",
+                "Cache-Control": "no-cache",
+            }
+        )
+        await response.prepare(self.request)
+
+        events = self.store.bots_manager.chats.events
+        queue = events.subscribe()
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE)
+                except TimeoutError:
+                    await response.write(b": keepalive\n\n")
+                    continue
+                if event is None:
+                    # Не успевали разбирать события — клиент переподключится.
+                    break
+                await response.write(sse_event(event["event"], event))
+        finally:
+            events.unsubscribe(queue)
+        return response
+
+
+class TraceExportView(InternalTokenMixin, View):
+    async def get(self):
+        fmt = self.request.query.get("format", "chrome")
+        if fmt not in FORMATS:
+            return error_json_response(
+                400, message=f"format must be one of: {', '.join(FORMATS)}"
+            )
+        # Тело — сам экспорт, как в файле Tracer.write: chrome://tracing
+        # и Perfetto открывают ответ без правки.
+        return Response(
+            body=dumps(self.request.app.tracer.export(fmt)),
+            content_type="application/json",
+        )
+
+
+class CpuProfileStartView(InternalTokenMixin, View):
+    async def post(self):
+        profiler = self.request.app.cpu_profiler
+        if profiler.running:
+            return error_json_response(409, message="profiler is running")
+        config = self.request.app.config.profiling
+        profiler.start(config.cpu_interval, config.cpu_max_duration)
+        return json_response(
+            data={
+                "interval": config.cpu_interval,
+                "max_duration": config.cpu_max_duration,
+            }
+        )
+
+
+class CpuProfileStopView(InternalTokenMixin, View):
+    async def post(self):
+        profiler = self.request.app.cpu_profiler
+        if profiler.started_at is None:
+            return error_json_response(409, message="profiler was not started")
+        # Свёрнутые стеки: flamegraph.pl или speedscope принимают как есть.
+        return Response(
+            text=await asyncio.to_thread(profiler.stop),
+            content_type="text/plain",
+            headers={"X-Profile-Duration": f"{profiler.duration:.3f}"},
+        )
+
+
+class MemoryProfileView(InternalTokenMixin, View):
+    async def get(self):
+        profiler = self.request.app.memory_profiler
+        config = self.request.app.config.profiling
+        data = {
+            "owners": await profiler.sizes(config.memory_max_objects),
+            "traced": None,
+            "top": None,
+        }
+        if profiler.running:
+            current, peak = tracemalloc.get_traced_memory()
+            data["traced"] = {"current": current, "peak": peak}
+            data["top"] = await asyncio.to_thread(
+                profiler.diff, config.memory_top
+            )
+        return json_response(data=data)
+
+
+class MemoryProfileStartView(InternalTokenMixin, View):
+    async def post(self):
+        frames = self.request.app.config.profiling.memory_frames
+        await asyncio.to_thread(self.request.app.memory_profiler.start, frames)
+        return json_response(data={"frames": frames})
+
+
+class MemoryProfileStopView(InternalTokenMixin, View):
+    async def post(self):
+        self.request.app.memory_profiler.stop()
+        return json_response()
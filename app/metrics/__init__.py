@@ -0,0 +1,13 @@
+import typing
+
+__all__ = ("MetricsRegistry", "setup_metrics")
+
+from app.metrics.registry import MetricsRegistry
+
+if typing.TYPE_CHECKING:
+    from app.web.app import Application
+
+
+def setup_metrics(app: "Application") -> None:
+    # Реестр создаётся до хранилища: аксессоры регистрируют в нём метрики.
+    app.metrics = MetricsRegistry()
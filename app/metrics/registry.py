@@ -0,0 +1,216 @@
+import typing
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable, Sequence
+
+if typing.TYPE_CHECKING:
+    from app.base.cache import LRUCache
+
+# Границы корзин гистограмм в секундах.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"'
+        for name, value in zip(names, values, strict=True)
+    )
+    return "{" + pairs + "}"
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+
+    def _header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    @abstractmethod
+    def render(self) -> list[str]: ...
+
+
+class _LabeledMetric(_Metric):
+    """Метрика из серий, различающихся значениями меток."""
+
+    def __init__(
+        self, name: str, help_text: str, labels: Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, help_text)
+        self.labelnames = tuple(labels)
+        self._children: dict[tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        """Серия метрики с заданными значениями меток.
+
+        На горячем пути серию стоит получить один раз и сохранить.
+        """
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self): ...
+
+    @abstractmethod
+    def _render_child(self, labels: str, child) -> list[str]: ...
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for values, child in sorted(self._children.items()):
+            labels = _format_labels(self.labelnames, values)
+            lines += self._render_child(labels, child)
+        return lines
+
+
+class CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+
+class Counter(_LabeledMetric):
+    kind = "counter"
+
+    def _new_child(self) -> CounterValue:
+        return CounterValue()
+
+    def inc(self, amount: int = 1) -> None:
+        self.labels().inc(amount)
+
+    def _render_child(self, labels: str, child: CounterValue) -> list[str]:
+        return [f"{self.name}_total{labels} {child.value}"]
+
+
+class HistogramValue:
+    """Наблюдения одной серии гистограммы.
+
+    Счётчики корзин выделяются при создании серии, наблюдение — поиск
+    корзины и два сложения без блокировок: все наблюдения делаются
+    из потока цикла событий.
+    """
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        # Последняя корзина — значения больше всех границ (+Inf).
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_LabeledMetric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramValue:
+        return HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _render_child(self, labels: str, child: HistogramValue) -> list[str]:
+        extra = labels[1:-1] + "," if labels else ""
+        lines = []
+        total = 0
+        bounds = [*map(str, child.bounds), "+Inf"]
+        for bound, count in zip(bounds, child.counts, strict=True):
+            total += count
+            lines.append(f'{self.name}_bucket{{{extra}le="{bound}"}} {total}')
+        lines.append(f"{self.name}_sum{labels} {child.sum}")
+        lines.append(f"{self.name}_count{labels} {total}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Значение, которое читается из состояния приложения при выгрузке."""
+
+    kind = "gauge"
+
+    def __init__(
+        self, name: str, help_text: str, read: Callable[[], float]
+    ) -> None:
+        super().__init__(name, help_text)
+        self.read = read
+
+    def render(self) -> list[str]:
+        return [*self._header(), f"{self.name} {self.read()}"]
+
+
+class MetricsRegistry:
+    """Метрики процесса в текстовом формате Prometheus."""
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, help_text: str, labels: Sequence[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def gauge(
+        self, name: str, help_text: str, read: Callable[[], float]
+    ) -> Gauge:
+        return self._register(Gauge(name, help_text, read))
+
+    def cache(self, prefix: str, cache: "LRUCache") -> None:
+        """Размер, попадания и промахи кэша; читаются при выгрузке."""
+        self.gauge(f"{prefix}_size", "Entries in the cache.", cache.__len__)
+        self.gauge(f"{prefix}_hits", "Cache hits.", lambda: cache.hits)
+        self.gauge(f"{prefix}_misses", "Cache misses.", lambda: cache.misses)
+        self.gauge(
+            f"{prefix}_hit_rate",
+            "Share of lookups served from the cache.",
+            lambda: cache.hit_rate,
+        )
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
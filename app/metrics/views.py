@@ -0,0 +1,12 @@
+from aiohttp.web_response import Response
+
+from app.web.app import View
+
+
+class MetricsView(View):
+    async def get(self):
+        return Response(
+            text=self.request.app.metrics.render()
+            + self.database.query_stats.render(),
+            content_type="text/plain",
+        )
@@ -0,0 +1,313 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import Select, Table, delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.base.base_accessor import BaseAccessor
+from app.game.archiver import ALL_GAMES, ALL_PLAYERS
+from app.game.models import GameState
+from app.stats.models import (
+    REBUILD_TABLES,
+    ROLLUPS,
+    ChatDailyStatsModel,
+    GameTotalsModel,
+    QuestionStatsModel,
+    StatsRebuildModel,
+    UserStatsModel,
+)
+
+# Строка хода пересчёта: FOR SHARE у расчёта игры, FOR UPDATE у пересчёта.
+_progress = StatsRebuildModel.__table__
+REBUILD_PROGRESS = (
+    select(_progress).where(_progress.c.id == 1).with_for_update(read=True)
+)
+LOCK_REBUILD = (
+    select(_progress.c.id).where(_progress.c.id == 1).with_for_update()
+)
+LIVE_TABLES = {model: model.__table__ for model in ROLLUPS}
+
+
+def _increment(request: Insert, table: Table, keys: list[str]) -> Insert:
+    return request.on_conflict_do_update(
+        index_elements=keys,
+        set_={
+            column.name: column + request.excluded[column.name]
+            for column in table.columns
+            if column.name not in keys
+        },
+    )
+
+
+def _upsert(table: Table, keys: list[str], rows: list[dict]) -> Insert:
+    return _increment(insert(table).values(rows), table, keys)
+
+
+def _upsert_from(table: Table, keys: list[str], request: Select) -> Insert:
+    names = [column.name for column in table.columns]
+    return _increment(insert(table).from_select(names, request), table, keys)
+
+
+def _day(created_at):
+    return func.date(func.timezone("UTC", created_at))
+
+
+class StatsAccessor(BaseAccessor):
+    async def record_game(
+        self,
+        session: AsyncSession,
+        *,
+        game_id: int,
+        chat_id: int,
+        question_id: int,
+        created_at: datetime,
+        ended_at: datetime,
+        winner_id: int | None,
+        turns: int,
+        user_ids: list[int],
+    ) -> None:
+        """Добавляет сыгранную игру к агрегатам в переданной транзакции.
+
+        Пока идёт пересчёт, игра, которую он уже не увидит, добавляется
+        и к таблицам пересчёта.
+        """
+        res = await session.execute(REBUILD_PROGRESS)
+        progress = res.one_or_none()
+        targets = [LIVE_TABLES]
+        # Диапазоны до processed_upto пересчёт уже прошёл, а игры после
+        # high_id он не увидит вовсе.
+        if (
+            progress is not None
+            and progress.running
+            and not progress.processed_upto <= game_id <= progress.high_id
+        ):
+            targets.append(REBUILD_TABLES)
+
+        won = int(winner_id is not None)
+        duration = (ended_at - created_at).total_seconds()
+        for tables in targets:
+            await session.execute(
+                _upsert(
+                    tables[ChatDailyStatsModel],
+                    ["chat_id", "day"],
+                    [
+                        {
+                            "chat_id": chat_id,
+                            "day": created_at.astimezone(UTC).date(),
+                            "games": 1,
+                            "games_won": won,
+                            "total_duration": duration,
+                            "total_turns": turns,
+                        }
+                    ],
+                )
+            )
+            await session.execute(
+                _upsert(
+                    tables[QuestionStatsModel],
+                    ["question_id"],
+                    [
+                        {
+                            "question_id": question_id,
+                            "games": 1,
+                            "solved": won,
+                            "total_turns": turns,
+                        }
+                    ],
+                )
+            )
+            if user_ids:
+                await session.execute(
+                    _upsert(
+                        tables[UserStatsModel],
+                        ["user_id"],
+                        [
+                            {
+                                "user_id": user_id,
+                                "games": 1,
+                                "games_won": int(user_id == winner_id),
+                            }
+                            for user_id in user_ids
+                        ],
+                    )
+                )
+            await session.execute(
+                _upsert(
+                    tables[GameTotalsModel],
+                    ["id"],
+                    [
+                        {
+                            "id": 1,
+                            "games": 1,
+                            "games_won": won,
+                            "total_duration": duration,
+                            "total_turns": turns,
+                        }
+                    ],
+                )
+            )
+
+    async def get_summary(self) -> GameTotalsModel | None:
+        async with self.app.database.read_session as session:
+            return await session.get(GameTotalsModel, 1)
+
+    async def get_chat_stats(
+        self, chat_id: int, days: int
+    ) -> list[ChatDailyStatsModel]:
+        request = (
+            select(ChatDailyStatsModel)
+            .where(ChatDailyStatsModel.chat_id == chat_id)
+            .order_by(ChatDailyStatsModel.day.desc())
+            .limit(days)
+        )
+        async with self.app.database.read_session as session:
+            res = await session.execute(request)
+            return list(res.scalars().all())
+
+    async def get_question_stats(
+        self, question_id: int
+    ) -> QuestionStatsModel | None:
+        async with self.app.database.read_session as session:
+            return await session.get(QuestionStatsModel, question_id)
+
+    async def get_user_stats(self, user_id: int) -> UserStatsModel | None:
+        async with self.app.database.read_session as session:
+            return await session.get(UserStatsModel, user_id)
+
+    async def rebuild(self, batch_size: int = 10_000) -> int:
+        """Пересчитывает агрегаты по истории игр.
+
+        Агрегаты собираются в таблицы *_rebuild диапазонами id, каждый
+        диапазон фиксируется отдельной транзакцией; читатели до конца
+        видят прежние агрегаты. Игры, закрытые во время пересчёта,
+        record_game добавляет туда сам, если диапазон с ними уже пройден.
+        В конце таблицы подменяются одной транзакцией. Возвращает число
+        учтённых пересчётом игр.
+        """
+        async with self.app.database.session as session:
+            await session.execute(LOCK_REBUILD)
+            for table in REBUILD_TABLES.values():
+                await session.execute(delete(table))
+            res = await session.execute(
+                select(func.min(ALL_GAMES.c.id), func.max(ALL_GAMES.c.id))
+            )
+            low, high = res.one()
+            await session.execute(
+                update(_progress).values(
+                    running=True,
+                    high_id=high or 0,
+                    processed_upto=low or 0,
+                )
+            )
+            await session.commit()
+
+        counted = 0
+        if high is not None:
+            for start in range(low, high + 1, batch_size):
+                stop = min(start + batch_size, high + 1)
+                counted += await self._rebuild_batch(start, stop)
+                self.logger.info("stats rebuilt up to game %s", stop)
+        await self._swap_rebuilt()
+        return counted
+
+    async def _rebuild_batch(self, start: int, stop: int) -> int:
+        played = (
+            select(ALL_GAMES)
+            .where(
+                ALL_GAMES.c.game_state == GameState.ENDED,
+                ALL_GAMES.c.turns > 0,
+                ALL_GAMES.c.id >= start,
+                ALL_GAMES.c.id < stop,
+            )
+            .subquery()
+        )
+        duration = func.coalesce(
+            func.extract("epoch", played.c.ended_at - played.c.created_at), 0
+        )
+
+        async with self.app.database.session as session:
+            # Расчёты игр ждут конца диапазона: игра учитывается либо
+            # здесь, либо в record_game, но не дважды.
+            await session.execute(LOCK_REBUILD)
+            res = await session.execute(
+                select(func.count()).select_from(played)
+            )
+            counted = res.scalar_one()
+            if counted:
+                await self._aggregate(session, played, duration)
+            await session.execute(update(_progress).values(processed_upto=stop))
+            await session.commit()
+
+        return counted
+
+    @staticmethod
+    async def _aggregate(session: AsyncSession, played, duration) -> None:
+        await session.execute(
+            _upsert_from(
+                REBUILD_TABLES[ChatDailyStatsModel],
+                ["chat_id", "day"],
+                select(
+                    played.c.chat_id,
+                    _day(played.c.created_at),
+                    func.count(),
+                    func.count(played.c.winner_id),
+                    func.sum(duration),
+                    func.sum(played.c.turns),
+                ).group_by(played.c.chat_id, _day(played.c.created_at)),
+            )
+        )
+        await session.execute(
+            _upsert_from(
+                REBUILD_TABLES[QuestionStatsModel],
+                ["question_id"],
+                select(
+                    played.c.question_id,
+                    func.count(),
+                    func.count(played.c.winner_id),
+                    func.sum(played.c.turns),
+                )
+                .where(played.c.question_id.is_not(None))
+                .group_by(played.c.question_id),
+            )
+        )
+        await session.execute(
+            _upsert_from(
+                REBUILD_TABLES[UserStatsModel],
+                ["user_id"],
+                select(
+                    ALL_PLAYERS.c.user_id,
+                    func.count(func.distinct(played.c.id)),
+                    func.count(func.distinct(played.c.id)).filter(
+                        played.c.winner_id == ALL_PLAYERS.c.user_id
+                    ),
+                )
+                .join(played, ALL_PLAYERS.c.game_id == played.c.id)
+                .group_by(ALL_PLAYERS.c.user_id),
+            )
+        )
+        await session.execute(
+            _upsert_from(
+                REBUILD_TABLES[GameTotalsModel],
+                ["id"],
+                select(
+                    literal(1),
+                    func.count(),
+                    func.count(played.c.winner_id),
+                    func.sum(duration),
+                    func.sum(played.c.turns),
+                ).select_from(played),
+            )
+        )
+
+    async def _swap_rebuilt(self) -> None:
+        async with self.app.database.session as session:
+            await session.execute(LOCK_REBUILD)
+            for model, table in REBUILD_TABLES.items():
+                names = [column.name for column in table.columns]
+                await session.execute(delete(model))
+                await session.execute(
+                    insert(model).from_select(names, select(table))
+                )
+                await session.execute(delete(table))
+            await session.execute(update(_progress).values(running=False))
+            await session.commit()
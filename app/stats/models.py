@@ -0,0 +1,79 @@
+from sqlalchemy import BigInteger, Boolean, Column, Date, Float, ForeignKey
+
+from app.store.database.sqlalchemy_base import BaseModel
+
+
+class ChatDailyStatsModel(BaseModel):
+    __tablename__ = "chat_daily_stats"
+
+    chat_id = Column(BigInteger, primary_key=True)
+    day = Column(Date, primary_key=True)
+    games = Column(BigInteger, nullable=False, default=0)
+    games_won = Column(BigInteger, nullable=False, default=0)
+    total_duration = Column(Float, nullable=False, default=0)
+    total_turns = Column(BigInteger, nullable=False, default=0)
+
+
+class QuestionStatsModel(BaseModel):
+    __tablename__ = "question_stats"
+
+    question_id = Column(
+        BigInteger,
+        ForeignKey("questions.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    games = Column(BigInteger, nullable=False, default=0)
+    solved = Column(BigInteger, nullable=False, default=0)
+    total_turns = Column(BigInteger, nullable=False, default=0)
+
+
+class UserStatsModel(BaseModel):
+    __tablename__ = "user_stats"
+
+    user_id = Column(
+        BigInteger,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    games = Column(BigInteger, nullable=False, default=0)
+    games_won = Column(BigInteger, nullable=False, default=0)
+
+
+class GameTotalsModel(BaseModel):
+    __tablename__ = "game_totals"
+
+    id = Column(BigInteger, primary_key=True, default=1)
+    games = Column(BigInteger, nullable=False, default=0)
+    games_won = Column(BigInteger, nullable=False, default=0)
+    total_duration = Column(Float, nullable=False, default=0)
+    total_turns = Column(BigInteger, nullable=False, default=0)
+
+
+class StatsRebuildModel(BaseModel):
+    """Ход пересчёта агрегатов; строка одна и есть всегда.
+
+    Пока идёт пересчёт, игры с id меньше processed_upto или больше
+    high_id (их пересчёт уже не увидит) попадают и в таблицы пересчёта.
+    """
+
+    __tablename__ = "stats_rebuild"
+
+    id = Column(BigInteger, primary_key=True, default=1)
+    running = Column(Boolean, nullable=False, default=False)
+    high_id = Column(BigInteger, nullable=False, default=0)
+    processed_upto = Column(BigInteger, nullable=False, default=0)
+
+
+ROLLUPS = (
+    ChatDailyStatsModel,
+    QuestionStatsModel,
+    UserStatsModel,
+    GameTotalsModel,
+)
+# Таблицы, в которые пересчёт собирает агрегаты до подмены основных.
+REBUILD_TABLES = {
+    model: model.__table__.to_metadata(
+        BaseModel.metadata, name=f"{model.__tablename__}_rebuild"
+    )
+    for model in ROLLUPS
+}
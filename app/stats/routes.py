@@ -0,0 +1,18 @@
+import typing
+
+from app.stats.views import (
+    ChatStatsView,
+    QuestionStatsView,
+    StatsSummaryView,
+    UserStatsView,
+)
+
+if typing.TYPE_CHECKING:
+    from app.web.app import Application
+
+
+def setup_routes(app: "Application"):
+    app.router.add_view("/stats.summary", StatsSummaryView)
+    app.router.add_view("/stats.chat", ChatStatsView)
+    app.router.add_view("/stats.question", QuestionStatsView)
+    app.router.add_view("/stats.user", UserStatsView)
@@ -0,0 +1,46 @@
+from marshmallow import Schema, fields, validate
+
+
+class StatsSummarySchema(Schema):
+    games = fields.Int()
+    games_won = fields.Int()
+    win_rate = fields.Float()
+    avg_duration = fields.Float()
+    avg_turns = fields.Float()
+
+
+class ChatStatsQuerySchema(Schema):
+    chat_id = fields.Int(required=True)
+    days = fields.Int(load_default=7, validate=validate.Range(1, 366))
+
+
+class ChatDayStatsSchema(StatsSummarySchema):
+    day = fields.Date()
+
+
+class ChatStatsSchema(Schema):
+    chat_id = fields.Int()
+    days = fields.Nested("ChatDayStatsSchema", many=True)
+
+
+class QuestionStatsQuerySchema(Schema):
+    question_id = fields.Int(required=True)
+
+
+class QuestionStatsSchema(Schema):
+    question_id = fields.Int()
+    games = fields.Int()
+    solved = fields.Int()
+    solve_rate = fields.Float()
+    avg_turns = fields.Float()
+
+
+class UserStatsQuerySchema(Schema):
+    user_id = fields.Int(required=True)
+
+
+class UserStatsSchema(Schema):
+    user_id = fields.Int()
+    games = fields.Int()
+    games_won = fields.Int()
+    win_rate = fields.Float()
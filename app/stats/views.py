@@ -0,0 +1,119 @@
+from aiohttp.web_exceptions import HTTPNotFound
+from aiohttp_apispec import docs, querystring_schema, response_schema
+
+from app.stats.schemes import (
+    ChatStatsQuerySchema,
+    ChatStatsSchema,
+    QuestionStatsQuerySchema,
+    QuestionStatsSchema,
+    StatsSummarySchema,
+    UserStatsQuerySchema,
+    UserStatsSchema,
+)
+from app.web.app import View
+from app.web.mixins import AuthRequiredMixin
+from app.web.utils import json_response
+
+
+def _ratio(value: float, total: int) -> float:
+    return value / total if total else 0.0
+
+
+def _summary(rollup) -> dict:
+    return {
+        "games": rollup.games,
+        "games_won": rollup.games_won,
+        "win_rate": _ratio(rollup.games_won, rollup.games),
+        "avg_duration": _ratio(rollup.total_duration, rollup.games),
+        "avg_turns": _ratio(rollup.total_turns, rollup.games),
+    }
+
+
+class StatsSummaryView(AuthRequiredMixin, View):
+    @docs(
+        tags=["Stats"],
+        summary="Games summary",
+        description="Get totals over all played games.",
+    )
+    @response_schema(StatsSummarySchema, 200)
+    async def get(self):
+        totals = await self.store.stats.get_summary()
+        if totals is None:
+            return json_response(data=StatsSummarySchema().dump({}))
+        return json_response(data=StatsSummarySchema().dump(_summary(totals)))
+
+
+class ChatStatsView(AuthRequiredMixin, View):
+    @docs(
+        tags=["Stats"],
+        summary="Chat stats",
+        description="Get per-day game stats of a chat.",
+    )
+    @querystring_schema(ChatStatsQuerySchema)
+    @response_schema(ChatStatsSchema, 200)
+    async def get(self):
+        rollups = await self.store.stats.get_chat_stats(
+            chat_id=self.data["chat_id"], days=self.data["days"]
+        )
+        return json_response(
+            data=ChatStatsSchema().dump(
+                {
+                    "chat_id": self.data["chat_id"],
+                    "days": [
+                        {"day": rollup.day, **_summary(rollup)}
+                        for rollup in rollups
+                    ],
+                }
+            )
+        )
+
+
+class QuestionStatsView(AuthRequiredMixin, View):
+    @docs(
+        tags=["Stats"],
+        summary="Question stats",
+        description="Get solve rate and turn count of a question.",
+    )
+    @querystring_schema(QuestionStatsQuerySchema)
+    @response_schema(QuestionStatsSchema, 200)
+    async def get(self):
+        rollup = await self.store.stats.get_question_stats(
+            self.data["question_id"]
+        )
+        if rollup is None:
+            raise HTTPNotFound
+        return json_response(
+            data=QuestionStatsSchema().dump(
+                {
+                    "question_id": rollup.question_id,
+                    "games": rollup.games,
+                    "solved": rollup.solved,
+                    "solve_rate": _ratio(rollup.solved, rollup.games),
+                    "avg_turns": _ratio(rollup.total_turns, rollup.games),
+                }
+            )
+        )
+
+
+class UserStatsView(AuthRequiredMixin, View):
+    @docs(
+        tags=["Stats"],
+        summary="User stats",
+        description="Get win rate of a player.",
+    )
+    @querystring_schema(UserStatsQuerySchema)
+    @response_schema(UserStatsSchema, 200)
+    async def get(self):
+        rollup = await self.store.stats.get_user_stats(self.data["user_id"])
+        if rollup is None:
+            raise HTTPNotFound
+        return json_response(
+            data=UserStatsSchema().dump(
+                {
+                    "user_id": rollup.user_id,
+                    "games": rollup.games,
+                    "games_won": rollup.games_won,
+                    "win_rate": _ratio(rollup.games_won, rollup.games),
+                }
+            )
+        )
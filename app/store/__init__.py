@@ -11,26 +11,50 @@ if typing.TYPE_CHECKING:
 class Store:
     def __init__(self, app: "Application", app_name: str):
         from app.game.accessor import GameAccessor
+        from app.stats.accessor import StatsAccessor
         from app.users.accessor import UserAccessor
 
         if app_name == "admin-api":
+            from app.base.cache import LRUCache
             from app.store.admin.accessor import AdminAccessor
 
             self.admins = AdminAccessor(app)
+            self.responses = LRUCache(
+                max_size=app.config.cache.responses_max_size,
+                ttl=app.config.cache.responses_ttl,
+            )
+            app.memory_profiler.track("responses_cache", lambda: self.responses)
+            app.metrics.cache("responses_cache", self.responses)
 
         if app_name == "bot-manager":
+            from app.game.archiver import GameArchiver
             from app.store.bot.manager import BotManager
+            from app.store.bot.write_buffer import GameWriteBuffer
             from app.store.telegram_api.accessor import TelegramApiAccessor
+            from app.users.leaderboard import LeaderboardAccessor
 
-            self.telegram_api = TelegramApiAccessor(app)
             self.bots_manager = BotManager(app)
+            # Реестр чатов сверяется с БД до начала приёма обновлений.
+            app.on_startup.append(self.bots_manager.restore_chats)
+            self.telegram_api = TelegramApiAccessor(app)
+            self.game_writes = GameWriteBuffer(app)
+            self.leaderboard = LeaderboardAccessor(app)
+            self.archiver = GameArchiver(app)
 
         self.users = UserAccessor(app)
         self.game = GameAccessor(app)
+        self.stats = StatsAccessor(app)
+
+        if app_name == "bot-manager":
+            # Опрос начинается после запуска всех аксессоров: к первому
+            # обновлению рейтинг загружен, а буфер записей работает.
+            # Останавливается опрос при этом первым, до сброса буфера.
+            app.on_startup.append(self.telegram_api.start_polling)
 
 
 def setup_store(app: "Application", app_name: str) -> None:
     app.database = Database(app)
     app.on_startup.append(app.database.connect)
-    app.on_cleanup.append(app.database.disconnect)
     app.store = Store(app, app_name)
+    # Движок закрываем последним, чтобы аксессоры успели дописать данные.
+    app.on_cleanup.append(app.database.disconnect)
@@ -1,10 +1,13 @@
 import asyncio
 import json
 import random
+import time
 import traceback
 import typing
 from logging import getLogger
 
+from app.base.coalesce import SingleFlight
+from app.base.tracing import untraced_context
 from app.store.bot.messages import (
     GAME_ALREADY_ACTIVE,
     GAME_END_ERROR,
@@ -34,11 +37,17 @@ from app.store.bot.messages import (
     START_FIRST_TIME,
     START_RETURNING_USER,
     TIMEOUT_MESSAGE,
+    TOP_EMPTY,
+    TOP_ENTRY,
+    TOP_MESSAGE,
     UNKNOWN_COMMAND,
     WAIT_FOR_WORD,
     WORD_GUESS_INCORRECT,
     WORD_GUESS_NOT_ALLOWED,
 )
+from app.store.bot.registry import ChatPhase, ChatRegistry
+from app.store.bot.roster import Roster
+from app.store.database.query_stats import track_queries
 from app.store.telegram_api.dataclasses import (
     CallbackAnswer,
     CallbackQuery,
@@ -46,10 +55,43 @@ from app.store.telegram_api.dataclasses import (
     UpdateMessage,
     UpdateObject,
 )
+from app.web.logger import bind_log_context
 
 if typing.TYPE_CHECKING:
     from app.web.app import Application
 
+TOP_SIZE = 10
+COMMANDS = frozenset(
+    (
+        "/start",
+        "/rules",
+        "/play",
+        "/profile",
+        "/top",
+        "/question",
+        "/used",
+        "/stop",
+    )
+)
+CALLBACKS = frozenset(("participate", "spin", "guess"))
+
+
+def command_name(text: str) -> str:
+    return text.split()[0].split("@")[0]
+
+
+def update_label(update: UpdateObject) -> str:
+    """Тип обновления для метрик: команда, тип кнопки или ввод в игре."""
+    if update.type == "message":
+        if update.object.text.startswith("/"):
+            command = command_name(update.object.text)
+            return command if command in COMMANDS else "unknown"
+        return "input"
+    if update.type == "callback_query":
+        action = update.object.data.split("_")[0]
+        return action if action in CALLBACKS else "unknown"
+    return update.type
+
 
 class BotManager:
     def __init__(self, app: "Application"):
@@ -57,10 +99,40 @@ class BotManager:
         self.bot = None
         self.logger = getLogger("handler")
         self.registration_tasks = {}
+        self.rosters: dict[int, Roster] = {}
+        self.chats = ChatRegistry()
+        self.starting = SingleFlight()
         self.game_tasks = {}
         self.game_states = {}
         self.input_events = {}
 
+        app.memory_profiler.track("game_states", lambda: self.game_states)
+        app.memory_profiler.track("rosters", lambda: self.rosters)
+        app.memory_profiler.track("input_events", lambda: self.input_events)
+        # Вместе с очередями подписчиков событий.
+        app.memory_profiler.track("chats", lambda: self.chats)
+
+        self.update_seconds = app.metrics.histogram(
+            "bot_update_seconds", "Update handling time.", labels=("type",)
+        )
+        app.metrics.gauge(
+            "bot_active_games",
+            "Games in progress.",
+            lambda: self.chats.count(ChatPhase.PLAYING),
+        )
+        app.metrics.gauge(
+            "bot_registrations",
+            "Games in registration.",
+            lambda: self.chats.count(ChatPhase.REGISTERING),
+        )
+        # У каждой регистрации и каждой игры ровно один ожидающий таймер:
+        # отсчёт регистрации или ожидание хода.
+        app.metrics.gauge(
+            "bot_pending_timers",
+            "Registration countdowns and turn timeouts waiting to fire.",
+            lambda: len(self.registration_tasks) + len(self.game_tasks),
+        )
+
         self.SECTORS = [
             "x2",
             "b",
@@ -80,16 +152,53 @@ class BotManager:
         ]
 
     async def handle_updates(self, updates: list[UpdateObject]) -> None:
+        # Разные чаты обрабатываются одновременно, обновления одного чата —
+        # по порядку.
+        by_chat: dict[int, list[UpdateObject]] = {}
         for update in updates:
-            obj = update.object
-            if update.type == "message":
-                if obj.text.startswith("/"):
-                    command = obj.text.split()[0].split("@")[0]
-                    await self.handle_command(command, obj)
-                else:
-                    await self.handle_game_input(obj)
-            elif update.type == "callback_query":
-                await self.handle_callback_query(obj)
+            by_chat.setdefault(update.object.chat_id, []).append(update)
+
+        results = await asyncio.gather(
+            *(self.handle_chat_updates(chat) for chat in by_chat.values()),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error("update handling failed", exc_info=result)
+
+    async def handle_chat_updates(self, updates: list[UpdateObject]) -> None:
+        for update in updates:
+            # Каждый чат обрабатывается в своей задаче, поэтому поля
+            # не попадают в записи других чатов.
+            chat = self.chats.get(update.object.chat_id)
+            bind_log_context(
+                chat_id=update.object.chat_id,
+                game_id=chat.game_id if chat else None,
+            )
+            label = update_label(update)
+            started = time.perf_counter()
+            with (
+                self.app.tracer.trace(f"update {label}") as trace_id,
+                track_queries(label) as queries,
+            ):
+                bind_log_context(trace_id=trace_id)
+                try:
+                    await self.handle_update(update)
+                finally:
+                    self.app.database.query_stats.record(queries)
+                    self.update_seconds.labels(label).observe(
+                        time.perf_counter() - started
+                    )
+
+    async def handle_update(self, update: UpdateObject) -> None:
+        obj = update.object
+        if update.type == "message":
+            if obj.text.startswith("/"):
+                await self.handle_command(command_name(obj.text), obj)
+            else:
+                await self.handle_game_input(obj)
+        elif update.type == "callback_query":
+            await self.handle_callback_query(obj)
 
     async def handle_command(
         self, command: str, message: UpdateMessage
@@ -97,10 +206,11 @@ class BotManager:
         match command:
             case "/start":
                 res = await self.app.store.users.get_by_id(message.from_id)
-                if res is None:
+                if res is None or res.username != message.username:
                     await self.app.store.users.create_user(
                         message.from_id, message.username
                     )
+                if res is None:
                     await self.app.store.telegram_api.send_message(
                         Message(
                             chat_id=message.chat_id,
@@ -123,11 +233,10 @@ class BotManager:
                     Message(chat_id=message.chat_id, text=RULES_MESSAGE)
                 )
             case "/play":
-                game = await self.app.store.game.get_active_game_by_chat_id(
-                    message.chat_id
-                )
-                if game is None:
-                    await self.start_new_game(message)
+                if self._is_idle(message.chat_id):
+                    await self.starting.run(
+                        message.chat_id, lambda: self.start_new_game(message)
+                    )
                 else:
                     await self.app.store.telegram_api.send_message(
                         Message(
@@ -135,12 +244,9 @@ class BotManager:
                         )
                     )
             case "/profile":
-                user = await self.app.store.users.get_by_id(message.from_id)
-                if not user:
-                    await self.app.store.users.create_user(
-                        message.from_id, message.username
-                    )
-                user = await self.app.store.users.get_by_id(message.from_id)
+                user = await self._get_or_create_user(
+                    message.from_id, message.username
+                )
                 await self.app.store.telegram_api.send_message(
                     Message(
                         chat_id=message.chat_id,
@@ -148,28 +254,40 @@ class BotManager:
                             username=user.username,
                             score=user.score,
                             points=user.points,
+                            rank=self.app.store.leaderboard.rank(user.id),
                         ),
                     )
                 )
-            case "/question":
-                game = await self.app.store.game.get_active_game_by_chat_id(
-                    message.chat_id
-                )
-                if game is not None:
-                    question = await self.app.store.game.get_question_by_id(
-                        game.question_id
+            case "/top":
+                entries = self.app.store.leaderboard.top(TOP_SIZE)
+                if entries:
+                    text = TOP_MESSAGE.format(
+                        entries="\n".join(
+                            TOP_ENTRY.format(
+                                rank=entry.rank,
+                                username=entry.username,
+                                score=entry.score,
+                                points=entry.points,
+                            )
+                            for entry in entries
+                        )
                     )
+                else:
+                    text = TOP_EMPTY
+                await self.app.store.telegram_api.send_message(
+                    Message(chat_id=message.chat_id, text=text)
+                )
+            case "/question":
+                chat = self.chats.get(message.chat_id)
+                if chat is not None:
                     await self.app.store.telegram_api.send_message(
                         Message(
                             chat_id=message.chat_id,
-                            text=f"Загадка: {question.text}",
+                            text=f"Загадка: {chat.question}",
                         )
                     )
             case "/used":
-                game = await self.app.store.game.get_active_game_by_chat_id(
-                    message.chat_id
-                )
-                if game is not None:
+                if self.chats.phase(message.chat_id) is ChatPhase.PLAYING:
                     letters = " ".join(
                         list(self.game_states[message.chat_id]["used_letters"])
                     )
@@ -180,18 +298,15 @@ class BotManager:
                         )
                     )
             case "/stop":
-                game = await self.app.store.game.get_active_game_by_chat_id(
-                    message.chat_id
-                )
-                if game is not None:
-                    user = await self.app.store.users.get_by_id(message.from_id)
+                phase = self.chats.phase(message.chat_id)
+                if phase is ChatPhase.PLAYING:
                     current_player_id = self.game_states[message.chat_id][
                         "current_player_idx"
                     ]
                     current_user_id = self.game_states[message.chat_id][
                         "players"
                     ][current_player_id][0].user_id
-                    if user.id == current_user_id:
+                    if message.from_id == current_user_id:
                         await self.stop_game(message.chat_id)
                     else:
                         await self.app.store.telegram_api.send_message(
@@ -200,6 +315,10 @@ class BotManager:
                                 text=NOT_IN_GAME,
                             )
                         )
+                elif phase is ChatPhase.REGISTERING:
+                    await self.app.store.telegram_api.send_message(
+                        Message(chat_id=message.chat_id, text=NOT_IN_GAME)
+                    )
                 else:
                     await self.app.store.telegram_api.send_message(
                         Message(
@@ -215,35 +334,35 @@ class BotManager:
                     )
                 )
 
+    def _is_idle(self, chat_id: int) -> bool:
+        # Пока игра создаётся, реестр ещё считает чат свободным.
+        if self.starting.running(chat_id):
+            return False
+        return self.chats.phase(chat_id) is ChatPhase.IDLE
+
+    async def _get_or_create_user(self, user_id: int, username: str):
+        user = await self.app.store.users.get_by_id(user_id)
+        if user is None or user.username != username:
+            user = await self.app.store.users.create_user(user_id, username)
+        return user
+
     async def handle_callback_query(self, query: CallbackQuery) -> None:
-        user = await self.app.store.users.get_by_id(query.from_id)
-        if not user:
-            await self.app.store.users.create_user(
-                query.from_id, query.username
-            )
+        await self._get_or_create_user(query.from_id, query.username)
         if query.data.startswith("participate"):
             game_id = int(query.data.split("_")[1])
-            active_game = await self.app.store.game.get_active_game_by_chat_id(
-                chat_id=query.chat_id
-            )
+            roster = self.rosters.get(query.chat_id)
             if (
-                active_game
-                and active_game.id == game_id
+                roster is not None
+                and roster.game_id == game_id
                 and query.chat_id in self.registration_tasks
             ):
-                players_and_users = (
-                    await self.app.store.game.get_players_by_game_id(game_id)
-                )
-                found = False
-                for player, user in players_and_users:
-                    del player
-                    if query.from_id == user.id:
-                        found = True
-                        break
-                if not found:
-                    await self.app.store.game.create_player(
-                        user_id=query.from_id,
-                        game_id=game_id,
+                if roster.add(query.from_id):
+                    roster.persist(
+                        query.from_id,
+                        self.app.store.game.create_player(
+                            user_id=query.from_id,
+                            game_id=game_id,
+                        ),
                     )
                     await self.app.store.telegram_api.send_message(
                         Message(
@@ -277,22 +396,56 @@ class BotManager:
                 self.game_states[query.chat_id]["guessing_word"] = True
                 self.input_events[query.chat_id].set()
 
-    async def start_new_game(self, message: UpdateMessage):
-        await self.app.store.game.create_game(message.chat_id)
-        game = await self.app.store.game.get_active_game_by_chat_id(
-            message.chat_id
-        )
-        if game is None:
-            raise Exception("No active game in the chat.")
-            return
-        user = await self.app.store.users.get_by_id(message.from_id)
-        if user is None:
-            await self.app.store.users.create_user(
-                message.from_id, message.username
+    async def restore_chats(self, app: "Application") -> None:
+        """Сверяет реестр чатов с БД при запуске.
+
+        Состояние игр живёт в памяти и после перезапуска потеряно, поэтому
+        оставшиеся активными в БД игры закрываются без начисления итогов.
+        """
+        games = await self.app.store.game.list_active_games()
+        for game in games:
+            if self.chats.phase(game.chat_id) is ChatPhase.IDLE:
+                await self.app.store.game.settle_game(game.id, totals={})
+        if games:
+            self.logger.warning(
+                "closed %s games left active by previous run", len(games)
+            )
+
+    async def _abandon_game(self, chat_id: int, game_id: int) -> None:
+        """Закрывает игру без начисления итогов и освобождает чат.
+
+        Закрытие не прерывается отменой задачи, иначе игра осталась бы
+        активной в БД.
+        """
+        try:
+            await asyncio.shield(
+                self.app.store.game.settle_game(game_id, totals={})
             )
+        except Exception:
+            self.logger.exception("failed to close game %s", game_id)
+        finally:
+            self.chats.finish(chat_id)
 
+    async def start_new_game(self, message: UpdateMessage):
+        game = await self.app.store.game.create_game(message.chat_id)
+        try:
+            question = await self.app.store.game.get_question_by_id(
+                game.question_id
+            )
+            self.chats.start_registration(
+                message.chat_id, game.id, question.text
+            )
+            # Задачи регистрации и игры наследуют поля записей.
+            bind_log_context(game_id=game.id)
+            await self._get_or_create_user(message.from_id, message.username)
+        except BaseException:
+            await self._abandon_game(message.chat_id, game.id)
+            raise
+
+        self.rosters[message.chat_id] = Roster(game.id)
         registration_task = asyncio.create_task(
-            self.handle_registration_period(game.id, message.chat_id)
+            self.handle_registration_period(game.id, message.chat_id),
+            context=untraced_context(),
         )
         self.registration_tasks[message.chat_id] = registration_task
 
@@ -329,15 +482,15 @@ class BotManager:
             )
             await asyncio.sleep(5)
 
-            players = await self.app.store.game.get_players_by_game_id(game_id)
-            if len(players) < 2:
+            roster = self.rosters.pop(chat_id)
+            if len(await roster.wait_persisted()) < 2:
                 await self.app.store.telegram_api.send_message(
                     Message(
                         chat_id=chat_id,
                         text=NOT_ENOUGH_PLAYERS,
                     )
                 )
-                await self.app.store.game.end_game(game_id)
+                await self._abandon_game(chat_id, game_id)
                 return
 
             await self.app.store.telegram_api.send_message(
@@ -352,18 +505,30 @@ class BotManager:
         finally:
             if chat_id in self.registration_tasks:
                 del self.registration_tasks[chat_id]
+            self.rosters.pop(chat_id, None)
+            if self.chats.phase(chat_id) is ChatPhase.REGISTERING:
+                self.logger.warning("registration in chat %s failed", chat_id)
+                await self._abandon_game(chat_id, game_id)
 
     async def start_game_round(self, chat_id: int, game_id: int):
-        game = await self.app.store.game.get_game_by_id(game_id)
-        question = await self.app.store.game.get_question_by_id(
-            game.question_id
-        )
-        players = await self.app.store.game.get_players_by_game_id(game_id)
+        game_round = await self.app.store.game.load_round(game_id)
+        if game_round is None:
+            self.logger.warning("game %s is not active", game_id)
+            await self._abandon_game(chat_id, game_id)
+            return
+        if len(game_round.players) < 2:
+            self.logger.warning("game %s has too few players", game_id)
+            await self.app.store.telegram_api.send_message(
+                Message(chat_id=chat_id, text=NOT_ENOUGH_PLAYERS)
+            )
+            await self._abandon_game(chat_id, game_id)
+            return
 
-        word = question.answer.upper()
+        players = game_round.players
+        word = game_round.answer.upper()
 
         self.game_states[chat_id] = {
-            "question": question.text,
+            "question": game_round.question,
             "word": word,
             "word_state": 0,
             "current_player_idx": 0,
@@ -376,11 +541,15 @@ class BotManager:
             },
             "game_id": game_id,
             "waiting_for_input": False,
+            "turns": 1,
         }
+        self.chats.start_playing(chat_id, game_id)
 
         self.input_events[chat_id] = asyncio.Event()
 
-        game_task = asyncio.create_task(self.run_game(chat_id))
+        game_task = asyncio.create_task(
+            self.run_game(chat_id), context=untraced_context()
+        )
         self.game_tasks[chat_id] = game_task
 
     async def run_game(self, chat_id: int):
@@ -440,6 +609,9 @@ class BotManager:
                                 reply_markup=json.dumps({"force_reply": True}),
                             )
                             game_state["scores"][current_player.user_id] = 0
+                            self.app.store.game_writes.record_player_points(
+                                game_state["game_id"], current_player.id, 0
+                            )
                             await self.next_player(chat_id)
                             continue
                         case 2:
@@ -559,10 +731,11 @@ class BotManager:
                         )
                         game_state["scores"][current_player.user_id] += points
 
-                await self.app.store.game.update_word_state(
+                self.app.store.game_writes.record_word_state(
                     game_state["game_id"], new_word_state
                 )
-                await self.app.store.game.update_player_points(
+                self.app.store.game_writes.record_player_points(
+                    game_state["game_id"],
                     current_player.id,
                     game_state["scores"][current_player.user_id],
                 )
@@ -662,10 +835,12 @@ class BotManager:
         next_player, next_user = game_state["players"][next_idx]
         del next_user
 
-        await self.app.store.game.update_next_player(
-            current_player.id, next_player.id
+        self.app.store.game_writes.record_next_player(
+            game_state["game_id"], current_player.id, next_player.id
         )
         game_state["current_player_idx"] = next_idx
+        game_state["turns"] += 1
+        await self.app.store.game_writes.flush(game_state["game_id"])
 
     @staticmethod
     def get_masked_word(word: str, word_state: int) -> str:
@@ -697,19 +872,27 @@ class BotManager:
     def count_letter(word: str, letter: str) -> int:
         return word.count(letter)
 
+    @staticmethod
+    def _settlement_totals(game_state: dict) -> dict[int, tuple[int, int]]:
+        return {
+            user.id: (game_state["scores"][user.id], 1)
+            for player, user in game_state["players"]
+        }
+
     async def end_game(self, chat_id: int, winner=None):
         try:
             game_state = self.game_states[chat_id]
-
-            for player, user in game_state["players"]:
-                await self.app.store.game.update_user_points_and_score(
-                    user.id,
-                    game_state["scores"][user.id] + user.points,
-                    user.score + 1,
-                )
-                await self.app.store.game.update_player_status(
-                    player.id, in_game=False
-                )
+            await self.app.store.game_writes.flush(game_state["game_id"])
+
+            users = await self.app.store.game.settle_game(
+                game_id=game_state["game_id"],
+                totals=self._settlement_totals(game_state),
+                winner_id=winner.id if winner else None,
+                word_state=(1 << len(game_state["word"])) - 1,
+                turns=game_state["turns"],
+            )
+            self.chats.finish(chat_id)
+            self.app.store.leaderboard.apply(users)
 
             scores_text = "Финальный счёт:\n" + "\n".join(
                 f"@{user.username}: " f"{game_state['scores'][user.id]} очков"
@@ -727,11 +910,6 @@ class BotManager:
                         ),
                     )
                 )
-                await self.app.store.game.end_game(
-                    game_id=game_state["game_id"],
-                    winner_id=winner.id,
-                    word_state=(1 << len(game_state["word"])) - 1,
-                )
             else:
                 await self.app.store.telegram_api.send_message(
                     Message(
@@ -741,11 +919,6 @@ class BotManager:
                         ),
                     )
                 )
-                await self.app.store.game.end_game(
-                    game_id=game_state["game_id"],
-                    winner_id=None,
-                    word_state=(1 << len(game_state["word"])) - 1,
-                )
 
             if chat_id in self.game_tasks:
                 self.game_tasks[chat_id].cancel()
@@ -763,24 +936,18 @@ class BotManager:
 
     async def stop_game(self, chat_id: int):
         try:
-            game = await self.app.store.game.get_active_game_by_chat_id(chat_id)
-            await self.app.store.game.end_game(
-                game_id=game.id,
-                winner_id=None,
-                word_state=game.word_state,
-            )
-
             game_state = self.game_states[chat_id]
+            await self.app.store.game_writes.flush(game_state["game_id"])
 
-            for player, user in game_state["players"]:
-                await self.app.store.game.update_user_points_and_score(
-                    user.id,
-                    game_state["scores"][user.id] + user.points,
-                    user.score + 1,
-                )
-                await self.app.store.game.update_player_status(
-                    player.id, in_game=False
-                )
+            users = await self.app.store.game.settle_game(
+                game_id=game_state["game_id"],
+                totals=self._settlement_totals(game_state),
+                winner_id=None,
+                word_state=game_state["word_state"],
+                turns=game_state["turns"],
+            )
+            self.chats.finish(chat_id)
+            self.app.store.leaderboard.apply(users)
 
             scores_text = "Финальный счёт:\n" + "\n".join(
                 f"@{user.username}: " f"{game_state['scores'][user.id]} очков"
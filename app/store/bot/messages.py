@@ -33,7 +33,8 @@ RULES_MESSAGE = (
     "Побеждает игрок, отгадавший все слово.\n"
     "В игре доступны команды:\n"
     "/question - узнать вопрос в текущей игре\n"
-    "/used - узнать, какие буквы уже назвали"
+    "/used - узнать, какие буквы уже назвали\n"
+    "/top - посмотреть рейтинг игроков"
 )
 
 GAME_ALREADY_ACTIVE = "В этом чате уже идёт игра!"
@@ -47,9 +48,14 @@ NOT_ENOUGH_PLAYERS = "Недостаточно игроков для начал
 GAME_STARTED = "Начинаем!"
 
 PROFILE_MESSAGE = (
-    "Профиль игрока @{username}:\n\nПобед: {score}\nОчков: {points}"
+    "Профиль игрока @{username}:\n\nПобед: {score}\nОчков: {points}\n"
+    "Место в рейтинге: {rank}"
 )
 
+TOP_MESSAGE = "Топ игроков:\n{entries}"
+TOP_ENTRY = "{rank}. @{username} — побед: {score}, очков: {points}"
+TOP_EMPTY = "Рейтинг пока пуст. Сыграйте первую игру командой /play!"
+
 GAME_QUESTION_FORMAT = (
     "Загадка: {question}\nСлово: {masked_word}\nДлина слова: "
     "{word_length} букв"
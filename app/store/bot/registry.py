@@ -0,0 +1,104 @@
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import Enum
+
+from app.base.broadcast import Broadcast
+
+CHAT_SHARDS = 16
+
+
+class ChatPhase(Enum):
+    IDLE = "idle"
+    REGISTERING = "registering"
+    PLAYING = "playing"
+
+
+@dataclass
+class ChatEntry:
+    phase: ChatPhase
+    game_id: int
+    question: str
+    started_at: float = field(default_factory=time.time)
+
+
+def chat_shard(chat_id: int) -> int:
+    return chat_id % CHAT_SHARDS
+
+
+class ChatRegistry:
+    """Фаза каждого чата: регистрация, игра или ничего.
+
+    Источник истины для команд бота. Менеджер меняет фазу только после
+    того, как соответствующее изменение записано в БД.
+
+    Счётчики по фазам и шардам чатов ведутся при каждом переходе, чтобы
+    сводку можно было отдавать без обхода всех чатов. Переходы
+    рассылаются подписчикам events.
+    """
+
+    def __init__(self) -> None:
+        self._chats: dict[int, ChatEntry] = {}
+        self._phases: Counter[ChatPhase] = Counter()
+        self._shards: Counter[int] = Counter()
+        self.events = Broadcast()
+
+    def __len__(self) -> int:
+        return len(self._chats)
+
+    def get(self, chat_id: int) -> ChatEntry | None:
+        return self._chats.get(chat_id)
+
+    def phase(self, chat_id: int) -> ChatPhase:
+        entry = self._chats.get(chat_id)
+        return entry.phase if entry else ChatPhase.IDLE
+
+    def start_registration(
+        self, chat_id: int, game_id: int, question: str
+    ) -> None:
+        self.finish(chat_id)
+        self._chats[chat_id] = ChatEntry(
+            ChatPhase.REGISTERING, game_id, question
+        )
+        self._phases[ChatPhase.REGISTERING] += 1
+        self._shards[chat_shard(chat_id)] += 1
+        self._publish("registration_started", chat_id, game_id)
+
+    def start_playing(self, chat_id: int, game_id: int) -> None:
+        entry = self._chats.get(chat_id)
+        if entry is None or entry.game_id != game_id:
+            raise ValueError(f"chat {chat_id} is not registering {game_id}")
+        self._phases[entry.phase] -= 1
+        entry.phase = ChatPhase.PLAYING
+        self._phases[ChatPhase.PLAYING] += 1
+        self._publish("game_started", chat_id, game_id)
+
+    def finish(self, chat_id: int) -> None:
+        entry = self._chats.pop(chat_id, None)
+        if entry is None:
+            return
+        self._phases[entry.phase] -= 1
+        self._shards[chat_shard(chat_id)] -= 1
+        self._publish("game_finished", chat_id, entry.game_id)
+
+    def count(self, phase: ChatPhase) -> int:
+        return self._phases[phase]
+
+    def oldest(self) -> tuple[int, ChatEntry] | None:
+        # Чаты добавляются в порядке начала игры, а повторный старт
+        # сначала удаляет прежнюю запись.
+        return next(iter(self._chats.items()), None)
+
+    def shards(self) -> list[int]:
+        return [self._shards[shard] for shard in range(CHAT_SHARDS)]
+
+    def _publish(self, event: str, chat_id: int, game_id: int) -> None:
+        if self.events:
+            self.events.publish(
+                {
+                    "event": event,
+                    "chat_id": chat_id,
+                    "game_id": game_id,
+                    "at": time.time(),
+                }
+            )
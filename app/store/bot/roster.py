@@ -0,0 +1,52 @@
+import asyncio
+from collections.abc import Coroutine
+from logging import getLogger
+
+
+class Roster:
+    """Список зарегистрированных на игру пользователей.
+
+    Проверка участия идёт по памяти, а вставки в БД выполняются в фоне;
+    перед стартом игры нужно дождаться их через wait_persisted.
+    """
+
+    def __init__(self, game_id: int) -> None:
+        self.game_id = game_id
+        self.user_ids: set[int] = set()
+        self._pending: dict[asyncio.Task, int] = {}
+        self.logger = getLogger("roster")
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self.user_ids
+
+    def add(self, user_id: int) -> bool:
+        if user_id in self.user_ids:
+            return False
+        self.user_ids.add(user_id)
+        return True
+
+    def persist(self, user_id: int, coro: Coroutine) -> None:
+        task = asyncio.create_task(coro)
+        self._pending[task] = user_id
+        task.add_done_callback(self._pending.pop)
+
+    async def wait_persisted(self) -> set[int]:
+        """Дожидается вставок и возвращает записанных в БД участников.
+
+        Пользователи, чья вставка не удалась, из списка убираются.
+        """
+        pending = dict(self._pending)
+        results = await asyncio.gather(*pending, return_exceptions=True)
+        for user_id, result in zip(pending.values(), results, strict=True):
+            if isinstance(result, Exception):
+                self.logger.error(
+                    "player %s insert failed for game %s",
+                    user_id,
+                    self.game_id,
+                    exc_info=result,
+                )
+                self.user_ids.discard(user_id)
+        return set(self.user_ids)
@@ -0,0 +1,125 @@
+import asyncio
+import typing
+from contextlib import suppress
+from dataclasses import dataclass, field
+
+from app.base.base_accessor import BaseAccessor
+
+if typing.TYPE_CHECKING:
+    from app.web.app import Application
+
+
+@dataclass
+class GameWrites:
+    word_state: int | None = None
+    player_points: dict[int, int] = field(default_factory=dict)
+    next_players: dict[int, int] = field(default_factory=dict)
+
+    def merge(self, newer: "GameWrites") -> None:
+        if newer.word_state is not None:
+            self.word_state = newer.word_state
+        self.player_points.update(newer.player_points)
+        self.next_players.update(newer.next_players)
+
+
+class GameWriteBuffer(BaseAccessor):
+    """Write-behind буфер для изменений игры во время хода.
+
+    Изменения копятся в памяти и записываются одной транзакцией при смене
+    хода, по таймеру, в конце игры и при остановке приложения.
+    """
+
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+
+        self._pending: dict[int, GameWrites] = {}
+        self._lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        app.memory_profiler.track("game_writes", lambda: self._pending)
+        app.metrics.gauge(
+            "bot_pending_game_writes",
+            "Games with buffered writes not yet flushed.",
+            lambda: self.pending_games,
+        )
+
+    async def connect(self, app: "Application") -> None:
+        self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def disconnect(self, app: "Application") -> None:
+        if self._flush_task:
+            self._flush_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._flush_task
+        await self.flush()
+
+    @property
+    def pending_games(self) -> int:
+        return len(self._pending)
+
+    def _writes(self, game_id: int) -> GameWrites:
+        return self._pending.setdefault(game_id, GameWrites())
+
+    def record_word_state(self, game_id: int, word_state: int) -> None:
+        self._writes(game_id).word_state = word_state
+
+    def record_player_points(
+        self, game_id: int, player_id: int, points: int
+    ) -> None:
+        self._writes(game_id).player_points[player_id] = points
+
+    def record_next_player(
+        self, game_id: int, player_id: int, next_player_id: int
+    ) -> None:
+        self._writes(game_id).next_players[player_id] = next_player_id
+
+    async def flush(self, game_id: int | None = None) -> None:
+        async with self._lock:
+            if game_id is None:
+                batch, self._pending = self._pending, {}
+            elif game_id in self._pending:
+                batch = {game_id: self._pending.pop(game_id)}
+            else:
+                return
+
+            if not batch:
+                return
+
+            word_states = {
+                gid: writes.word_state
+                for gid, writes in batch.items()
+                if writes.word_state is not None
+            }
+            player_points = {
+                player_id: points
+                for writes in batch.values()
+                for player_id, points in writes.player_points.items()
+            }
+            next_players = {
+                player_id: next_id
+                for writes in batch.values()
+                for player_id, next_id in writes.next_players.items()
+            }
+            try:
+                # Быстрый путь пишет мимо событий SQLAlchemy, поэтому запись
+                # буфера отмечается в трассе отдельным спаном.
+                with self.app.tracer.span("db flush_game_writes"):
+                    await self.app.store.game.apply_game_writes(
+                        word_states=word_states,
+                        player_points=player_points,
+                        next_players=next_players,
+                    )
+            except Exception:
+                for gid, writes in batch.items():
+                    newer = self._pending.pop(gid, None)
+                    if newer is not None:
+                        writes.merge(newer)
+                    self._pending[gid] = writes
+                raise
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.app.config.game.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                self.logger.exception("game writes flush failed")
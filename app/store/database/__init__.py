@@ -1,3 +1,4 @@
 from app.admin.models import *
 from app.game.models import *
+from app.stats.models import *
 from app.users.models import *
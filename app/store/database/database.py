@@ -1,6 +1,12 @@
+import asyncio
+import time
+from contextlib import suppress
+from contextvars import ContextVar
+from dataclasses import dataclass
+from logging import getLogger
 from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import URL
+from sqlalchemy import URL, event, make_url, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -9,32 +15,251 @@ from sqlalchemy.ext.asyncio import (
 )
 from sqlalchemy.orm import DeclarativeBase
 
+from app.metrics.registry import QUERY_BUCKETS
 from app.store.database import BaseModel
+from app.store.database.query_stats import (
+    QueryStats,
+    elapsed,
+    instrument_engine,
+)
+from app.store.database.slow_queries import (
+    SlowQueryLog,
+    query_origin,
+    remember_origin,
+)
+from app.store.database.versions import (
+    CHANNEL,
+    NOTIFY_CHANGED,
+    CollectionVersions,
+)
 
 if TYPE_CHECKING:
     from app.web.app import Application
 
 
+# Недавно изменённые коллекции, из-за которых задача читает с основной
+# БД, см. read_primary_if_changed.
+_primary_reads: ContextVar[tuple[str, ...]] = ContextVar(
+    "primary_reads", default=()
+)
+
+
+@dataclass
+class Replica:
+    engine: AsyncEngine
+    sessionmaker: async_sessionmaker[AsyncSession]
+    healthy: bool = True
+
+
 class Database:
     def __init__(self, app: "Application", *args, **kwargs) -> None:
         self.app = app
+        self.logger = getLogger("database")
 
         self.engine: AsyncEngine | None = None
         self._db: type[DeclarativeBase] = BaseModel
-        self.session: async_sessionmaker[AsyncSession] | None = None
+        self.sessionmaker: async_sessionmaker[AsyncSession] | None = None
+        self.replicas: list[Replica] = []
+        self.query_stats = QueryStats()
+        self.slow_queries: SlowQueryLog | None = None
+        self.versions = CollectionVersions()
+        app.memory_profiler.track(
+            "slow_queries",
+            lambda: self.slow_queries and self.slow_queries.entries,
+        )
+        self.query_seconds = app.metrics.histogram(
+            "db_query_seconds",
+            "SQL statement time by the method that opened the session.",
+            labels=("method",),
+            buckets=QUERY_BUCKETS,
+        )
+
+        self._next_replica = 0
+        self._last_write = float("-inf")
+        self._health_task: asyncio.Task | None = None
+        self._listen_task: asyncio.Task | None = None
+
+    def _create_engine(self, url: URL) -> AsyncEngine:
+        config = self.app.config.database
+        engine = create_async_engine(
+            url,
+            echo=config.echo,
+            # Кэш скомпилированных запросов SQLAlchemy и кэш подготовленных
+            # запросов asyncpg на каждом соединении.
+            query_cache_size=config.query_cache_size,
+            connect_args={
+                "prepared_statement_cache_size": config.statement_cache_size
+            },
+        )
+        instrument_engine(engine.sync_engine)
+        event.listen(
+            engine.sync_engine, "after_cursor_execute", self._observe_query
+        )
+        self.slow_queries.instrument(engine)
+        return engine
 
     async def connect(self, *args: Any, **kwargs: Any) -> None:
-        self.engine = create_async_engine(
+        config = self.app.config.database
+        self.slow_queries = SlowQueryLog(
+            threshold=config.slow_query_threshold,
+            size=config.slow_query_log_size,
+            analyze=config.slow_query_analyze,
+            explain_interval=config.slow_query_explain_interval,
+        )
+        self.engine = self._create_engine(
             URL.create(
                 drivername="postgresql+asyncpg",
-                username=self.app.config.database.user,
-                password=self.app.config.database.password,
-                host=self.app.config.database.host,
-                database=self.app.config.database.name,
-            ),
-            echo=True,
+                username=config.user,
+                password=config.password,
+                host=config.host,
+                port=config.port,
+                database=config.name,
+            )
         )
-        self.session = AsyncSession(self.engine, expire_on_commit=False)
+        event.listen(self.engine.sync_engine, "commit", self.mark_write)
+        self.sessionmaker = async_sessionmaker(
+            self.engine, expire_on_commit=False
+        )
+
+        for dsn in config.replicas:
+            url = make_url(dsn).set(drivername="postgresql+asyncpg")
+            engine = self._create_engine(url)
+            self.replicas.append(
+                Replica(
+                    engine=engine,
+                    sessionmaker=async_sessionmaker(
+                        engine, expire_on_commit=False
+                    ),
+                )
+            )
+        if self.replicas:
+            self._health_task = asyncio.create_task(
+                self._check_replicas_periodically()
+            )
+        self._listen_task = asyncio.create_task(self._listen_for_changes())
 
     async def disconnect(self, *args: Any, **kwargs: Any) -> None:
+        for task in (self._health_task, self._listen_task):
+            if task:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        await self.slow_queries.close()
+        for replica in self.replicas:
+            await replica.engine.dispose()
         await self.engine.dispose()
+
+    def _observe_query(self, conn, cursor, statement, params, context, *args):
+        origin = query_origin() or "unknown"
+        duration = elapsed(context)
+        self.query_seconds.labels(origin).observe(duration)
+        self.app.tracer.record(f"db {origin}", context.query_started, duration)
+
+    def mark_write(self, *args: Any) -> None:
+        self._last_write = time.monotonic()
+
+    async def notify_changed(
+        self, session: AsyncSession, collection: str
+    ) -> None:
+        """Сообщает всем процессам о записи в коллекцию при коммите."""
+        await session.execute(NOTIFY_CHANGED, {"collection": collection})
+
+    def _on_change(self, conn, pid, channel: str, collection: str) -> None:
+        self.versions.bump(collection)
+
+    def read_primary_if_changed(self, *collections: str) -> None:
+        """Чтения текущей задачи идут на основную БД, если коллекция
+        недавно менялась.
+
+        Реплика может ещё не догнать запись, сменившую версию, и старые
+        данные закэшировались бы под новой версией. Остальные чтения
+        процесса остаются на репликах.
+        """
+        window = self.app.config.database.read_your_writes_window
+        if self.versions.changed_since(time.monotonic() - window, *collections):
+            _primary_reads.set(collections)
+
+    async def _listen_for_changes(self) -> None:
+        interval = self.app.config.database.replica_check_interval
+        while True:
+            try:
+                await self._listen_until_closed()
+            except Exception:
+                self.logger.exception("lost the change notifications")
+            self.versions.bump_all()
+            await asyncio.sleep(interval)
+
+    async def _listen_until_closed(self) -> None:
+        async with self.engine.connect() as conn:
+            raw = (await conn.get_raw_connection()).driver_connection
+            closed = asyncio.Event()
+            raw.add_termination_listener(lambda _: closed.set())
+            await raw.add_listener(CHANNEL, self._on_change)
+            # Пока не слушали, уведомления могли пропасть.
+            self.versions.bump_all()
+            try:
+                await closed.wait()
+            finally:
+                if not raw.is_closed():
+                    await raw.remove_listener(CHANNEL, self._on_change)
+
+    @property
+    def session(self) -> AsyncSession:
+        """Новая сессия основной БД на каждый `async with`.
+
+        Сессии не разделяются между корутинами, поэтому запросы из
+        одновременно обрабатываемых обновлений не мешают друг другу.
+        """
+        remember_origin()
+        return self.sessionmaker()
+
+    @property
+    def read_session(self) -> AsyncSession:
+        """Сессия для запросов только на чтение.
+
+        Реплики выбираются по кругу среди живых. Сразу после записи,
+        после read_primary_if_changed и при отсутствии живых реплик
+        читаем с основной БД.
+        """
+        remember_origin()
+        window = self.app.config.database.read_your_writes_window
+        if _primary_reads.get() or time.monotonic() - self._last_write < window:
+            return self.sessionmaker()
+
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next_replica % len(self.replicas)]
+            self._next_replica += 1
+            if replica.healthy:
+                return replica.sessionmaker()
+
+        return self.sessionmaker()
+
+    async def ping(self, timeout: float) -> bool:
+        try:
+            async with asyncio.timeout(timeout), self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except Exception:
+            self.logger.exception("database is unavailable")
+            return False
+        return True
+
+    async def check_replicas(self) -> None:
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            except Exception:
+                if replica.healthy:
+                    self.logger.exception(
+                        "replica %s is unavailable", replica.engine.url
+                    )
+                replica.healthy = False
+            else:
+                if not replica.healthy:
+                    self.logger.info("replica %s is back", replica.engine.url)
+                replica.healthy = True
+
+    async def _check_replicas_periodically(self) -> None:
+        while True:
+            await self.check_replicas()
+            await asyncio.sleep(self.app.config.database.replica_check_interval)
@@ -0,0 +1,127 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import ExecutionContext
+
+
+@dataclass
+class QueryCounter:
+    label: str
+    statements: int = 0
+    duration: float = 0.0
+    # Внешний счётчик: запрос учитывается во всех вложенных блоках.
+    parent: "QueryCounter | None" = None
+
+
+@dataclass
+class HandlerQueries:
+    updates: int = 0
+    statements: int = 0
+    duration: float = 0.0
+    max_statements: int = 0
+
+
+_current: ContextVar[QueryCounter | None] = ContextVar(
+    "query_counter", default=None
+)
+
+
+@contextmanager
+def track_queries(label: str) -> Iterator[QueryCounter]:
+    """Считает запросы, выполненные в текущем контексте внутри блока.
+
+    Запросы вложенного блока учитываются и во внешних.
+    """
+    counter = QueryCounter(label, parent=_current.get())
+    token = _current.set(counter)
+    try:
+        yield counter
+    finally:
+        _current.reset(token)
+
+
+def count_query(duration: float) -> None:
+    counter = _current.get()
+    while counter is not None:
+        counter.statements += 1
+        counter.duration += duration
+        counter = counter.parent
+
+
+@contextmanager
+def timed_query() -> Iterator[None]:
+    """Учитывает запрос, выполненный мимо SQLAlchemy."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        count_query(time.perf_counter() - started)
+
+
+def elapsed(context: ExecutionContext) -> float:
+    """Время выполнения запроса из событий движка."""
+    return time.perf_counter() - context.query_started
+
+
+def _before_cursor_execute(conn, cursor, statement, params, context, *args):
+    context.query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, params, context, *args):
+    count_query(elapsed(context))
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStats:
+    """Запросы и время в БД по типам обработанных обновлений."""
+
+    def __init__(self) -> None:
+        self.handlers: dict[str, HandlerQueries] = {}
+
+    def record(self, counter: QueryCounter) -> None:
+        stats = self.handlers.setdefault(counter.label, HandlerQueries())
+        stats.updates += 1
+        stats.statements += counter.statements
+        stats.duration += counter.duration
+        stats.max_statements = max(stats.max_statements, counter.statements)
+
+    def render(self) -> str:
+        """Метрики в текстовом формате Prometheus."""
+        metrics = (
+            ("bot_updates_total", "counter", "Handled updates.", "updates"),
+            (
+                "bot_update_queries_total",
+                "counter",
+                "SQL statements executed while handling updates.",
+                "statements",
+            ),
+            (
+                "bot_update_query_seconds_total",
+                "counter",
+                "Time spent in SQL statements while handling updates.",
+                "duration",
+            ),
+            (
+                "bot_update_queries_max",
+                "gauge",
+                "Most SQL statements executed for a single update.",
+                "max_statements",
+            ),
+        )
+        lines = []
+        for name, kind, help_text, field in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for label, stats in sorted(self.handlers.items()):
+                lines.append(
+                    f'{name}{{handler="{label}"}} {getattr(stats, field)}'
+                )
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,182 @@
+import asyncio
+import sys
+import time
+from collections import deque
+from contextvars import Context, ContextVar
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from logging import getLogger
+from typing import Any
+
+from sqlalchemy import QueuePool, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.store.database.query_stats import elapsed
+
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+_origin: ContextVar[str | None] = ContextVar("query_origin", default=None)
+
+
+def remember_origin() -> None:
+    """Запоминает метод, открывший сессию, как источник следующих запросов.
+
+    Вызывается из свойств сессий Database: источник — тот, кто обратился
+    к свойству.
+    """
+    _origin.set(sys._getframe(2).f_code.co_qualname)
+
+
+def query_origin() -> str | None:
+    return _origin.get()
+
+
+def _type_name(value: Any) -> str:
+    if isinstance(value, list | tuple):
+        return f"list[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shape(parameters: Any, *, executemany: bool) -> Any:
+    """Типы параметров запроса без самих значений."""
+    if executemany:
+        if not parameters:
+            return []
+        return {
+            "rows": len(parameters),
+            "row": parameter_shape(parameters[0], executemany=False),
+        }
+    if isinstance(parameters, dict):
+        return {key: _type_name(value) for key, value in parameters.items()}
+    return [_type_name(value) for value in parameters or ()]
+
+
+def pool_saturated(engine: AsyncEngine) -> bool:
+    """Все постоянные соединения пула заняты."""
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        return False
+    return pool.checkedout() >= pool.size()
+
+
+@dataclass
+class SlowQuery:
+    statement: str
+    parameters: Any
+    duration: float
+    origin: str | None
+    at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    plan: list[str] | None = None
+
+
+class SlowQueryLog:
+    """Последние запросы дольше порога вместе с их планами.
+
+    План снимается отдельным соединением в фоне, чтобы не задерживать
+    запрос, который оказался медленным. Одновременно снимается не больше
+    одного плана, запрос объясняется не чаще раза в explain_interval,
+    а при занятом пуле план не снимается вовсе: под нагрузкой EXPLAIN
+    не должен отнимать соединения у обычных запросов.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        size: int,
+        analyze: bool,
+        explain_interval: float = 60.0,
+    ) -> None:
+        self.threshold = threshold
+        self.analyze = analyze
+        self.explain_interval = explain_interval
+        self.entries: deque[SlowQuery] = deque(maxlen=size)
+        self.logger = getLogger("slow_queries")
+        self._tasks: set[asyncio.Task] = set()
+        # Текст запроса -> время последнего EXPLAIN по часам monotonic.
+        self._explained: dict[str, float] = {}
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        def after_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany
+        ):
+            self.check(
+                engine,
+                statement,
+                parameters,
+                executemany=executemany,
+                duration=elapsed(context),
+            )
+
+        event.listen(
+            engine.sync_engine, "after_cursor_execute", after_cursor_execute
+        )
+
+    def check(
+        self,
+        engine: AsyncEngine,
+        statement: str,
+        parameters: Any,
+        *,
+        executemany: bool,
+        duration: float,
+    ) -> None:
+        if duration < self.threshold or statement.startswith("EXPLAIN"):
+            return
+
+        entry = SlowQuery(
+            statement=statement,
+            parameters=parameter_shape(parameters, executemany=executemany),
+            duration=duration,
+            origin=_origin.get(),
+        )
+        self.entries.append(entry)
+        self.logger.warning(
+            "slow query %.3fs from %s: %s", duration, entry.origin, statement
+        )
+
+        if not statement.lstrip().upper().startswith(EXPLAINABLE):
+            return
+        if not self._should_explain(engine, statement):
+            return
+        if executemany:
+            parameters = parameters[0] if parameters else ()
+        # Пустой контекст: план не учитывается в запросах обновления.
+        task = asyncio.get_running_loop().create_task(
+            self._explain(engine, entry, parameters), context=Context()
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _should_explain(self, engine: AsyncEngine, statement: str) -> bool:
+        if self._tasks or pool_saturated(engine):
+            return False
+        now = time.monotonic()
+        self._explained = {
+            explained: at
+            for explained, at in self._explained.items()
+            if now - at < self.explain_interval
+        }
+        if statement in self._explained:
+            return False
+        self._explained[statement] = now
+        return True
+
+    async def _explain(
+        self, engine: AsyncEngine, entry: SlowQuery, parameters: Any
+    ) -> None:
+        # ANALYZE выполняет запрос заново, поэтому только для чтения.
+        reading = entry.statement.lstrip().upper().startswith("SELECT")
+        prefix = "EXPLAIN ANALYZE " if self.analyze and reading else "EXPLAIN "
+        try:
+            async with engine.connect() as conn:
+                res = await conn.exec_driver_sql(
+                    prefix + entry.statement, parameters
+                )
+                entry.plan = [row[0] for row in res]
+        except Exception:
+            self.logger.exception("failed to explain %s", entry.statement)
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,49 @@
+import secrets
+import time
+from collections import defaultdict
+
+from sqlalchemy import bindparam, func, select
+
+CHANNEL = "collection_changed"
+NOTIFY_CHANGED = select(func.pg_notify(CHANNEL, bindparam("collection")))
+
+
+class CollectionVersions:
+    """Номера версий коллекций, меняются при каждой записи в коллекцию.
+
+    Записи из всех процессов приходят через LISTEN/NOTIFY. Эпоха процесса
+    и номер поколения не дают совпасть версиям после перезапуска или
+    потери соединения, пока уведомления могли пропасть.
+    """
+
+    def __init__(self) -> None:
+        self.epoch = secrets.token_hex(4)
+        self.generation = 0
+        self._versions: defaultdict[str, int] = defaultdict(int)
+        self._changed_at: dict[str, float] = {}
+        self._all_changed_at = float("-inf")
+
+    def get(self, collection: str) -> tuple[int, int]:
+        return self.generation, self._versions[collection]
+
+    def bump(self, collection: str) -> None:
+        self._versions[collection] += 1
+        self._changed_at[collection] = time.monotonic()
+
+    def bump_all(self) -> None:
+        self.generation += 1
+        self._all_changed_at = time.monotonic()
+
+    def changed_since(self, moment: float, *collections: str) -> bool:
+        """Менялась ли какая-то из коллекций после moment (time.monotonic)."""
+        if self._all_changed_at >= moment:
+            return True
+        return any(
+            self._changed_at.get(name, float("-inf")) >= moment
+            for name in collections
+        )
+
+    def etag(self, *collections: str) -> str:
+        parts = [self.epoch, str(self.generation)]
+        parts += [f"{name}.{self._versions[name]}" for name in collections]
+        return "-".join(parts)
@@ -1,4 +1,6 @@
+import time
 import typing
+from logging import getLogger
 
 from aiohttp.client import ClientSession
 
@@ -22,16 +24,38 @@ class TelegramApiAccessor(BaseAccessor):
     def __init__(self, app: "Application", *args, **kwargs):
         super().__init__(app, *args, **kwargs)
 
+        self.logger = getLogger("telegram")
         self.token: str | None = None
         self.offset: int | None = None
         self.session: ClientSession | None = None
         self.poller: Poller | None = None
+        self.in_flight = 0
+
+        self.request_seconds = app.metrics.histogram(
+            "telegram_request_seconds",
+            "Bot API request time.",
+            labels=("method",),
+        )
+        self.request_errors = app.metrics.counter(
+            "telegram_request_errors",
+            "Bot API requests that failed or returned ok=false.",
+            labels=("method",),
+        )
+        # Отправка не ставится в очередь: каждое сообщение — свой запрос,
+        # поэтому глубина исходящей очереди — число запросов в полёте.
+        app.metrics.gauge(
+            "telegram_requests_in_flight",
+            "Bot API requests waiting for a response.",
+            lambda: self.in_flight,
+        )
 
     async def connect(self, app: "Application") -> None:
         self.session = ClientSession()
 
         self.token = app.config.bot.token
         self.poller = Poller(app.store)
+
+    async def start_polling(self, app: "Application") -> None:
         self.logger.info("start polling")
         self.poller.start()
 
@@ -43,48 +67,71 @@ class TelegramApiAccessor(BaseAccessor):
     def _build_url(token: str, method: str) -> str:
         return API_PATH + f"bot{token}/{method}"
 
+    async def _request(self, http_method: str, method: str, data: dict):
+        """Запрос к Bot API с учётом времени ответа и ошибок."""
+        started = time.perf_counter()
+        self.in_flight += 1
+        try:
+            async with self.session.request(
+                http_method,
+                self._build_url(token=self.token, method=method),
+                data=data,
+            ) as response:
+                result = await response.json()
+        except Exception:
+            self.request_errors.labels(method).inc()
+            raise
+        finally:
+            self.in_flight -= 1
+            duration = time.perf_counter() - started
+            self.request_seconds.labels(method).observe(duration)
+            self.app.tracer.record(f"telegram {method}", started, duration)
+        if not result.get("ok"):
+            self.request_errors.labels(method).inc()
+            self.logger.warning("%s failed: %s", method, result)
+        else:
+            self.logger.info("%s response: %s", method, result)
+        return result
+
     async def poll(self):
-        async with self.session.get(
-            self._build_url(token=self.token, method="getUpdates"),
-            data={"offset": self.offset},
-        ) as response:
-            data = await response.json()
-            self.logger.info(data)
-
-            updates = []
-            for update in data.get("result", []):
-                self.offset = update["update_id"] + 1
-                if "message" in update:
-                    updates.append(
-                        UpdateObject(
-                            id=update["update_id"],
-                            type="message",
-                            object=UpdateMessage(
-                                id=update["message"]["message_id"],
-                                from_id=update["message"]["from"]["id"],
-                                chat_id=update["message"]["chat"]["id"],
-                                username=update["message"]["from"]["username"],
-                                text=update["message"]["text"],
-                            ),
-                        )
+        data = await self._request(
+            "GET", "getUpdates", data={"offset": self.offset}
+        )
+
+        updates = []
+        for update in data.get("result", []):
+            self.offset = update["update_id"] + 1
+            if "message" in update:
+                updates.append(
+                    UpdateObject(
+                        id=update["update_id"],
+                        type="message",
+                        object=UpdateMessage(
+                            id=update["message"]["message_id"],
+                            from_id=update["message"]["from"]["id"],
+                            chat_id=update["message"]["chat"]["id"],
+                            username=update["message"]["from"]["username"],
+                            text=update["message"]["text"],
+                        ),
                     )
-                elif "callback_query" in update:
-                    query = update["callback_query"]
-                    updates.append(
-                        UpdateObject(
-                            id=update["update_id"],
-                            type="callback_query",
-                            object=CallbackQuery(
-                                id=query["id"],
-                                chat_id=query["message"]["chat"]["id"],
-                                from_id=query["from"]["id"],
-                                username=query["from"]["username"],
-                                data=query["data"],
-                            ),
-                        )
+                )
+            elif "callback_query" in update:
+                query = update["callback_query"]
+                updates.append(
+                    UpdateObject(
+                        id=update["update_id"],
+                        type="callback_query",
+                        object=CallbackQuery(
+                            id=query["id"],
+                            chat_id=query["message"]["chat"]["id"],
+                            from_id=query["from"]["id"],
+                            username=query["from"]["username"],
+                            data=query["data"],
+                        ),
                     )
+                )
 
-            await self.app.store.bots_manager.handle_updates(updates)
+        await self.app.store.bots_manager.handle_updates(updates)
 
     async def send_message(
         self, message: Message, reply_markup: str | None = None
@@ -92,19 +139,14 @@ class TelegramApiAccessor(BaseAccessor):
         data = {"chat_id": message.chat_id, "text": message.text}
         if reply_markup:
             data["reply_markup"] = reply_markup
-        async with self.session.post(
-            self._build_url(token=self.token, method="sendMessage"), data=data
-        ) as response:
-            data = await response.json()
-            self.logger.info(data)
+        await self._request("POST", "sendMessage", data=data)
 
     async def send_callback_answer(self, callback_answer: CallbackAnswer):
-        async with self.session.post(
-            self._build_url(token=self.token, method="answerCallbackQuery"),
+        await self._request(
+            "POST",
+            "answerCallbackQuery",
             data={
                 "text": callback_answer.text,
                 "callback_query_id": callback_answer.callback_id,
             },
-        ) as response:
-            data = await response.json()
-            self.logger.info(data)
+        )
@@ -1,4 +1,5 @@
 import asyncio
+import time
 from asyncio import Task
 from logging import getLogger
 
@@ -10,6 +11,8 @@ class Poller:
         self.store = store
         self.is_running = False
         self.poll_task: Task | None = None
+        self.last_poll: float | None = None
+        self.restarts = 0
         self.logger = getLogger("poller")
 
     def _done_callback(self, result: Task) -> None:
@@ -18,6 +21,7 @@ class Poller:
                 "poller stopped with exception", exc_info=result.exception()
             )
         if self.is_running:
+            self.restarts += 1
             self.start()
 
     def start(self) -> None:
@@ -29,8 +33,20 @@ class Poller:
     async def stop(self) -> None:
         self.is_running = False
 
-        await self.poll_task
+        if self.poll_task:
+            await self.poll_task
 
     async def poll(self) -> None:
         while self.is_running:
             await self.store.telegram_api.poll()
+            self.last_poll = time.monotonic()
+
+    def alive(self, max_age: float) -> bool:
+        """Опрос запущен и последний getUpdates завершился недавно."""
+        return (
+            self.is_running
+            and self.poll_task is not None
+            and not self.poll_task.done()
+            and self.last_poll is not None
+            and time.monotonic() - self.last_poll <= max_age
+        )
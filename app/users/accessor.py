@@ -1,29 +1,171 @@
-from sqlalchemy import insert, select
+import typing
+from collections.abc import AsyncIterator
+
+from sqlalchemy import bindparam, or_, select
+from sqlalchemy.dialects.postgresql import insert
 
 from app.base.base_accessor import BaseAccessor
+from app.base.cache import LRUCache
+from app.base.coalesce import BatchLoader
+from app.base.pagination import Page, keyset, make_page
 from app.users.models import UserModel
 
+if typing.TYPE_CHECKING:
+    from app.web.app import Application
+
+USER_BY_ID = select(UserModel).where(UserModel.id == bindparam("user_id"))
+USERS_BY_IDS = select(UserModel).where(
+    UserModel.id.in_(bindparam("user_ids", expanding=True))
+)
+EXPORT_BATCH_SIZE = 1000
+# Ключи сортировки списка пользователей; id в конце делает порядок
+# однозначным. Под каждый ключ есть индекс.
+USER_SORTS = {
+    "id": ("id",),
+    "score": ("score", "id"),
+    "points": ("points", "id"),
+}
+
 
 class UserAccessor(BaseAccessor):
-    async def create_user(self, user_id: int, username: str) -> None:
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+
+        self.cache = LRUCache(
+            max_size=app.config.cache.users_max_size,
+            ttl=app.config.cache.users_ttl,
+        )
+        self.loader = BatchLoader(self._fetch_many)
+        app.memory_profiler.track("users_cache", lambda: self.cache)
+
+    async def connect(self, app: "Application") -> None:
+        app.metrics.cache("users_cache", self.cache)
+
+    async def create_user(self, user_id: int, username: str) -> UserModel:
         request = insert(UserModel).values(
             id=user_id, username=username, role="player", score=0, points=0
         )
+        request = request.on_conflict_do_update(
+            index_elements=[UserModel.id],
+            set_={"username": request.excluded.username},
+            where=UserModel.username.is_distinct_from(
+                request.excluded.username
+            ),
+        ).returning(UserModel)
         async with self.app.database.session as session:
-            await session.execute(request)
+            res = await session.execute(request)
+            user = res.scalar_one_or_none()
+            if user is not None:
+                await self.app.database.notify_changed(session, "users")
             await session.commit()
 
+        if user is None:
+            # Пользователь уже есть и имя не менялось.
+            user = await self._fetch_by_id(user_id)
+        self.remember_users([user])
+        return user
+
     async def get_by_id(self, user_id: int) -> UserModel | None:
-        request = select(UserModel).where(UserModel.id == user_id)
+        user = self.cache.get(user_id)
+        if user is not None:
+            return user
+
+        user = await self.loader.load(user_id)
+        if user is not None:
+            self.cache.put(user_id, user)
+        return user
+
+    async def _fetch_many(self, user_ids: list[int]) -> dict[int, UserModel]:
         async with self.app.database.session as session:
-            res = await session.execute(request)
+            res = await session.execute(USERS_BY_IDS, {"user_ids": user_ids})
+            return {user.id: user for user in res.scalars()}
+
+    async def _fetch_by_id(self, user_id: int) -> UserModel | None:
+        async with self.app.database.session as session:
+            res = await session.execute(USER_BY_ID, {"user_id": user_id})
             row = res.first()
             if row is not None:
                 return row[0]
 
         return None
 
-    async def list_users(self):
+    def remember_users(self, users: typing.Iterable[UserModel]) -> None:
+        for user in users:
+            self.cache.put(user.id, user)
+
+    async def list_users(
+        self,
+        *,
+        limit: int = 100,
+        sort: str = "id",
+        desc: bool = False,
+        after: list | None = None,
+        role: str | None = None,
+        username: str | None = None,
+    ) -> Page:
+        request = select(UserModel)
+        if role is not None:
+            request = request.where(UserModel.role == role)
+        if username:
+            request = request.where(
+                UserModel.username.startswith(username, autoescape=True)
+            )
+        keys = USER_SORTS[sort]
+        request = keyset(
+            request,
+            [getattr(UserModel, key) for key in keys],
+            after=after,
+            limit=limit,
+            desc=desc,
+        )
+        async with self.app.database.read_session as session:
+            res = await session.execute(request)
+            return make_page(res.scalars().all(), keys, limit)
+
+    async def iter_users(
+        self, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[dict]:
+        request = select(UserModel.__table__).execution_options(
+            yield_per=batch_size
+        )
+        async with self.app.database.read_session as session:
+            res = await session.stream(request)
+            async for row in res.mappings():
+                yield dict(row)
+
+    async def iter_ranked_users(
+        self, batch_size: int = 10_000
+    ) -> AsyncIterator[tuple[int, str, int, int]]:
+        request = (
+            select(
+                UserModel.id,
+                UserModel.username,
+                UserModel.score,
+                UserModel.points,
+            )
+            .where(or_(UserModel.score > 0, UserModel.points > 0))
+            .execution_options(yield_per=batch_size)
+        )
+        # Рейтинг в памяти дальше обновляется только по итогам игр,
+        # поэтому загружаем его с основной БД, а не с отстающей реплики.
         async with self.app.database.session as session:
-            res = await session.execute(select(UserModel))
-            return res.all()
+            res = await session.stream(request)
+            async for user_id, username, score, points in res:
+                yield user_id, username, score, points
+
+    async def top_users(
+        self, limit: int = 10, offset: int = 0
+    ) -> list[UserModel]:
+        request = (
+            select(UserModel)
+            .order_by(
+                UserModel.score.desc(),
+                UserModel.points.desc(),
+                UserModel.id,
+            )
+            .limit(limit)
+            .offset(offset)
+        )
+        async with self.app.database.read_session as session:
+            res = await session.execute(request)
+            return list(res.scalars().all())
@@ -0,0 +1,112 @@
+import typing
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from app.base.base_accessor import BaseAccessor
+
+if typing.TYPE_CHECKING:
+    from app.web.app import Application
+
+
+class LeaderboardEntry(NamedTuple):
+    rank: int
+    user_id: int
+    username: str
+    score: int
+    points: int
+
+
+class Leaderboard:
+    """Отсортированный рейтинг игроков: сначала по победам, затем по очкам.
+
+    Хранятся только игроки с ненулевыми победами или очками, все остальные
+    делят последнее место. Поиск места — бинарный, обновление — вставка
+    в отсортированный список: сдвиг O(n), но это один memmove, и при
+    десятках тысяч игроков он занимает микросекунды.
+    """
+
+    def __init__(self) -> None:
+        self._keys: list[tuple[int, int, int]] = []
+        self._by_user: dict[int, tuple[int, int, int]] = {}
+        self._usernames: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @staticmethod
+    def _key(user_id: int, score: int, points: int) -> tuple[int, int, int]:
+        return -score, -points, user_id
+
+    def load(self, users: Iterable[tuple[int, str, int, int]]) -> None:
+        self._by_user = {}
+        self._usernames = {}
+        for user_id, username, score, points in users:
+            if score or points:
+                self._by_user[user_id] = self._key(user_id, score, points)
+                self._usernames[user_id] = username
+        self._keys = sorted(self._by_user.values())
+
+    def update(
+        self, user_id: int, username: str, score: int, points: int
+    ) -> None:
+        old_key = self._by_user.pop(user_id, None)
+        if old_key is not None:
+            del self._keys[bisect_left(self._keys, old_key)]
+
+        if score or points:
+            key = self._key(user_id, score, points)
+            self._by_user[user_id] = key
+            self._usernames[user_id] = username
+            insort(self._keys, key)
+        else:
+            self._usernames.pop(user_id, None)
+
+    def rank(self, user_id: int) -> int:
+        key = self._by_user.get(user_id)
+        if key is None:
+            return len(self._keys) + 1
+        # Игроки с одинаковыми победами и очками делят одно место.
+        return bisect_left(self._keys, key[:2]) + 1
+
+    def top(self, limit: int = 10) -> list[LeaderboardEntry]:
+        entries = []
+        for score, points, user_id in self._keys[:limit]:
+            entries.append(
+                LeaderboardEntry(
+                    rank=bisect_left(self._keys, (score, points)) + 1,
+                    user_id=user_id,
+                    username=self._usernames[user_id],
+                    score=-score,
+                    points=-points,
+                )
+            )
+        return entries
+
+
+class LeaderboardAccessor(BaseAccessor):
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+
+        self.leaderboard = Leaderboard()
+        app.memory_profiler.track("leaderboard", lambda: self.leaderboard)
+
+    async def connect(self, app: "Application") -> None:
+        self.leaderboard.load(
+            [row async for row in self.app.store.users.iter_ranked_users()]
+        )
+        self.logger.info(
+            "leaderboard loaded: %s players", len(self.leaderboard)
+        )
+
+    def apply(self, users: Iterable) -> None:
+        for user in users:
+            self.leaderboard.update(
+                user.id, user.username, user.score, user.points
+            )
+
+    def rank(self, user_id: int) -> int:
+        return self.leaderboard.rank(user_id)
+
+    def top(self, limit: int = 10) -> list[LeaderboardEntry]:
+        return self.leaderboard.top(limit)
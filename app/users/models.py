@@ -1,4 +1,4 @@
-from sqlalchemy import BigInteger, Column, String
+from sqlalchemy import BigInteger, Column, Index, String
 from sqlalchemy.orm import relationship
 
 from app.game.models import GameModel, PlayerModel
@@ -11,7 +11,25 @@ class UserModel(BaseModel):
     id = Column(BigInteger, primary_key=True, unique=True)
     username = Column(String, unique=True)
     role = Column(String, nullable=False, default="player")
-    score = Column(BigInteger, default=0)
-    points = Column(BigInteger, default=0)
+    score = Column(BigInteger, nullable=False, default=0, server_default="0")
+    points = Column(BigInteger, nullable=False, default=0, server_default="0")
     players = relationship(PlayerModel, uselist=True)
     wins = relationship(GameModel, uselist=True)
+
+
+Index(
+    "ix_users_leaderboard",
+    UserModel.score.desc(),
+    UserModel.points.desc(),
+    UserModel.id,
+)
+
+# Постраничный список пользователей по ключам (score, id) и (points, id),
+# поиск по началу имени.
+Index("ix_users_score_id", UserModel.score, UserModel.id)
+Index("ix_users_points_id", UserModel.points, UserModel.id)
+Index(
+    "ix_users_username_prefix",
+    UserModel.username,
+    postgresql_ops={"username": "varchar_pattern_ops"},
+)
@@ -2,9 +2,13 @@ from aiohttp.web_app import Application
 
 __all__ = ("setup_routes",)
 
+from app.users.views.export import UserExportView
+from app.users.views.leaderboard import LeaderboardView
 from app.users.views.list_users import UserListView
 from app.web.app import app
 
 
 def setup_routes(application: Application):
     app.router.add_view("/users.list_users", UserListView)
+    app.router.add_view("/users.leaderboard", LeaderboardView)
+    app.router.add_view("/users.export", UserExportView)
@@ -1,4 +1,6 @@
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, validate
+
+from app.base.pagination import Cursor
 
 
 class UserSchema(Schema):
@@ -11,3 +13,30 @@ class UserSchema(Schema):
 
 class ListUserSchema(Schema):
     users = fields.Nested("UserSchema", many=True)
+    next_cursor = fields.Str(allow_none=True)
+
+
+class ListUserQuerySchema(Schema):
+    limit = fields.Int(load_default=100, validate=validate.Range(1, 1000))
+    sort = fields.Str(
+        load_default="id", validate=validate.OneOf(["id", "score", "points"])
+    )
+    order = fields.Str(
+        load_default="asc", validate=validate.OneOf(["asc", "desc"])
+    )
+    cursor = Cursor(load_default=None)
+    role = fields.Str()
+    username = fields.Str()
+
+
+class LeaderboardQuerySchema(Schema):
+    limit = fields.Int(load_default=10, validate=validate.Range(1, 100))
+    offset = fields.Int(load_default=0, validate=validate.Range(min=0))
+
+
+class LeaderboardEntrySchema(UserSchema):
+    rank = fields.Int(required=True)
+
+
+class LeaderboardSchema(Schema):
+    users = fields.Nested("LeaderboardEntrySchema", many=True)
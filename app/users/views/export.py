@@ -0,0 +1,22 @@
+from aiohttp_apispec import docs, querystring_schema
+
+from app.web.app import View
+from app.web.mixins import AuthRequiredMixin
+from app.web.schemes import ExportQuerySchema
+from app.web.utils import ndjson_response
+
+
+class UserExportView(AuthRequiredMixin, View):
+    @docs(
+        tags=["Users"],
+        summary="Export users",
+        description="Stream all users as NDJSON, optionally gzipped.",
+    )
+    @querystring_schema(ExportQuerySchema)
+    async def get(self):
+        return await ndjson_response(
+            self.request,
+            self.store.users.iter_users(),
+            "users",
+            compress=self.data["gzip"],
+        )
@@ -0,0 +1,41 @@
+from aiohttp_apispec import docs, querystring_schema, response_schema
+
+from app.users.schema import (
+    LeaderboardEntrySchema,
+    LeaderboardQuerySchema,
+    LeaderboardSchema,
+)
+from app.web.app import View
+from app.web.mixins import AuthRequiredMixin
+from app.web.serializers import serializer
+from app.web.utils import list_response
+
+
+class LeaderboardView(AuthRequiredMixin, View):
+    @docs(
+        tags=["Users"],
+        summary="Leaderboard",
+        description="Get players ordered by wins and points.",
+    )
+    @querystring_schema(LeaderboardQuerySchema)
+    @response_schema(LeaderboardSchema, 200)
+    async def get(self):
+        limit = self.data["limit"]
+        offset = self.data["offset"]
+        users = await self.store.users.top_users(limit=limit, offset=offset)
+
+        # Место с учётом ничьих, как в /top: равные делят одно место.
+        entries = [
+            {
+                "rank": self.store.leaderboard.rank(user.id),
+                "id": user.id,
+                "username": user.username,
+                "score": user.score,
+                "points": user.points,
+                "role": user.role,
+            }
+            for user in users
+        ]
+        return await list_response(
+            "users", serializer(LeaderboardEntrySchema), entries
+        )
@@ -1,25 +1,53 @@
-from aiohttp_apispec import docs, response_schema
+from aiohttp.web_exceptions import HTTPBadRequest
+from aiohttp_apispec import docs, querystring_schema, response_schema
 
+from app.base.pagination import cursor_key, encode_cursor
+from app.users.accessor import USER_SORTS
 from app.users.schema import (
+    ListUserQuerySchema,
     ListUserSchema,
     UserSchema,
 )
 from app.web.app import View
-from app.web.mixins import AuthRequiredMixin
-from app.web.utils import json_response
+from app.web.mixins import AuthRequiredMixin, ConditionalGetMixin
+from app.web.serializers import serializer
+from app.web.utils import list_response
 
 
-class UserListView(AuthRequiredMixin, View):
+class UserListView(AuthRequiredMixin, ConditionalGetMixin, View):
+    collections = ("users",)
+
     @docs(
         tags=["Users"],
         summary="Users list",
-        description="Get list of users.",
+        description="Get a page of users. "
+        "Pass next_cursor to get the next one.",
     )
+    @querystring_schema(ListUserQuerySchema)
     @response_schema(ListUserSchema, 200)
     async def get(self):
-        users = await self.request.app.store.users.list_users()
-        if not users:
-            return json_response(data={"users": users})
+        sort = f"{self.data['sort']} {self.data['order']}"
+        try:
+            after = cursor_key(
+                self.data["cursor"], sort, len(USER_SORTS[self.data["sort"]])
+            )
+        except ValueError as e:
+            raise HTTPBadRequest(reason=str(e)) from e
 
-        raw_users = [UserSchema().dump(user[0]) for user in users]
-        return json_response(data={"users": raw_users})
+        page = await self.store.users.list_users(
+            limit=self.data["limit"],
+            sort=self.data["sort"],
+            desc=self.data["order"] == "desc",
+            after=after,
+            role=self.data.get("role"),
+            username=self.data.get("username"),
+        )
+        next_cursor = None
+        if page.next_key is not None:
+            next_cursor = encode_cursor({"sort": sort, "key": page.next_key})
+        return await list_response(
+            "users",
+            serializer(UserSchema),
+            page.items,
+            {"next_cursor": next_cursor},
+        )
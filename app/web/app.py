@@ -8,11 +8,14 @@ from aiohttp_session import setup as session_setup
 from aiohttp_session.cookie_storage import EncryptedCookieStorage
 
 from app.admin.models import AdminModel
+from app.base.profiling import setup_profiling
+from app.base.tracing import setup_tracing
+from app.metrics import setup_metrics
 from app.store import Database, Store, setup_store
 from app.web.config import setup_config
 from app.web.logger import setup_logging
 from app.web.mw import setup_middlewares
-from app.web.routes import setup_routes
+from app.web.routes import setup_bot_manager_routes, setup_routes
 
 __all__ = ("Application",)
 
@@ -21,6 +24,10 @@ class Application(AiohttpApplication):
     config = None
     store = None
     database = None
+    metrics = None
+    tracer = None
+    cpu_profiler = None
+    memory_profiler = None
 
 
 class Request(AiohttpRequest):
@@ -53,8 +60,8 @@ app = Application()
 
 
 def setup_admin_api(config_path: str) -> Application:
-    setup_logging(app)
     setup_config(app, config_path)
+    setup_logging(app)
     session_setup(app, EncryptedCookieStorage(app.config.session.key))
     setup_routes(app)
     setup_aiohttp_apispec(
@@ -64,12 +71,19 @@ def setup_admin_api(config_path: str) -> Application:
         swagger_path="/docs",
     )
     setup_middlewares(app)
+    setup_metrics(app)
+    setup_tracing(app)
+    setup_profiling(app)
     setup_store(app, "admin-api")
     return app
 
 
 def setup_bot_manager(config_path: str) -> Application:
-    setup_logging(app)
     setup_config(app, config_path)
+    setup_logging(app)
+    setup_bot_manager_routes(app)
+    setup_metrics(app)
+    setup_tracing(app)
+    setup_profiling(app)
     setup_store(app, "bot-manager")
     return app
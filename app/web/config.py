@@ -1,5 +1,5 @@
 import typing
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import yaml
 
@@ -19,6 +19,20 @@ class DatabaseConfig:
     user: str
     password: str
     name: str
+    statement_cache_size: int = 100
+    query_cache_size: int = 500
+    replicas: list[str] = field(default_factory=list)
+    replica_check_interval: float = 5.0
+    read_your_writes_window: float = 2.0
+    # Запросы дольше порога (в секундах) попадают в журнал с планом.
+    slow_query_threshold: float = 0.5
+    slow_query_log_size: int = 100
+    slow_query_analyze: bool = False
+    # Один и тот же запрос объясняется не чаще раза в интервал (секунды).
+    slow_query_explain_interval: float = 60.0
+    # Логировать каждый запрос; удобнее включать через logging.levels
+    # для sqlalchemy.engine.
+    echo: bool = False
 
 
 @dataclass
@@ -32,12 +46,89 @@ class AdminConfig:
     password: str
 
 
+@dataclass
+class GameConfig:
+    flush_interval: float = 1.0
+    # Записи хода напрямую через asyncpg, минуя SQLAlchemy.
+    fast_path: bool = False
+    archive_after_months: int = 12
+    archive_interval: float = 3600.0
+    # detach — перенести секции в схему archive, drop — удалить.
+    archive_mode: str = "detach"
+    # Через сколько секунд после завершения игра переносится в историю.
+    archive_move_after: float = 3600.0
+    archive_batch_size: int = 1000
+    # На сколько месяцев вперёд секции истории создаются заранее.
+    archive_months_ahead: int = 3
+
+
+@dataclass
+class CacheConfig:
+    users_max_size: int = 10_000
+    users_ttl: float = 60.0
+    # Кэш готовых ответов списков в admin API; 0 — без кэша.
+    responses_max_size: int = 0
+    responses_ttl: float = 300.0
+    responses_max_body: int = 1_000_000
+
+
+@dataclass
+class InternalConfig:
+    # Пустой токен закрывает внутренние ручки.
+    token: str = ""
+    # Опрос Telegram считается живым, если завершался не позже, чем
+    # столько секунд назад.
+    poll_max_age: float = 60.0
+    db_ping_timeout: float = 1.0
+
+
+@dataclass
+class LoggingConfig:
+    level: str = "INFO"
+    # JSON по строке на запись; False — обычный текстовый формат.
+    json: bool = True
+    # Уровни отдельных логгеров: {"database": "WARNING"}.
+    levels: dict[str, str] = field(default_factory=dict)
+    # Каждая n-я запись одного шаблона от логгера, ниже WARNING.
+    sample: dict[str, int] = field(default_factory=lambda: {"telegram": 100})
+
+
+@dataclass
+class TracingConfig:
+    # Доля обновлений, для которых пишутся спаны.
+    sample_rate: float = 0.01
+    buffer_size: int = 10_000
+    # Куда выгрузить буфер при остановке; пусто — не выгружать.
+    export_path: str = ""
+    # json или chrome.
+    export_format: str = "chrome"
+
+
+@dataclass
+class ProfilingConfig:
+    # Период снятия стека профилировщиком CPU, секунды.
+    cpu_interval: float = 0.01
+    # Профилировщик, который забыли остановить, выключается сам.
+    cpu_max_duration: float = 300.0
+    # Глубина стека выделений памяти в tracemalloc.
+    memory_frames: int = 10
+    memory_top: int = 30
+    # Предел объектов при подсчёте размера одной структуры.
+    memory_max_objects: int = 1_000_000
+
+
 @dataclass
 class Config:
     admin: AdminConfig | None = None
     bot: BotConfig | None = None
     database: DatabaseConfig | None = None
     session: SessionConfig | None = None
+    game: GameConfig | None = None
+    cache: CacheConfig | None = None
+    internal: InternalConfig | None = None
+    logging: LoggingConfig | None = None
+    tracing: TracingConfig | None = None
+    profiling: ProfilingConfig | None = None
 
 
 def setup_config(app: "Application", config_path: str):
@@ -56,4 +147,10 @@ def setup_config(app: "Application", config_path: str):
             token=raw_config["store"]["telegram"]["token"],
         ),
         database=DatabaseConfig(**raw_config["database"]),
+        game=GameConfig(**raw_config.get("game", {})),
+        cache=CacheConfig(**raw_config.get("cache", {})),
+        internal=InternalConfig(**raw_config.get("internal", {})),
+        logging=LoggingConfig(**raw_config.get("logging", {})),
+        tracing=TracingConfig(**raw_config.get("tracing", {})),
+        profiling=ProfilingConfig(**raw_config.get("profiling", {})),
     )
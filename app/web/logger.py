@@ -1,9 +1,117 @@
+import atexit
+import copy
+import json
 import logging
+import queue
 import typing
+from collections import Counter
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
 
 if typing.TYPE_CHECKING:
     from app.web.app import Application
+    from app.web.config import LoggingConfig
 
+# Поля записи, которых нет у LogRecord: chat_id, game_id и т.п.
+log_context: ContextVar[dict[str, typing.Any]] = ContextVar(
+    "log_context", default={}
+)
 
-def setup_logging(_: "Application") -> None:
-    logging.basicConfig(level=logging.INFO)
+
+def bind_log_context(**values: typing.Any) -> None:
+    """Добавляет поля ко всем записям текущего контекста и его задач."""
+    log_context.set({**log_context.get(), **values})
+
+
+_exceptions = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **getattr(record, "context", {}),
+        }
+        if sample := getattr(record, "sample", None):
+            data["sample"] = sample
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает каждую n-ю запись одного шаблона от шумного логгера.
+
+    Предупреждения и ошибки проходят всегда.
+    """
+
+    def __init__(self, rates: dict[str, int]) -> None:
+        super().__init__()
+        self.rates = rates
+        self._seen: Counter[tuple[str, str]] = Counter()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.name)
+        if rate is None or record.levelno >= logging.WARNING:
+            return True
+        key = record.name, str(record.msg)
+        self._seen[key] += 1
+        if (self._seen[key] - 1) % rate:
+            return False
+        record.sample = rate
+        return True
+
+
+class ContextQueueHandler(QueueHandler):
+    """Передаёт записи в поток логирования.
+
+    Как и QueueHandler, запись фиксируется в цикле событий: текст
+    сообщения и трассировка исключения собираются сразу, пока аргументы
+    не изменились, а ссылки на них отбрасываются. Вместе с ними
+    захватывается контекст; в потоке QueueListener остаются только
+    кодирование и запись.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = _exceptions.formatException(record.exc_info)
+        record = copy.copy(record)
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exc_text
+        record.context = log_context.get()
+        return record
+
+
+def setup_logging(app: "Application") -> None:
+    config: LoggingConfig = app.config.logging
+
+    stream = logging.StreamHandler()
+    stream.setFormatter(
+        JsonFormatter()
+        if config.json
+        else logging.Formatter(logging.BASIC_FORMAT)
+    )
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    handler = ContextQueueHandler(records)
+    handler.addFilter(SamplingFilter(config.sample))
+    listener = QueueListener(records, stream)
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(config.level)
+    for name, level in config.levels.items():
+        logging.getLogger(name).setLevel(level)
+
+    listener.start()
+    # Очередь дописывается при выходе, после остановки приложения.
+    atexit.register(listener.stop)
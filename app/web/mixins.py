@@ -1,5 +1,8 @@
+import hmac
+
 from aiohttp.abc import StreamResponse
 from aiohttp.web_exceptions import HTTPUnauthorized
+from aiohttp.web_response import Response
 from aiohttp_session import get_session
 
 
@@ -9,3 +12,48 @@ class AuthRequiredMixin:
         if not session.get("admin"):
             raise HTTPUnauthorized
         return await super()._iter()
+
+
+class InternalTokenMixin:
+    async def _iter(self) -> StreamResponse:
+        token = self.request.app.config.internal.token
+        header = self.request.headers.get("Authorization", "")
+        if not token or not hmac.compare_digest(header, f"Bearer {token}"):
+            raise HTTPUnauthorized
+        return await super()._iter()
+
+
+class ConditionalGetMixin:
+    """ETag по версиям коллекций, из которых собирается ответ.
+
+    На совпавший If-None-Match отвечаем 304, не обращаясь к БД. Ответы
+    той же версии отдаются из кэша процесса, если он включён.
+    """
+
+    collections: tuple[str, ...] = ()
+
+    async def _iter(self) -> StreamResponse:
+        if self.request.method != "GET":
+            return await super()._iter()
+
+        app = self.request.app
+        etag = app.database.versions.etag(*self.collections)
+        for tag in self.request.if_none_match or ():
+            if tag.value in (etag, "*"):
+                response = Response(status=304)
+                response.etag = etag
+                return response
+
+        key = (self.request.path_qs, etag)
+        body = app.store.responses.get(key)
+        if body is not None:
+            response = Response(body=body, content_type="application/json")
+        else:
+            app.database.read_primary_if_changed(*self.collections)
+            response = await super()._iter()
+            if response.status != 200:
+                return response
+            if len(response.body) <= app.config.cache.responses_max_body:
+                app.store.responses.put(key, response.body)
+        response.etag = etag
+        return response
@@ -4,8 +4,26 @@ from aiohttp.web_app import Application
 def setup_routes(app: Application):
     from app.admin.routes import setup_routes as admin_setup_routes
     from app.game.routes import setup_routes as game_setup_routes
+    from app.internal.routes import setup_routes as internal_setup_routes
+    from app.metrics.routes import setup_routes as metrics_setup_routes
+    from app.stats.routes import setup_routes as stats_setup_routes
     from app.users.routes import setup_routes as users_setup_routes
 
     admin_setup_routes(app)
     game_setup_routes(app)
     users_setup_routes(app)
+    stats_setup_routes(app)
+    internal_setup_routes(app)
+    metrics_setup_routes(app)
+
+
+def setup_bot_manager_routes(app: Application):
+    from app.internal.routes import (
+        setup_bot_manager_routes as internal_bot_manager_routes,
+        setup_routes as internal_setup_routes,
+    )
+    from app.metrics.routes import setup_routes as metrics_setup_routes
+
+    metrics_setup_routes(app)
+    internal_setup_routes(app)
+    internal_bot_manager_routes(app)
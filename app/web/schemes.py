@@ -0,0 +1,5 @@
+from marshmallow import Schema, fields
+
+
+class ExportQuerySchema(Schema):
+    gzip = fields.Bool(load_default=False)
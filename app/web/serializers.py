@@ -0,0 +1,56 @@
+from collections.abc import Iterable, Mapping
+from functools import cache, partial
+from typing import Any
+
+from marshmallow import Schema, fields
+from marshmallow.utils import missing
+
+# Поля, значение которых можно привести без обхода схемы Marshmallow.
+CONVERTERS = {
+    fields.Integer: int,
+    fields.String: str,
+    fields.Float: float,
+    fields.Boolean: bool,
+}
+
+
+class Serializer:
+    """Сериализатор схемы, собранный один раз.
+
+    Плоские схемы из простых полей выгружаются напрямую: атрибут
+    объекта (или ключ словаря) и приведение типа, как у поля схемы.
+    Остальные схемы выгружаются через один экземпляр Marshmallow.
+    """
+
+    def __init__(self, schema_cls: type[Schema]) -> None:
+        self.schema = schema_cls()
+        self.fields: list[tuple[str, str, Any]] | None = []
+        for name, field in self.schema.dump_fields.items():
+            converter = CONVERTERS.get(type(field))
+            if converter is None:
+                self.fields = None
+                break
+            self.fields.append((name, field.attribute or name, converter))
+
+    def dump(self, obj: Any) -> dict:
+        if self.fields is None:
+            return self.schema.dump(obj)
+
+        # Как у Marshmallow: поля без атрибута или ключа не выгружаются.
+        get = obj.get if isinstance(obj, Mapping) else partial(getattr, obj)
+        result = {}
+        for name, key, convert in self.fields:
+            value = get(key, missing)
+            if value is not missing:
+                result[name] = None if value is None else convert(value)
+        return result
+
+    def dump_many(self, objs: Iterable[Any]) -> list[dict]:
+        if self.fields is None:
+            return self.schema.dump(objs, many=True)
+        return [self.dump(obj) for obj in objs]
+
+
+@cache
+def serializer(schema_cls: type[Schema]) -> Serializer:
+    return Serializer(schema_cls)
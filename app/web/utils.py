@@ -1,31 +1,84 @@
+import asyncio
 import base64
+import json
+import zlib
+from collections.abc import AsyncIterator, Sequence
+from datetime import date
+from enum import Enum
+from typing import Any
 
-from aiohttp.web import json_response as aiohttp_json_response
-from aiohttp.web_response import Response
+from aiohttp.web_request import BaseRequest
+from aiohttp.web_response import Response, StreamResponse
+
+from app.web.serializers import Serializer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+# Списки от этого размера собираются в потоке, а не в цикле событий.
+OFFLOAD_ROWS = 1000
+
+
+def dumps(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
+
+
+def _json(data: dict, status: int = 200) -> Response:
+    return Response(
+        body=dumps(data), status=status, content_type="application/json"
+    )
 
 
 def json_response(data: dict | None = None, status: str = "ok") -> Response:
-    return aiohttp_json_response(
-        data={
+    return _json(
+        {
             "status": status,
             "data": data or {},
         }
     )
 
 
+async def list_response(
+    name: str,
+    serializer: Serializer,
+    items: Sequence,
+    extra: dict | None = None,
+) -> Response:
+    """json_response со списком items под ключом name.
+
+    Кодировщик JSON не отпускает GIL, поэтому в поток уходит вся сборка
+    ответа: пока строки выгружаются кодом на Python, цикл событий
+    получает GIL и продолжает обслуживать другие запросы.
+    """
+
+    def build() -> Response:
+        return json_response(
+            data={name: serializer.dump_many(items), **(extra or {})}
+        )
+
+    if len(items) >= OFFLOAD_ROWS:
+        return await asyncio.to_thread(build)
+    return build()
+
+
 def error_json_response(
     http_status: int,
     status: str = "error",
     message: str | None = None,
     data: dict | None = None,
 ):
-    return aiohttp_json_response(
-        status=http_status,
-        data={
+    return _json(
+        {
             "status": status,
             "message": str(message),
             "data": data or {},
         },
+        status=http_status,
     )
 
 
@@ -35,3 +88,68 @@ def hash_password(password: str) -> str:
 
 def rehash_password(password: str) -> str:
     return base64.b64decode(password).decode()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def ndjson_chunks(
+    rows: AsyncIterator[dict],
+    *,
+    compress: bool,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Строки в NDJSON кусками примерно по chunk_size байт до сжатия."""
+    # wbits=31 — формат gzip, а не голый deflate.
+    encoder = zlib.compressobj(wbits=31) if compress else None
+    buffer = bytearray()
+    async for row in rows:
+        buffer += json.dumps(
+            row, default=_json_default, ensure_ascii=False
+        ).encode()
+        buffer += b"\n"
+        if len(buffer) >= chunk_size:
+            yield encoder.compress(buffer) if encoder else bytes(buffer)
+            buffer.clear()
+
+    if encoder:
+        yield encoder.compress(buffer) + encoder.flush()
+    elif buffer:
+        yield bytes(buffer)
+
+
+async def ndjson_response(
+    request: BaseRequest,
+    rows: AsyncIterator[dict],
+    name: str,
+    *,
+    compress: bool = False,
+) -> StreamResponse:
+    """Отдаёт строки потоком, не собирая ответ в памяти.
+
+    write ждёт, пока клиент заберёт данные, поэтому из БД читается
+    не быстрее, чем уходит в сеть.
+    """
+    filename = f"{name}.ndjson.gz" if compress else f"{name}.ndjson"
+    response = StreamResponse(
+        headers={
+            "Content-Type": "application/gzip"
+            if compress
+            else "application/x-ndjson",
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        }
+    )
+    await response.prepare(request)
+    async for chunk in ndjson_chunks(rows, compress=compress):
+        await response.write(chunk)
+    await response.write_eof()
+    return response
+
+
+def sse_event(name: str, data: Any) -> bytes:
+    return b"event: " + name.encode() + b"\ndata: " + dumps(data) + b"\n\n"
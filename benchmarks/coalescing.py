@@ -0,0 +1,65 @@
+"""Пачка обновлений из многих чатов, обрабатываемая одновременно.
+
+Каждое обновление запрашивает своего пользователя и активную игру чата.
+Сравнивает отдельный запрос на каждый вызов с BatchLoader. БД
+имитируется: запрос ждёт latency и занимает соединение из пула.
+
+Запуск: python -m benchmarks.coalescing --updates 1000
+"""
+
+import asyncio
+import random
+import time
+
+from app.base.coalesce import BatchLoader
+from benchmarks.fakes import FakeDatabase
+from benchmarks.utils import Timer, make_parser, report
+
+
+async def run(name: str, args, batched: bool) -> None:
+    db = FakeDatabase(args.latency, args.pool_size)
+
+    async def fetch_many(keys):
+        return await db.query({key: key for key in keys})
+
+    async def fetch_one(key):
+        return await db.query(key)
+
+    users = BatchLoader(fetch_many)
+    games = BatchLoader(fetch_many)
+    rnd = random.Random(0)
+    updates = [
+        (rnd.randint(1, args.users), rnd.randint(1, args.chats))
+        for _ in range(args.updates)
+    ]
+    timer = Timer()
+
+    async def handle(user_id: int, chat_id: int) -> None:
+        with timer:
+            if batched:
+                await asyncio.gather(users.load(user_id), games.load(chat_id))
+            else:
+                await asyncio.gather(fetch_one(user_id), fetch_one(chat_id))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(handle(*update) for update in updates))
+    elapsed = time.perf_counter() - started
+    report(name, timer.samples)
+    print(f"{'':<32} queries={db.queries} total={elapsed * 1000:.1f}ms")
+
+
+async def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--updates", type=int, default=1_000)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--pool-size", type=int, default=15)
+    args = parser.parse_args()
+
+    await run("query per call", args, batched=False)
+    await run("batch loader", args, batched=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from app.base.profiling import MemoryProfiler
+from app.base.tracing import Tracer
+from app.metrics import MetricsRegistry
+
+
+class FakeDatabase:
+    """Имитация БД: каждый запрос занимает latency секунд и учитывается.
+
+    pool_size ограничивает число одновременных запросов, как пул
+    соединений движка.
+    """
+
+    def __init__(
+        self, latency: float = 0.002, pool_size: int | None = None
+    ) -> None:
+        self.latency = latency
+        self.queries = 0
+        self._pool = asyncio.Semaphore(pool_size) if pool_size else None
+
+    async def query(self, result=None):
+        self.queries += 1
+        if self._pool is None:
+            await asyncio.sleep(self.latency)
+            return result
+        async with self._pool:
+            await asyncio.sleep(self.latency)
+        return result
+
+
+def fake_app() -> SimpleNamespace:
+    telegram_api = SimpleNamespace(
+        send_message=AsyncMock(), send_callback_answer=AsyncMock()
+    )
+    return SimpleNamespace(
+        store=SimpleNamespace(telegram_api=telegram_api),
+        config=SimpleNamespace(),
+        metrics=MetricsRegistry(),
+        tracer=Tracer(sample_rate=0.0, size=1),
+        memory_profiler=MemoryProfiler(),
+    )
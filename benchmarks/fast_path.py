@@ -0,0 +1,147 @@
+"""Запись изменений хода через SQLAlchemy и через asyncpg напрямую.
+
+Перед замером проверяется, что оба пути одинаково применяют изменения
+хода.
+
+Запуск: python -m benchmarks.fast_path --config etc/cfg.yaml
+"""
+
+import asyncio
+
+from sqlalchemy import delete, insert, select
+
+from app.store.database import (
+    GameModel,
+    PlayerModel,
+    QuestionModel,
+    UserModel,
+)
+from benchmarks.utils import (
+    BENCH_USER_ID_BASE,
+    Timer,
+    database_app,
+    make_parser,
+    report,
+)
+
+CHAT_ID = -BENCH_USER_ID_BASE
+
+
+async def create_game(app) -> tuple[int, int]:
+    async with app.database.session as session:
+        question_id = (
+            await session.execute(
+                insert(QuestionModel)
+                .values(text="benchmark", answer="бенчмарк")
+                .returning(QuestionModel.id)
+            )
+        ).scalar_one()
+        await session.execute(
+            insert(UserModel).values(
+                id=BENCH_USER_ID_BASE, username="bench_0", role="player"
+            )
+        )
+        game_id = (
+            await session.execute(
+                insert(GameModel)
+                .values(chat_id=CHAT_ID, question_id=question_id)
+                .returning(GameModel.id)
+            )
+        ).scalar_one()
+        player_id = (
+            await session.execute(
+                insert(PlayerModel)
+                .values(game_id=game_id, user_id=BENCH_USER_ID_BASE)
+                .returning(PlayerModel.id)
+            )
+        ).scalar_one()
+        await session.commit()
+    return game_id, player_id
+
+
+async def cleanup(app) -> None:
+    async with app.database.session as session:
+        await session.execute(
+            delete(PlayerModel).where(PlayerModel.user_id == BENCH_USER_ID_BASE)
+        )
+        await session.execute(
+            delete(GameModel).where(GameModel.chat_id == CHAT_ID)
+        )
+        await session.execute(
+            delete(UserModel).where(UserModel.id == BENCH_USER_ID_BASE)
+        )
+        await session.execute(
+            delete(QuestionModel).where(QuestionModel.text == "benchmark")
+        )
+        await session.commit()
+
+
+async def read_back(app, game_id: int, player_id: int) -> tuple:
+    async with app.database.session as session:
+        game = (
+            await session.execute(
+                select(GameModel).where(GameModel.id == game_id)
+            )
+        ).scalar_one()
+        player = (
+            await session.execute(
+                select(PlayerModel).where(PlayerModel.id == player_id)
+            )
+        ).scalar_one()
+        return game.word_state, player.points, player.next_player_id
+
+
+async def check_parity(app, game_id: int, player_id: int) -> None:
+    game = app.store.game
+    fast = game.fast_path
+
+    writes = {
+        "word_states": {game_id: 5},
+        "player_points": {player_id: 300},
+        "next_players": {player_id: player_id},
+    }
+    await game.apply_game_writes(**writes)
+    orm_state = await read_back(app, game_id, player_id)
+    await game.apply_game_writes(
+        word_states={game_id: 0},
+        player_points={player_id: 0},
+        next_players={},
+    )
+    await fast.apply_game_writes(**writes)
+    fast_state = await read_back(app, game_id, player_id)
+    assert orm_state == fast_state, (orm_state, fast_state)
+
+
+async def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--turns", type=int, default=5_000)
+    args = parser.parse_args()
+
+    async with database_app(args.config) as app:
+        app.config.game.fast_path = False
+        await cleanup(app)
+        try:
+            game_id, player_id = await create_game(app)
+            await check_parity(app, game_id, player_id)
+            print("parity: ok")
+
+            game = app.store.game
+            for name, target in (
+                ("sqlalchemy", game),
+                ("asyncpg", game.fast_path),
+            ):
+                writes = Timer()
+                for turn in range(args.turns):
+                    with writes:
+                        await target.apply_game_writes(
+                            word_states={game_id: turn},
+                            player_points={player_id: turn},
+                            next_players={player_id: player_id},
+                        )
+                report(f"turn writes ({name})", writes.samples)
+        finally:
+            await cleanup(app)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
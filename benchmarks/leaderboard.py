@@ -0,0 +1,71 @@
+"""Поиск места в рейтинге среди большого числа игроков.
+
+Запуск: python -m benchmarks.leaderboard --users 1000000
+"""
+
+import random
+
+from app.users.leaderboard import Leaderboard
+from benchmarks.utils import Timer, make_parser, report
+
+
+def naive_rank(users: list[tuple[int, str, int, int]], user_id: int) -> int:
+    ordered = sorted(users, key=lambda user: (-user[2], -user[3], user[0]))
+    for position, user in enumerate(ordered, start=1):
+        if user[0] == user_id:
+            return position
+    return len(ordered) + 1
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    users = [
+        (user_id, f"user_{user_id}", rnd.randint(0, 50), rnd.randint(0, 10**5))
+        for user_id in range(1, args.users + 1)
+    ]
+
+    load = Timer()
+    leaderboard = Leaderboard()
+    with load:
+        leaderboard.load(users)
+    report("load", load.samples)
+
+    lookups = Timer()
+    for _ in range(args.lookups):
+        user_id = rnd.randint(1, args.users)
+        with lookups:
+            leaderboard.rank(user_id)
+    report("rank (bisect)", lookups.samples)
+
+    updates = Timer()
+    for _ in range(args.lookups):
+        user_id = rnd.randint(1, args.users)
+        with updates:
+            leaderboard.update(
+                user_id,
+                f"user_{user_id}",
+                rnd.randint(0, 50),
+                rnd.randint(0, 10**5),
+            )
+    report("update after settlement", updates.samples)
+
+    top = Timer()
+    for _ in range(1_000):
+        with top:
+            leaderboard.top(10)
+    report("top 10", top.samples)
+
+    naive = Timer()
+    for _ in range(3):
+        with naive:
+            naive_rank(users, rnd.randint(1, args.users))
+    report("rank (full sort)", naive.samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Пачка одновременных нажатий «Участвовать» в одном чате.
+
+Сравнивает прежнюю проверку участия через БД с реестром в памяти.
+Запуск: python -m benchmarks.registration_burst --joins 50
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from app.store.bot.manager import BotManager
+from app.store.bot.roster import Roster
+from app.store.telegram_api.dataclasses import CallbackQuery
+from benchmarks.fakes import FakeDatabase, fake_app
+from benchmarks.utils import make_parser
+
+CHAT_ID = 1
+GAME_ID = 42
+
+
+def make_store(db: FakeDatabase, app: SimpleNamespace) -> None:
+    players: list = []
+
+    async def get_active_game_by_chat_id(chat_id):
+        return await db.query(SimpleNamespace(id=GAME_ID))
+
+    async def get_players_by_game_id(game_id):
+        return await db.query(list(players))
+
+    async def create_player(user_id, game_id):
+        await db.query()
+        players.append(
+            (SimpleNamespace(user_id=user_id), SimpleNamespace(id=user_id))
+        )
+
+    app.store.users = SimpleNamespace(
+        get_by_id=AsyncMock(
+            side_effect=lambda user_id: SimpleNamespace(
+                id=user_id, username=f"user_{user_id}"
+            )
+        )
+    )
+    app.store.game = SimpleNamespace(
+        get_active_game_by_chat_id=get_active_game_by_chat_id,
+        get_players_by_game_id=get_players_by_game_id,
+        create_player=create_player,
+    )
+
+
+async def legacy_join(manager: BotManager, query: CallbackQuery) -> None:
+    # Прежняя логика handle_callback_query для "participate".
+    store = manager.app.store
+    active_game = await store.game.get_active_game_by_chat_id(query.chat_id)
+    if active_game.id == GAME_ID:
+        players = await store.game.get_players_by_game_id(GAME_ID)
+        if all(user.id != query.from_id for _, user in players):
+            await store.game.create_player(
+                user_id=query.from_id, game_id=GAME_ID
+            )
+            await store.telegram_api.send_message(None)
+
+
+def queries(joins: int) -> list[CallbackQuery]:
+    return [
+        CallbackQuery(
+            id=i,
+            chat_id=CHAT_ID,
+            from_id=i,
+            username=f"user_{i}",
+            data=f"participate_{GAME_ID}",
+        )
+        for i in range(joins)
+    ]
+
+
+async def run(joins: int, latency: float, legacy: bool) -> tuple[float, int]:
+    db = FakeDatabase(latency)
+    app = fake_app()
+    make_store(db, app)
+    manager = BotManager(app)
+    manager.registration_tasks[CHAT_ID] = None
+    manager.rosters[CHAT_ID] = Roster(GAME_ID)
+
+    started = time.perf_counter()
+    if legacy:
+        await asyncio.gather(*(legacy_join(manager, q) for q in queries(joins)))
+    else:
+        await asyncio.gather(
+            *(manager.handle_callback_query(q) for q in queries(joins))
+        )
+    answered = time.perf_counter() - started
+    await manager.rosters[CHAT_ID].wait_persisted()
+    return answered, db.queries
+
+
+async def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--joins", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    for name, legacy in (("db roster check", True), ("in-memory", False)):
+        answered, db_queries = await run(
+            args.joins, args.latency_ms / 1000, legacy
+        )
+        print(
+            f"{name:<16} joins={args.joins} "
+            f"all answered in {answered * 1000:8.2f}ms, "
+            f"db queries={db_queries}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
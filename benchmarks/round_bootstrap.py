@@ -0,0 +1,102 @@
+"""Задержка начала раунда при множестве одновременно стартующих игр.
+
+Сравнивает три последовательных запроса (игра, вопрос, игроки) с одним
+запросом load_round. БД имитируется: каждый запрос ждёт latency и
+занимает соединение из пула pool_size.
+
+Запуск: python -m benchmarks.round_bootstrap --games 500
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from app.store.bot.manager import BotManager
+from benchmarks.fakes import FakeDatabase, fake_app
+from benchmarks.utils import Timer, make_parser, report
+
+
+def make_store(db: FakeDatabase, app: SimpleNamespace, players: int) -> None:
+    roster = [
+        (
+            SimpleNamespace(id=100 + i, user_id=i, points=0),
+            SimpleNamespace(id=i, username=f"user_{i}"),
+        )
+        for i in range(players)
+    ]
+
+    async def get_game_by_id(game_id):
+        return await db.query(SimpleNamespace(id=game_id, question_id=1))
+
+    async def get_question_by_id(question_id):
+        return await db.query(SimpleNamespace(text="Вопрос", answer="слово"))
+
+    async def get_players_by_game_id(game_id):
+        return await db.query(list(roster))
+
+    async def load_round(game_id):
+        return await db.query(
+            SimpleNamespace(
+                game_id=game_id,
+                question="Вопрос",
+                answer="слово",
+                players=list(roster),
+            )
+        )
+
+    app.store.game = SimpleNamespace(
+        get_game_by_id=get_game_by_id,
+        get_question_by_id=get_question_by_id,
+        get_players_by_game_id=get_players_by_game_id,
+        load_round=load_round,
+    )
+
+
+async def legacy_bootstrap(manager: BotManager, game_id: int) -> None:
+    # Прежнее начало start_game_round.
+    game = await manager.app.store.game.get_game_by_id(game_id)
+    question = await manager.app.store.game.get_question_by_id(game.question_id)
+    players = await manager.app.store.game.get_players_by_game_id(game_id)
+    manager.game_states[game_id] = {
+        "word": question.answer.upper(),
+        "players": players,
+    }
+
+
+async def round_bootstrap(manager: BotManager, game_id: int) -> None:
+    game_round = await manager.app.store.game.load_round(game_id)
+    manager.game_states[game_id] = {
+        "word": game_round.answer.upper(),
+        "players": game_round.players,
+    }
+
+
+async def measure(name: str, bootstrap, args) -> None:
+    db = FakeDatabase(args.latency, args.pool_size)
+    app = fake_app()
+    make_store(db, app, args.players)
+    manager = BotManager(app)
+    timer = Timer()
+
+    async def start(game_id: int) -> None:
+        with timer:
+            await bootstrap(manager, game_id)
+
+    await asyncio.gather(*(start(game_id) for game_id in range(args.games)))
+    report(name, timer.samples)
+    print(f"{'':<32} queries={db.queries}")
+
+
+async def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--games", type=int, default=500)
+    parser.add_argument("--players", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--pool-size", type=int, default=15)
+    args = parser.parse_args()
+
+    await measure("three queries", legacy_bootstrap, args)
+    await measure("load_round", round_bootstrap, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""Сборка ответов со списками: схема на каждую строку и json из
+стандартной библиотеки против собранного сериализатора и быстрого JSON.
+
+Отдельно замеряется, на сколько сборка большого ответа задерживает
+цикл событий, если делать её в цикле и если в потоке.
+
+Запуск: python -m benchmarks.serialization --rows 10000 100000
+"""
+
+import asyncio
+import time
+
+from aiohttp.web import json_response as aiohttp_json_response
+
+from app.store.database import UserModel
+
+# isort: split
+from app.users.schema import UserSchema
+from app.web.serializers import serializer
+from app.web.utils import json_response, list_response
+from benchmarks.utils import Timer, make_parser, report
+
+
+def make_users(count: int) -> list[UserModel]:
+    return [
+        UserModel(
+            id=user_id,
+            username=f"user_{user_id}",
+            role="player",
+            score=user_id % 50,
+            points=user_id * 7 % 100_000,
+        )
+        for user_id in range(count)
+    ]
+
+
+def per_row_schema(users: list[UserModel]) -> None:
+    aiohttp_json_response(
+        data={
+            "status": "ok",
+            "data": {"users": [UserSchema().dump(user) for user in users]},
+        }
+    )
+
+
+def compiled(users: list[UserModel]) -> None:
+    json_response(data={"users": serializer(UserSchema).dump_many(users)})
+
+
+async def loop_stall(users: list[UserModel], *, offload: bool) -> float:
+    """Самая долгая пауза тикающей задачи, пока собирается ответ."""
+    stalls = []
+
+    async def tick() -> None:
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stalls.append(now - last)
+            last = now
+
+    ticker = asyncio.create_task(tick())
+    await asyncio.sleep(0.01)
+    if offload:
+        await list_response("users", serializer(UserSchema), users)
+    else:
+        compiled(users)
+    await asyncio.sleep(0.01)
+    ticker.cancel()
+    return max(stalls)
+
+
+async def stalls(users: list[UserModel]) -> None:
+    for name, offload in (("inline", False), ("to_thread", True)):
+        stall = await loop_stall(users, offload=offload)
+        print(f"{'loop stall (' + name + ')':<32} max={stall * 1000:9.3f}ms")
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 100_000]
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        users = make_users(rows)
+        print(f"--- {rows} rows")
+        for name, build in (
+            ("per-row schema", per_row_schema),
+            ("compiled serializer", compiled),
+        ):
+            timer = Timer()
+            for _ in range(args.repeats):
+                with timer:
+                    build(users)
+            report(name, timer.samples)
+        asyncio.run(stalls(users))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Сравнение поштучного и пакетного расчёта итогов игры.
+
+Запуск: python -m benchmarks.settlement --config etc/cfg.yaml
+"""
+
+import asyncio
+
+from sqlalchemy import delete, insert, select, update
+
+from app.store.database import (
+    GameModel,
+    PlayerModel,
+    QuestionModel,
+    UserModel,
+)
+from benchmarks.utils import (
+    BENCH_USER_ID_BASE,
+    Timer,
+    database_app,
+    make_parser,
+    report,
+)
+
+
+async def create_games(app, games: int, players: int) -> list[int]:
+    async with app.database.session as session:
+        question_id = (
+            await session.execute(
+                insert(QuestionModel)
+                .values(text="benchmark", answer="бенчмарк")
+                .returning(QuestionModel.id)
+            )
+        ).scalar_one()
+        await session.execute(
+            insert(UserModel),
+            [
+                {
+                    "id": BENCH_USER_ID_BASE + i,
+                    "username": f"bench_{i}",
+                    "role": "player",
+                    "score": 0,
+                    "points": 0,
+                }
+                for i in range(players)
+            ],
+        )
+        game_ids = (
+            (
+                await session.execute(
+                    insert(GameModel).returning(GameModel.id),
+                    [
+                        {
+                            "chat_id": -BENCH_USER_ID_BASE,
+                            "question_id": question_id,
+                        }
+                        for _ in range(games)
+                    ],
+                )
+            )
+            .scalars()
+            .all()
+        )
+        await session.execute(
+            insert(PlayerModel),
+            [
+                {"game_id": game_id, "user_id": BENCH_USER_ID_BASE + i}
+                for game_id in game_ids
+                for i in range(players)
+            ],
+        )
+        await session.commit()
+    return list(game_ids)
+
+
+async def cleanup(app) -> None:
+    async with app.database.session as session:
+        await session.execute(
+            delete(GameModel).where(GameModel.chat_id == -BENCH_USER_ID_BASE)
+        )
+        await session.execute(
+            delete(UserModel).where(UserModel.id >= BENCH_USER_ID_BASE)
+        )
+        await session.execute(
+            delete(QuestionModel).where(QuestionModel.text == "benchmark")
+        )
+        await session.commit()
+
+
+async def settle_per_player(app, game_id: int) -> None:
+    async with app.database.session as session:
+        players = (
+            await session.execute(
+                select(PlayerModel, UserModel)
+                .join(UserModel, PlayerModel.user_id == UserModel.id)
+                .where(PlayerModel.game_id == game_id)
+            )
+        ).all()
+    for player, user in players:
+        async with app.database.session as session:
+            await session.execute(
+                update(UserModel)
+                .where(UserModel.id == user.id)
+                .values(points=user.points + 100, score=user.score + 1)
+            )
+            await session.commit()
+        async with app.database.session as session:
+            await session.execute(
+                update(PlayerModel)
+                .where(PlayerModel.id == player.id)
+                .values(in_game=False)
+            )
+            await session.commit()
+    await app.store.game.end_game(game_id)
+
+
+async def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--players", type=int, default=20)
+    args = parser.parse_args()
+
+    async with database_app(args.config) as app:
+        await cleanup(app)
+        try:
+            totals = {
+                BENCH_USER_ID_BASE + i: (100, 1) for i in range(args.players)
+            }
+
+            legacy = Timer()
+            for game_id in await create_games(app, args.games, args.players):
+                with legacy:
+                    await settle_per_player(app, game_id)
+            await cleanup(app)
+
+            bulk = Timer()
+            for game_id in await create_games(app, args.games, args.players):
+                with bulk:
+                    await app.store.game.settle_game(game_id, totals)
+        finally:
+            await cleanup(app)
+
+    print(f"{args.games} games x {args.players} players")
+    report("per-player commits", legacy.samples)
+    report("single-transaction settle", bulk.samples)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""Процессорное время на запрос: сборка запроса на каждый вызов против
+заранее собранного запроса с параметрами.
+
+Без --live запросы не выполняются: замеряется сборка, ключ кэша и
+компиляция через кэш диалекта, как это делает SQLAlchemy перед отправкой
+запроса. С --live запросы выполняются в БД из --config.
+
+Запуск: python -m benchmarks.statements [--live --config etc/cfg.yaml]
+"""
+
+import asyncio
+import time
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from app.store.database import (
+    GameModel,
+    PlayerModel,
+    UserModel,
+)
+
+# isort: split
+from app.game.accessor import GAME_BY_ID, PLAYERS_BY_GAME
+from app.users.accessor import USER_BY_ID
+from benchmarks.utils import database_app, make_parser, report
+
+CASES = {
+    "user by id": (
+        lambda: select(UserModel).where(UserModel.id == 1),
+        USER_BY_ID,
+        {"user_id": 1},
+    ),
+    "game by id": (
+        lambda: select(GameModel).where(GameModel.id == 1),
+        GAME_BY_ID,
+        {"game_id": 1},
+    ),
+    "players by game": (
+        lambda: (
+            select(PlayerModel, UserModel)
+            .join(UserModel, PlayerModel.user_id == UserModel.id)
+            .where(PlayerModel.game_id == 1)
+        ),
+        PLAYERS_BY_GAME,
+        {"game_id": 1},
+    ),
+}
+
+
+def compile_cached(statement, dialect, cache: dict) -> None:
+    # Тот же путь, что и при выполнении: ключ кэша и поиск в кэше диалекта.
+    statement._compile_w_cache(dialect, compiled_cache=cache, column_keys=[])
+
+
+def offline(queries: int) -> None:
+    dialect = asyncpg_dialect()
+    for name, (build, prebuilt, _) in CASES.items():
+        cache: dict = {}
+        samples = []
+        for _ in range(queries):
+            started = time.process_time()
+            compile_cached(build(), dialect, cache)
+            samples.append(time.process_time() - started)
+        report(f"{name} (build)", samples)
+
+        cache = {}
+        samples = []
+        for _ in range(queries):
+            started = time.process_time()
+            compile_cached(prebuilt, dialect, cache)
+            samples.append(time.process_time() - started)
+        report(f"{name} (prebuilt)", samples)
+
+
+async def live(config: str, queries: int) -> None:
+    async with database_app(config) as app:
+        for name, (build, prebuilt, params) in CASES.items():
+            async with app.database.session as session:
+                samples = []
+                for _ in range(queries):
+                    started = time.process_time()
+                    (await session.execute(build())).all()
+                    samples.append(time.process_time() - started)
+                report(f"{name} (build)", samples)
+
+                samples = []
+                for _ in range(queries):
+                    started = time.process_time()
+                    (await session.execute(prebuilt, params)).all()
+                    samples.append(time.process_time() - started)
+                report(f"{name} (prebuilt)", samples)
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--live", action="store_true")
+    parser.add_argument("--queries", type=int, default=5_000)
+    args = parser.parse_args()
+
+    if args.live:
+        asyncio.run(live(args.config, args.queries))
+    else:
+        offline(args.queries)
+
+
+if __name__ == "__main__":
+    main()
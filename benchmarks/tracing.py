@@ -0,0 +1,51 @@
+"""Цена трассировки на обновление: корневой спан и десять спанов
+запросов к БД и Telegram внутри него.
+
+Запуск: python -m benchmarks.tracing --updates 100000
+"""
+
+import time
+
+from app.base.tracing import Tracer
+from benchmarks.utils import make_parser
+
+SPANS_PER_UPDATE = 10
+
+
+def run(tracer: Tracer | None, updates: int) -> float:
+    started = time.perf_counter()
+    for _ in range(updates):
+        if tracer is None:
+            for _ in range(SPANS_PER_UPDATE):
+                time.perf_counter()
+            continue
+        with tracer.trace("update input"):
+            for _ in range(SPANS_PER_UPDATE):
+                tracer.record(
+                    "db GameAccessor.load_round", time.perf_counter(), 0
+                )
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--updates", type=int, default=100_000)
+    args = parser.parse_args()
+
+    baseline = run(None, args.updates)
+    for name, rate in (
+        ("not sampled", 0.0),
+        ("1% sampled", 0.01),
+        ("all", 1.0),
+    ):
+        tracer = Tracer(sample_rate=rate, size=10_000)
+        overhead = run(tracer, args.updates) - baseline
+        print(
+            f"{name:<16} {overhead / args.updates * 1e6:7.2f}us per update, "
+            f"{overhead / args.updates / (SPANS_PER_UPDATE + 1) * 1e6:6.2f}us "
+            "per span"
+        )
+
+
+if __name__ == "__main__":
+    main()
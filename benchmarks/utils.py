@@ -0,0 +1,67 @@
+import argparse
+import os
+import statistics
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from app.base.profiling import setup_profiling
+from app.base.tracing import setup_tracing
+from app.metrics import setup_metrics
+from app.store import Database, Store
+from app.web.app import Application
+from app.web.config import setup_config
+
+DEFAULT_CONFIG = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+    "etc/cfg.yaml",
+)
+
+# Идентификаторы тестовых пользователей не пересекаются с Telegram id.
+BENCH_USER_ID_BASE = 9_000_000_000_000
+
+
+def make_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--config", default=DEFAULT_CONFIG)
+    return parser
+
+
+@asynccontextmanager
+async def database_app(config_path: str) -> AsyncIterator[Application]:
+    app = Application()
+    setup_config(app, config_path)
+    setup_metrics(app)
+    setup_tracing(app)
+    setup_profiling(app)
+    app.database = Database(app)
+    await app.database.connect()
+    app.database.engine.echo = False
+    app.store = Store(app, "admin-api")
+    try:
+        yield app
+    finally:
+        await app.database.disconnect()
+
+
+class Timer:
+    def __init__(self) -> None:
+        self.samples: list[float] = []
+
+    def __enter__(self) -> "Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.samples.append(time.perf_counter() - self._started)
+
+
+def report(name: str, samples: list[float]) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    print(
+        f"{name:<32} n={len(samples):<7} "
+        f"mean={statistics.fmean(samples) * 1000:9.3f}ms "
+        f"p50={statistics.median(samples) * 1000:9.3f}ms "
+        f"p95={p95 * 1000:9.3f}ms"
+    )
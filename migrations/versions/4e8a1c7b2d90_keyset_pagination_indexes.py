@@ -0,0 +1,62 @@
+"""Keyset pagination indexes
+
+Revision ID: 4e8a1c7b2d90
+Revises: 9f3b6d2a1c58
+Create Date: 2026-10-19 12:40:18.507214
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4e8a1c7b2d90"
+down_revision: Union[str, None] = "9f3b6d2a1c58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Сравнение ключей строк не работает с NULL, а модель и так пишет 0.
+    for name in ("score", "points"):
+        op.execute(f"UPDATE users SET {name} = 0 WHERE {name} IS NULL")
+        op.alter_column(
+            "users",
+            name,
+            existing_type=sa.BigInteger(),
+            nullable=False,
+            server_default="0",
+        )
+    op.create_index("ix_users_score_id", "users", ["score", "id"])
+    op.create_index("ix_users_points_id", "users", ["points", "id"])
+    op.create_index(
+        "ix_users_username_prefix",
+        "users",
+        ["username"],
+        postgresql_ops={"username": "varchar_pattern_ops"},
+    )
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_questions_text_trgm",
+        "questions",
+        ["text"],
+        postgresql_using="gin",
+        postgresql_ops={"text": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_questions_text_trgm", table_name="questions")
+    op.drop_index("ix_users_username_prefix", table_name="users")
+    op.drop_index("ix_users_points_id", table_name="users")
+    op.drop_index("ix_users_score_id", table_name="users")
+    for name in ("score", "points"):
+        op.alter_column(
+            "users",
+            name,
+            existing_type=sa.BigInteger(),
+            nullable=True,
+            server_default=None,
+        )
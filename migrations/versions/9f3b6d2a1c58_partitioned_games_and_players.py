@@ -0,0 +1,102 @@
+"""Partitioned history of ended games and their players
+
+Revision ID: 9f3b6d2a1c58
+Revises: 7c2e91d0a6f4
+Create Date: 2026-10-19 10:12:40.318265
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9f3b6d2a1c58"
+down_revision: Union[str, None] = "7c2e91d0a6f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # games и players остаются обычными таблицами: расчёт игры обновляет
+    # строки на месте. Архиватор переносит завершённые игры в историю.
+    op.execute(
+        "CREATE INDEX ix_games_ended_at ON games (ended_at) "
+        "WHERE game_state = 'ENDED'"
+    )
+
+    op.execute(
+        """
+        CREATE TABLE games_history (
+            id BIGINT NOT NULL,
+            question_id BIGINT,
+            chat_id BIGINT NOT NULL,
+            word_state BIGINT,
+            game_state gamestate NOT NULL,
+            winner_id BIGINT,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            ended_at TIMESTAMP WITH TIME ZONE,
+            turns BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute(
+        "CREATE TABLE games_history_default PARTITION OF games_history DEFAULT"
+    )
+    op.execute("CREATE INDEX ix_games_history_id ON games_history (id)")
+
+    op.execute(
+        """
+        CREATE TABLE players_history (
+            id BIGINT NOT NULL,
+            game_id BIGINT,
+            user_id BIGINT,
+            next_player_id BIGINT,
+            in_game BOOLEAN,
+            active BOOLEAN,
+            points BIGINT,
+            game_created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            PRIMARY KEY (id, game_created_at)
+        ) PARTITION BY RANGE (game_created_at)
+        """
+    )
+    op.execute(
+        "CREATE TABLE players_history_default PARTITION OF players_history "
+        "DEFAULT"
+    )
+    op.execute(
+        "CREATE INDEX ix_players_history_game_id ON players_history (game_id)"
+    )
+
+    # Сюда архиватор переносит отцепленные секции.
+    op.execute("CREATE SCHEMA IF NOT EXISTS archive")
+
+
+def downgrade() -> None:
+    # Перенесённые игры возвращаются в games; отцепленные секции в схеме
+    # archive сохраняются.
+    op.execute(
+        """
+        INSERT INTO games (
+            id, question_id, chat_id, word_state, game_state, winner_id,
+            created_at, ended_at, turns
+        )
+        SELECT id, question_id, chat_id, word_state, game_state, winner_id,
+            created_at, ended_at, turns
+        FROM games_history
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO players (
+            id, game_id, user_id, next_player_id, in_game, active, points
+        )
+        SELECT id, game_id, user_id, next_player_id, in_game, active, points
+        FROM players_history
+        WHERE game_id IN (SELECT id FROM games)
+        """
+    )
+    op.execute("DROP TABLE players_history")
+    op.execute("DROP TABLE games_history")
+    op.execute("DROP INDEX ix_games_ended_at")
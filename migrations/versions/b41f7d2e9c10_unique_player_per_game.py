@@ -0,0 +1,45 @@
+"""Unique player per game
+
+Revision ID: b41f7d2e9c10
+Revises: 3d4206199b23
+Create Date: 2026-10-18 12:04:31.512094
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b41f7d2e9c10"
+down_revision: Union[str, None] = "3d4206199b23"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Дубликаты могли появиться при одновременной регистрации.
+    op.execute(
+        """
+        UPDATE players SET next_player_id = NULL
+        WHERE next_player_id IN (
+            SELECT p.id FROM players p JOIN players q
+            ON p.game_id = q.game_id AND p.user_id = q.user_id AND p.id > q.id
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM players p USING players q
+        WHERE p.game_id = q.game_id AND p.user_id = q.user_id AND p.id > q.id
+        """
+    )
+    op.create_unique_constraint(
+        "players_game_id_user_id_key", "players", ["game_id", "user_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "players_game_id_user_id_key", "players", type_="unique"
+    )
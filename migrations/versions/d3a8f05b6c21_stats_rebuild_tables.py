@@ -0,0 +1,79 @@
+"""Stats rebuild tables
+
+Revision ID: d3a8f05b6c21
+Revises: 4e8a1c7b2d90
+Create Date: 2026-10-19 16:40:12.502113
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d3a8f05b6c21"
+down_revision: Union[str, None] = "4e8a1c7b2d90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stats_rebuild",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("running", sa.Boolean(), nullable=False),
+        sa.Column("high_id", sa.BigInteger(), nullable=False),
+        sa.Column("processed_upto", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute(
+        "INSERT INTO stats_rebuild (id, running, high_id, processed_upto) "
+        "VALUES (1, false, 0, 0)"
+    )
+    op.create_table(
+        "chat_daily_stats_rebuild",
+        sa.Column("chat_id", sa.BigInteger(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("games", sa.BigInteger(), nullable=False),
+        sa.Column("games_won", sa.BigInteger(), nullable=False),
+        sa.Column("total_duration", sa.Float(), nullable=False),
+        sa.Column("total_turns", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("chat_id", "day"),
+    )
+    op.create_table(
+        "game_totals_rebuild",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("games", sa.BigInteger(), nullable=False),
+        sa.Column("games_won", sa.BigInteger(), nullable=False),
+        sa.Column("total_duration", sa.Float(), nullable=False),
+        sa.Column("total_turns", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "question_stats_rebuild",
+        sa.Column("question_id", sa.BigInteger(), nullable=False),
+        sa.Column("games", sa.BigInteger(), nullable=False),
+        sa.Column("solved", sa.BigInteger(), nullable=False),
+        sa.Column("total_turns", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["question_id"], ["questions.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("question_id"),
+    )
+    op.create_table(
+        "user_stats_rebuild",
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("games", sa.BigInteger(), nullable=False),
+        sa.Column("games_won", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_stats_rebuild")
+    op.drop_table("question_stats_rebuild")
+    op.drop_table("game_totals_rebuild")
+    op.drop_table("chat_daily_stats_rebuild")
+    op.drop_table("stats_rebuild")
@@ -0,0 +1,31 @@
+"""Added leaderboard index
+
+Revision ID: e5a9c3417d2b
+Revises: b41f7d2e9c10
+Create Date: 2026-10-18 13:21:07.844310
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a9c3417d2b"
+down_revision: Union[str, None] = "b41f7d2e9c10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_users_leaderboard",
+        "users",
+        [sa.text("score DESC"), sa.text("points DESC"), "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_leaderboard", table_name="users")
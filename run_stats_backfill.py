@@ -0,0 +1,47 @@
+import argparse
+import asyncio
+import logging
+import os
+
+from app.base.profiling import setup_profiling
+from app.base.tracing import setup_tracing
+from app.metrics import setup_metrics
+from app.store import setup_store
+from app.web.app import Application
+from app.web.config import setup_config
+
+
+async def backfill(config_path: str, batch_size: int) -> None:
+    application = Application()
+    setup_config(application, config_path)
+    setup_metrics(application)
+    setup_tracing(application)
+    setup_profiling(application)
+    setup_store(application, "admin-api")
+    application.freeze()
+
+    await application.startup()
+    try:
+        application.database.engine.echo = False
+        games = await application.store.stats.rebuild(batch_size=batch_size)
+        logging.getLogger("stats").info("stats rebuilt from %s games", games)
+    finally:
+        await application.cleanup()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(
+        description="Rebuild game stats rollups from history."
+    )
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    asyncio.run(
+        backfill(
+            config_path=os.path.join(
+                os.path.dirname(os.path.realpath(__file__)), "etc/cfg.yaml"
+            ),
+            batch_size=args.batch_size,
+        )
+    )
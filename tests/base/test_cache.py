@@ -0,0 +1,50 @@
+from app.base.cache import LRUCache
+from app.metrics import MetricsRegistry
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    cache.get(1)
+    cache.put(3, "c")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.get(3) == "c"
+
+
+def test_expires_entries_and_counts_hit_rate():
+    clock = FakeClock()
+    cache = LRUCache(max_size=10, ttl=5, clock=clock)
+    cache.put(1, "a")
+
+    assert cache.get(1) == "a"
+    clock.now = 5
+    assert cache.get(1) is None
+    assert len(cache) == 0
+    assert cache.hit_rate == 0.5
+
+
+def test_cache_counters_are_exported():
+    registry = MetricsRegistry()
+    cache = LRUCache(max_size=2, ttl=60, clock=FakeClock())
+    registry.cache("users_cache", cache)
+    cache.put(1, "a")
+    cache.get(1)
+    cache.get(2)
+
+    text = registry.render()
+
+    assert "users_cache_size 1" in text
+    assert "users_cache_hits 1" in text
+    assert "users_cache_misses 1" in text
+    assert "users_cache_hit_rate 0.5" in text
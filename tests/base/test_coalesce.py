@@ -0,0 +1,53 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.base.coalesce import BatchLoader, SingleFlight
+
+
+async def test_loads_in_one_tick_are_batched():
+    load_many = AsyncMock(
+        side_effect=lambda keys: {key: key * 10 for key in keys}
+    )
+    loader = BatchLoader(load_many)
+
+    results = await asyncio.gather(*(loader.load(key) for key in (1, 2, 1, 3)))
+
+    assert results == [10, 20, 10, 30]
+    load_many.assert_awaited_once_with([1, 2, 3])
+    assert loader.batches == 1
+    assert await loader.load(4) == 40
+    assert loader.batches == 2
+
+
+async def test_batch_failure_reaches_every_caller():
+    loader = BatchLoader(AsyncMock(side_effect=RuntimeError("db is down")))
+
+    results = await asyncio.gather(
+        loader.load(1), loader.load(2), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+async def test_single_flight_runs_operation_once():
+    flight = SingleFlight()
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def operation():
+        started.set()
+        await release.wait()
+        return "game"
+
+    first = asyncio.create_task(flight.run(1, operation))
+    await started.wait()
+    assert flight.running(1)
+    second = asyncio.create_task(flight.run(1, operation))
+    release.set()
+
+    assert await asyncio.gather(first, second) == ["game", "game"]
+    assert not flight.running(1)
+    with pytest.raises(ZeroDivisionError):
+        await flight.run(1, AsyncMock(side_effect=ZeroDivisionError))
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from app.base.cache import LRUCache
+from app.store.database.versions import CollectionVersions
+from app.web.mixins import ConditionalGetMixin
+from app.web.utils import json_response
+
+
+class CountingView(ConditionalGetMixin, web.View):
+    collections = ("questions",)
+
+    async def get(self):
+        self.request.app["calls"] += 1
+        return json_response(data={"calls": self.request.app["calls"]})
+
+
+def make_app(cache_size: int) -> web.Application:
+    app = web.Application()
+    app["calls"] = 0
+    app.database = SimpleNamespace(
+        versions=CollectionVersions(),
+        read_primary_if_changed=lambda *collections: None,
+    )
+    app.store = SimpleNamespace(responses=LRUCache(max_size=cache_size, ttl=60))
+    app.config = SimpleNamespace(
+        cache=SimpleNamespace(responses_max_body=1_000_000)
+    )
+    app.router.add_view("/questions", CountingView)
+    return app
+
+
+async def test_matching_etag_skips_the_handler():
+    app = make_app(cache_size=0)
+    async with TestClient(TestServer(app)) as client:
+        first = await client.get("/questions")
+        etag = first.headers["ETag"]
+        cached = await client.get("/questions", headers={"If-None-Match": etag})
+
+        app.database.versions.bump("questions")
+        changed = await client.get(
+            "/questions", headers={"If-None-Match": etag}
+        )
+
+    assert first.status == 200
+    assert cached.status == 304
+    assert changed.status == 200
+    assert changed.headers["ETag"] != etag
+    assert app["calls"] == 2
+
+
+async def test_responses_are_cached_per_version():
+    app = make_app(cache_size=10)
+    async with TestClient(TestServer(app)) as client:
+        bodies = [await (await client.get("/questions")).json() for _ in "ab"]
+        app.database.versions.bump_all()
+        fresh = await (await client.get("/questions")).json()
+
+    assert bodies[0] == bodies[1] == {"status": "ok", "data": {"calls": 1}}
+    assert fresh["data"]["calls"] == 2
@@ -0,0 +1,58 @@
+from contextvars import copy_context
+from unittest.mock import MagicMock
+
+from app.store.database.database import Database, Replica
+from app.store.database.versions import CHANNEL
+
+
+def make_database(replicas: int) -> Database:
+    app = MagicMock()
+    app.config.database.read_your_writes_window = 2.0
+    database = Database(app)
+    database.sessionmaker = MagicMock(return_value="primary")
+    database.replicas = [
+        Replica(
+            engine=MagicMock(),
+            sessionmaker=MagicMock(return_value=f"replica-{i}"),
+        )
+        for i in range(replicas)
+    ]
+    return database
+
+
+def test_reads_go_round_robin_to_healthy_replicas():
+    database = make_database(3)
+    database.replicas[1].healthy = False
+
+    sessions = [database.read_session for _ in range(4)]
+
+    assert sessions == ["replica-0", "replica-2", "replica-0", "replica-2"]
+
+
+def test_reads_fall_back_to_primary():
+    database = make_database(1)
+    database.replicas[0].healthy = False
+
+    assert database.read_session == "primary"
+    assert make_database(0).read_session == "primary"
+
+
+def test_reads_are_pinned_to_primary_after_write():
+    database = make_database(2)
+
+    database.mark_write()
+
+    assert database.read_session == "primary"
+
+
+def test_change_notification_pins_only_its_collection_reads():
+    database = make_database(2)
+    database._on_change(None, 1, CHANNEL, "users")
+
+    def read(*collections: str):
+        database.read_primary_if_changed(*collections)
+        return database.read_session
+
+    assert copy_context().run(read, "users") == "primary"
+    assert copy_context().run(read, "questions") == "replica-0"
+    assert database.read_session == "replica-1"
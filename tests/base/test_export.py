@@ -0,0 +1,59 @@
+import asyncio
+import gzip
+import json
+from datetime import UTC, datetime
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from app.store.database import GameState
+from app.web.utils import ndjson_chunks, ndjson_response
+
+
+async def make_rows(count: int):
+    for i in range(count):
+        await asyncio.sleep(0)
+        yield {
+            "id": i,
+            "game_state": GameState.ENDED,
+            "created_at": datetime(2026, 1, 1, tzinfo=UTC),
+        }
+
+
+async def test_rows_are_written_in_bounded_chunks():
+    chunks = [
+        chunk
+        async for chunk in ndjson_chunks(
+            make_rows(1000), compress=False, chunk_size=4096
+        )
+    ]
+
+    assert len(chunks) > 1
+    assert all(len(chunk) < 4096 + 200 for chunk in chunks)
+    lines = b"".join(chunks).decode().splitlines()
+    assert len(lines) == 1000
+    assert json.loads(lines[0]) == {
+        "id": 0,
+        "game_state": "ENDED",
+        "created_at": "2026-01-01T00:00:00+00:00",
+    }
+
+
+async def test_gzip_export_is_streamed():
+    async def export(request):
+        return await ndjson_response(
+            request, make_rows(5000), "games", compress=True
+        )
+
+    app = web.Application()
+    app.router.add_get("/export", export)
+    async with TestClient(TestServer(app)) as client:
+        response = await client.get("/export", auto_decompress=False)
+        body = await response.read()
+
+    assert response.headers["Content-Type"] == "application/gzip"
+    assert (
+        'filename="games.ndjson.gz"' in response.headers["Content-Disposition"]
+    )
+    assert "Content-Length" not in response.headers
+    assert len(gzip.decompress(body).splitlines()) == 5000
@@ -0,0 +1,67 @@
+import asyncio
+import json
+import logging
+import queue
+import sys
+
+from app.web.logger import (
+    ContextQueueHandler,
+    JsonFormatter,
+    SamplingFilter,
+    bind_log_context,
+)
+
+
+def make_record(msg: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord("telegram", level, __file__, 1, msg, (), None)
+
+
+def test_sampling_keeps_every_nth_record_and_all_warnings():
+    sampling = SamplingFilter({"telegram": 3})
+
+    kept = [sampling.filter(make_record("poll")) for _ in range(7)]
+
+    assert kept == [True, False, False, True, False, False, True]
+    assert sampling.filter(make_record("other"))
+    assert sampling.filter(make_record("poll", logging.WARNING))
+
+
+async def test_records_carry_context_of_their_task():
+    records = queue.SimpleQueue()
+    handler = ContextQueueHandler(records)
+
+    async def handle(chat_id: int) -> None:
+        bind_log_context(chat_id=chat_id)
+        await asyncio.sleep(0)
+        handler.handle(make_record("update %s"))
+
+    await asyncio.gather(handle(1), handle(2))
+
+    lines = [
+        json.loads(JsonFormatter().format(records.get())) for _ in range(2)
+    ]
+    assert sorted(line["chat_id"] for line in lines) == [1, 2]
+    assert lines[0]["logger"] == "telegram"
+
+
+def test_record_is_fixed_before_it_leaves_the_loop():
+    records = queue.SimpleQueue()
+    handler = ContextQueueHandler(records)
+    players = ["user_1"]
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord(
+            "game", logging.ERROR, __file__, 1, "players %s", (players,), None
+        )
+        record.exc_info = sys.exc_info()
+
+    handler.handle(record)
+    players.append("user_2")
+
+    queued = records.get()
+    assert queued.args is None
+    assert queued.exc_info is None
+    line = json.loads(JsonFormatter().format(queued))
+    assert line["message"] == "players ['user_1']"
+    assert "ValueError: boom" in line["exc"]
@@ -0,0 +1,90 @@
+from app.metrics import MetricsRegistry
+from app.store.bot.manager import BotManager, update_label
+from app.store.telegram_api.dataclasses import (
+    CallbackQuery,
+    UpdateMessage,
+    UpdateObject,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram(
+        "request_seconds", "Request time.", labels=("method",), buckets=(1, 2)
+    )
+    series = histogram.labels("get")
+    for value in (0.5, 1, 1.5, 3):
+        series.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert lines[:2] == [
+        "# HELP request_seconds Request time.",
+        "# TYPE request_seconds histogram",
+    ]
+    assert lines[2:] == [
+        'request_seconds_bucket{method="get",le="1"} 2',
+        'request_seconds_bucket{method="get",le="2"} 3',
+        'request_seconds_bucket{method="get",le="+Inf"} 4',
+        'request_seconds_sum{method="get"} 6.0',
+        'request_seconds_count{method="get"} 4',
+    ]
+
+
+def test_counters_and_gauges():
+    registry = MetricsRegistry()
+    errors = registry.counter("errors", "Errors.", labels=("method",))
+    errors.labels("send").inc()
+    errors.labels("send").inc(2)
+    depth = [5]
+    registry.gauge("depth", "Depth.", lambda: depth[0])
+    depth[0] = 7
+
+    text = registry.render()
+
+    assert 'errors_total{method="send"} 3' in text
+    assert "depth 7" in text
+
+
+async def test_update_handling_time_by_type(mock_app):
+    mock_app.metrics = MetricsRegistry()
+    manager = BotManager(mock_app)
+    update = UpdateObject(
+        id=1,
+        type="message",
+        object=UpdateMessage(
+            id=1, from_id=1, chat_id=1, username="user", text="/rules"
+        ),
+    )
+
+    await manager.handle_chat_updates([update, update])
+
+    text = mock_app.metrics.render()
+    assert 'bot_update_seconds_count{type="/rules"} 2' in text
+    assert "bot_active_games 0" in text
+    assert "bot_pending_timers 0" in text
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    errors = registry.counter("errors", "Errors.", labels=("reason",))
+    errors.labels('bad "chat"\\\n').inc()
+
+    assert 'errors_total{reason="bad \\"chat\\"\\\\\\n"} 1' in (
+        registry.render()
+    )
+
+
+def test_unknown_callbacks_share_a_label():
+    def callback(data: str) -> UpdateObject:
+        return UpdateObject(
+            id=1,
+            type="callback_query",
+            object=CallbackQuery(
+                id=1, chat_id=1, from_id=1, username="user", data=data
+            ),
+        )
+
+    assert update_label(callback("participate_42")) == "participate"
+    assert update_label(callback("spin")) == "spin"
+    assert update_label(callback("forged_1")) == "unknown"
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import pytest
+from marshmallow import Schema, ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.base.pagination import (
+    Cursor,
+    cursor_key,
+    encode_cursor,
+    keyset,
+    make_page,
+)
+from app.store.database import UserModel
+
+
+class QuerySchema(Schema):
+    cursor = Cursor(load_default=None)
+
+
+def test_cursor_round_trip_and_validation():
+    token = encode_cursor({"sort": "score desc", "key": [10, 7]})
+
+    cursor = QuerySchema().load({"cursor": token})["cursor"]
+
+    assert cursor_key(cursor, "score desc", 2) == [10, 7]
+    with pytest.raises(ValueError, match="does not match"):
+        cursor_key(cursor, "points desc", 2)
+    with pytest.raises(ValidationError):
+        QuerySchema().load({"cursor": "not a cursor"})
+
+
+def test_keyset_continues_after_key():
+    request = keyset(
+        select(UserModel.id),
+        [UserModel.score, UserModel.id],
+        after=[10, 7],
+        limit=50,
+        desc=True,
+    )
+
+    sql = str(request.compile(dialect=postgresql.dialect()))
+
+    assert "(users.score, users.id) < (" in sql
+    assert "ORDER BY users.score DESC, users.id DESC" in sql
+    assert "LIMIT" in sql
+
+
+def test_next_key_only_when_more_rows():
+    rows = [SimpleNamespace(id=i, score=100 - i) for i in range(3)]
+
+    assert make_page(rows, ("id",), 3).next_key is None
+    page = make_page(rows, ("score", "id"), 2)
+    assert page.items == rows[:2]
+    assert page.next_key == [99, 1]
@@ -0,0 +1,60 @@
+import time
+import tracemalloc
+
+from app.base.profiling import MemoryProfiler, SamplingProfiler, deep_sizeof
+
+
+def busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(100))
+
+
+def test_sampling_profiler_collapses_stacks():
+    profiler = SamplingProfiler()
+    profiler.start(interval=0.001, max_duration=60)
+    assert profiler.running
+
+    busy(0.1)
+    stacks = profiler.stop()
+
+    assert not profiler.running
+    lines = stacks.splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert stack.endswith(f"{__name__}:busy")
+    assert int(count) > 0
+
+
+async def test_memory_profiler_tracks_owners_and_growth():
+    profiler = MemoryProfiler()
+    game_states = {1: {"word": "ПОЛЕ", "used_letters": {"П"}}}
+    profiler.track("game_states", lambda: game_states)
+
+    profiler.start(frames=1)
+    try:
+        game_states.update(
+            {chat_id: {"used_letters": set("АБВ")} for chat_id in range(2, 500)}
+        )
+        top = profiler.diff(top=5)
+    finally:
+        profiler.stop()
+
+    assert not tracemalloc.is_tracing()
+    assert top[0]["size_diff"] > 0
+    size, objects = deep_sizeof(game_states)
+    assert await profiler.sizes(max_objects=objects) == {
+        "game_states": {"size": size, "objects": objects, "truncated": False}
+    }
+    assert objects > 500
+
+
+async def test_memory_profiler_stops_at_object_budget():
+    profiler = MemoryProfiler()
+    users = {user_id: f"user_{user_id}" for user_id in range(30_000)}
+    profiler.track("users", lambda: users)
+
+    sizes = await profiler.sizes(max_objects=25_000)
+
+    assert sizes["users"]["objects"] == 25_000
+    assert sizes["users"]["truncated"]
@@ -0,0 +1,45 @@
+import json
+from types import SimpleNamespace
+
+from app.internal.schemes import SlowQuerySchema
+from app.users.schema import LeaderboardEntrySchema, UserSchema
+from app.web.serializers import serializer
+from app.web.utils import OFFLOAD_ROWS, list_response
+
+
+def make_user(user_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=user_id, username=f"user_{user_id}", score=1, points=None, role="x"
+    )
+
+
+def test_flat_schema_matches_marshmallow():
+    user = make_user(1)
+    entry = {"rank": 3, "id": 1, "username": "user_1", "score": 2}
+
+    assert serializer(UserSchema).dump(user) == UserSchema().dump(user)
+    assert serializer(LeaderboardEntrySchema).dump(
+        entry
+    ) == LeaderboardEntrySchema().dump(entry)
+    assert serializer(UserSchema) is serializer(UserSchema)
+
+
+def test_missing_object_dumps_like_marshmallow():
+    assert serializer(UserSchema).dump(None) == UserSchema().dump(None) == {}
+
+
+def test_nested_schema_falls_back_to_marshmallow():
+    assert serializer(SlowQuerySchema).fields is None
+
+
+async def test_large_lists_are_built_the_same_way():
+    users = [make_user(user_id) for user_id in range(OFFLOAD_ROWS)]
+
+    response = await list_response(
+        "users", serializer(UserSchema), users, {"next_cursor": None}
+    )
+
+    body = json.loads(response.body)
+    assert body["status"] == "ok"
+    assert body["data"]["users"] == UserSchema(many=True).dump(users)
+    assert body["data"]["next_cursor"] is None
@@ -0,0 +1,112 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy import QueuePool
+
+from app.store.database.database import Database
+from app.store.database.slow_queries import SlowQueryLog, parameter_shape
+
+
+class FakeAccessor:
+    def __init__(self, database: Database) -> None:
+        self.database = database
+
+    def get_game(self):
+        return self.database.session
+
+
+def make_engine(plan: list[str]) -> MagicMock:
+    conn = MagicMock()
+    conn.exec_driver_sql = AsyncMock(return_value=[(line,) for line in plan])
+    engine = MagicMock()
+    engine.connect.return_value.__aenter__.return_value = conn
+    return engine
+
+
+def test_parameter_shape_hides_values():
+    assert parameter_shape(
+        {"chat_id": 5, "ids": [1, 2]}, executemany=False
+    ) == {
+        "chat_id": "int",
+        "ids": "list[2]",
+    }
+    assert parameter_shape((5, "word"), executemany=False) == ["int", "str"]
+    assert parameter_shape([(1, 2), (3, 4)], executemany=True) == {
+        "rows": 2,
+        "row": ["int", "int"],
+    }
+
+
+async def test_slow_select_is_explained_with_origin():
+    database = Database(MagicMock())
+    database.sessionmaker = MagicMock()
+    log = SlowQueryLog(threshold=0.1, size=2, analyze=True)
+    engine = make_engine(["Seq Scan on games"])
+
+    FakeAccessor(database).get_game()
+    log.check(
+        engine,
+        "SELECT * FROM games WHERE id = $1",
+        (1,),
+        executemany=False,
+        duration=0.05,
+    )
+    log.check(
+        engine,
+        "SELECT * FROM games WHERE id = $1",
+        (1,),
+        executemany=False,
+        duration=0.2,
+    )
+    await asyncio.gather(*log._tasks)
+
+    [entry] = log.entries
+    assert entry.origin == "FakeAccessor.get_game"
+    assert entry.parameters == ["int"]
+    assert entry.plan == ["Seq Scan on games"]
+    conn = engine.connect.return_value.__aenter__.return_value
+    conn.exec_driver_sql.assert_awaited_once_with(
+        "EXPLAIN ANALYZE SELECT * FROM games WHERE id = $1", (1,)
+    )
+
+
+async def test_writes_are_not_analyzed_and_log_is_bounded():
+    log = SlowQueryLog(threshold=0.1, size=2, analyze=True)
+    engine = make_engine([])
+
+    for game_id in range(3):
+        log.check(
+            engine,
+            "UPDATE games SET turns = $1",
+            [(game_id,)],
+            executemany=True,
+            duration=1.0,
+        )
+    await asyncio.gather(*log._tasks)
+
+    assert len(log.entries) == 2
+    conn = engine.connect.return_value.__aenter__.return_value
+    # Повторы того же запроса в пределах интервала не объясняются.
+    conn.exec_driver_sql.assert_awaited_once_with(
+        "EXPLAIN UPDATE games SET turns = $1", (0,)
+    )
+
+
+async def test_explain_is_skipped_while_busy():
+    log = SlowQueryLog(threshold=0.1, size=10, analyze=False)
+    engine = make_engine([])
+
+    log.check(engine, "SELECT 1", (), executemany=False, duration=1.0)
+    log.check(engine, "SELECT 2", (), executemany=False, duration=1.0)
+    assert len(log._tasks) == 1
+    await asyncio.gather(*log._tasks)
+
+    engine.sync_engine.pool = MagicMock(spec=QueuePool)
+    engine.sync_engine.pool.checkedout.return_value = 5
+    engine.sync_engine.pool.size.return_value = 5
+    log.check(engine, "SELECT 3", (), executemany=False, duration=1.0)
+
+    assert not log._tasks
+    assert len(log.entries) == 3
+    conn = engine.connect.return_value.__aenter__.return_value
+    conn.exec_driver_sql.assert_awaited_once_with("EXPLAIN SELECT 1", ())
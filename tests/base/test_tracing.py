@@ -0,0 +1,73 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from app.base.tracing import Tracer, untraced_context
+from app.internal.views import TraceExportView
+
+
+async def test_spans_of_sampled_trace():
+    tracer = Tracer(sample_rate=1.0, size=100)
+    background = []
+
+    async def later() -> None:
+        await asyncio.sleep(0)
+        tracer.record("telegram sendMessage", 0.0, 0.5)
+
+    with tracer.trace("update /play") as trace_id:
+        with tracer.span("db flush_game_writes"):
+            tracer.record("db GameAccessor.create_game", 1.0, 0.25)
+        background.append(asyncio.create_task(later()))
+        background.append(
+            asyncio.create_task(later(), context=untraced_context())
+        )
+    await asyncio.gather(*background)
+
+    spans = {span.name: span for span in tracer.spans}
+    root = spans["update /play"]
+    flush = spans["db flush_game_writes"]
+    assert root.trace_id == trace_id
+    assert root.parent_id is None
+    assert flush.parent_id == root.span_id
+    assert spans["db GameAccessor.create_game"].parent_id == flush.span_id
+    # Фоновая задача без контекста трассы спанов не пишет.
+    assert [span.name for span in tracer.spans].count(
+        "telegram sendMessage"
+    ) == 1
+
+    events = tracer.export("chrome")["traceEvents"]
+    assert {event["tid"] for event in events} == {trace_id}
+    assert events[0]["ph"] == "X"
+
+
+def test_unsampled_traces_and_ring_buffer():
+    tracer = Tracer(sample_rate=0.0, size=2)
+    with tracer.trace("update /rules") as trace_id:
+        tracer.record("telegram sendMessage", 0.0, 0.1)
+    assert trace_id is None
+    assert not tracer.spans
+
+    tracer.sample_rate = 1.0
+    for _ in range(3):
+        with tracer.trace("update /rules"):
+            pass
+    assert len(tracer.export("json")) == 2
+
+
+async def test_export_view_returns_the_trace_itself():
+    app = web.Application()
+    app.tracer = Tracer(sample_rate=1.0, size=10)
+    app.config = SimpleNamespace(internal=SimpleNamespace(token="secret"))
+    app.router.add_view("/internal/traces", TraceExportView)
+    with app.tracer.trace("update /rules"):
+        pass
+
+    async with TestClient(TestServer(app)) as client:
+        response = await client.get(
+            "/internal/traces", headers={"Authorization": "Bearer secret"}
+        )
+        body = await response.json()
+
+    assert body == app.tracer.export("chrome")
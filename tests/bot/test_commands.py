@@ -2,7 +2,9 @@ from unittest.mock import AsyncMock
 
 import pytest
 
+from app.store.bot.registry import ChatPhase
 from app.store.telegram_api.dataclasses import Message, UpdateMessage
+from app.users.leaderboard import LeaderboardEntry
 
 
 @pytest.mark.asyncio
@@ -11,16 +13,19 @@ async def test_play_command(bot_manager):
         id=1, chat_id=123, text="/play", from_id=1, username="test_user"
     )
 
-    bot_manager.app.store.game.get_active_game_by_chat_id.side_effect = [
-        None,
-        AsyncMock(id=42),
-    ]
-    bot_manager.app.store.game.create_game = AsyncMock()
+    bot_manager.app.store.game.create_game = AsyncMock(
+        return_value=AsyncMock(id=42, question_id=7)
+    )
+    bot_manager.app.store.game.get_question_by_id.return_value = AsyncMock(
+        text="Вопрос"
+    )
     bot_manager.app.store.telegram_api.send_message = AsyncMock()
 
     await bot_manager.handle_command("/play", mock_message)
 
     bot_manager.app.store.game.create_game.assert_called_once_with(123)
+    assert bot_manager.chats.phase(123) is ChatPhase.REGISTERING
+    bot_manager.registration_tasks[123].cancel()
 
     bot_manager.app.store.telegram_api.send_message.assert_called_once()
     sent_message = bot_manager.app.store.telegram_api.send_message.call_args[0][
@@ -56,7 +61,7 @@ async def test_start_command_existing_user(bot_manager):
     mock_message = UpdateMessage(
         id=1, chat_id=123, text="/start", from_id=1, username="test_user"
     )
-    user = AsyncMock()
+    user = AsyncMock(username="test_user")
     bot_manager.app.store.users.get_by_id.return_value = user
 
     await bot_manager.handle_command("/start", mock_message)
@@ -92,9 +97,7 @@ async def test_play_command_active_game(bot_manager):
         id=1, chat_id=123, text="/play", from_id=1, username="test_user"
     )
     bot_manager.start_new_game = AsyncMock()
-    bot_manager.app.store.game.get_active_game_by_chat_id.return_value = (
-        AsyncMock()
-    )
+    bot_manager.chats.start_registration(123, 42, "Вопрос")
 
     await bot_manager.handle_command("/play", mock_message)
 
@@ -124,3 +127,76 @@ async def test_profile_command_existing_user(bot_manager):
     assert "Профиль игрока @existing_user" in sent_message.text
     assert "Побед: 5" in sent_message.text
     assert "Очков: 150" in sent_message.text
+    assert "Место в рейтинге" in sent_message.text
+
+
+@pytest.mark.asyncio
+async def test_start_command_refreshes_changed_username(bot_manager):
+    mock_message = UpdateMessage(
+        id=1, chat_id=123, text="/start", from_id=1, username="new_name"
+    )
+    user = AsyncMock(username="old_name")
+    bot_manager.app.store.users.get_by_id.return_value = user
+
+    await bot_manager.handle_command("/start", mock_message)
+
+    bot_manager.app.store.users.create_user.assert_called_once_with(
+        1, "new_name"
+    )
+    sent_message = bot_manager.app.store.telegram_api.send_message.call_args[0][
+        0
+    ]
+    assert "А я Вас уже знаю!" in sent_message.text
+
+
+@pytest.mark.asyncio
+async def test_top_command(bot_manager):
+    mock_message = UpdateMessage(
+        id=1, chat_id=123, text="/top", from_id=1, username="test_user"
+    )
+    bot_manager.app.store.leaderboard.top.return_value = [
+        LeaderboardEntry(1, 7, "winner", 4, 1200),
+        LeaderboardEntry(2, 8, "runner_up", 2, 300),
+    ]
+
+    await bot_manager.handle_command("/top", mock_message)
+
+    sent_message = bot_manager.app.store.telegram_api.send_message.call_args[0][
+        0
+    ]
+    assert "1. @winner — побед: 4, очков: 1200" in sent_message.text
+    assert "2. @runner_up" in sent_message.text
+
+
+@pytest.mark.asyncio
+async def test_question_and_used_are_answered_from_memory(bot_manager):
+    bot_manager.chats.start_registration(123, 42, "Столица Франции")
+    bot_manager.chats.start_playing(123, 42)
+    bot_manager.game_states[123] = {"used_letters": {"А"}}
+
+    for command in ("/question", "/used"):
+        await bot_manager.handle_command(
+            command,
+            UpdateMessage(
+                id=1, chat_id=123, text=command, from_id=1, username="u"
+            ),
+        )
+
+    bot_manager.app.store.game.get_question_by_id.assert_not_called()
+    send_message = bot_manager.app.store.telegram_api.send_message
+    sent = [call.args[0].text for call in send_message.call_args_list]
+    assert sent == ["Загадка: Столица Франции", "Использованные буквы: А"]
+
+
+@pytest.mark.asyncio
+async def test_restore_chats_closes_orphaned_games(bot_manager):
+    bot_manager.app.store.game.list_active_games = AsyncMock(
+        return_value=[AsyncMock(id=42, chat_id=123)]
+    )
+    bot_manager.app.store.game.settle_game = AsyncMock()
+
+    await bot_manager.restore_chats(bot_manager.app)
+
+    bot_manager.app.store.game.settle_game.assert_awaited_once_with(
+        42, totals={}
+    )
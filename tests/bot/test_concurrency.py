@@ -0,0 +1,70 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.store.bot.registry import ChatPhase
+from app.store.telegram_api.dataclasses import (
+    Message,
+    UpdateMessage,
+    UpdateObject,
+)
+
+
+def play(update_id: int, chat_id: int = 123) -> UpdateObject:
+    return UpdateObject(
+        id=update_id,
+        type="message",
+        object=UpdateMessage(
+            id=update_id,
+            chat_id=chat_id,
+            text="/play",
+            from_id=update_id,
+            username=f"user_{update_id}",
+        ),
+    )
+
+
+@pytest.fixture
+async def slow_create_game(bot_manager):
+    async def create_game(chat_id):
+        await asyncio.sleep(0.01)
+        return AsyncMock(id=chat_id, question_id=7)
+
+    bot_manager.app.store.game.create_game = AsyncMock(side_effect=create_game)
+    bot_manager.app.store.game.get_question_by_id.return_value = AsyncMock(
+        text="Вопрос"
+    )
+    yield bot_manager
+    tasks = list(bot_manager.registration_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_simultaneous_play_creates_one_game(slow_create_game):
+    bot_manager = slow_create_game
+
+    await asyncio.gather(
+        bot_manager.handle_updates([play(1)]),
+        bot_manager.handle_updates([play(2)]),
+    )
+
+    bot_manager.app.store.game.create_game.assert_awaited_once_with(123)
+    assert bot_manager.chats.phase(123) is ChatPhase.REGISTERING
+    bot_manager.app.store.telegram_api.send_message.assert_any_await(
+        Message(chat_id=123, text="В этом чате уже идёт игра!")
+    )
+
+
+@pytest.mark.asyncio
+async def test_chats_in_one_batch_are_handled_concurrently(slow_create_game):
+    bot_manager = slow_create_game
+
+    await asyncio.wait_for(
+        bot_manager.handle_updates([play(i, chat_id=i) for i in range(50)]),
+        timeout=0.25,
+    )
+
+    assert bot_manager.app.store.game.create_game.await_count == 50
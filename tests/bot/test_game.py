@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.store.bot.registry import ChatPhase
+
+
+def make_game_state(game_id: int = 42) -> dict:
+    players = [
+        (
+            SimpleNamespace(id=10 + i, user_id=i, points=0),
+            SimpleNamespace(id=i, username=f"user_{i}", points=500, score=3),
+        )
+        for i in (1, 2)
+    ]
+    return {
+        "question": "Вопрос",
+        "word": "СЛОВО",
+        "word_state": 0b00111,
+        "current_player_idx": 0,
+        "current_sector": 3,
+        "guessing_word": False,
+        "used_letters": set(),
+        "players": players,
+        "scores": {1: 700, 2: 0},
+        "game_id": game_id,
+        "waiting_for_input": False,
+        "turns": 4,
+    }
+
+
+@pytest.mark.asyncio
+async def test_end_game_settles_in_one_call(bot_manager):
+    bot_manager.app.store.game.settle_game = AsyncMock()
+    bot_manager.game_states[123] = make_game_state()
+    winner = bot_manager.game_states[123]["players"][0][1]
+
+    await bot_manager.end_game(123, winner)
+
+    bot_manager.app.store.game_writes.flush.assert_awaited_once_with(42)
+    bot_manager.app.store.game.settle_game.assert_awaited_once_with(
+        game_id=42,
+        totals={1: (700, 1), 2: (0, 1)},
+        winner_id=1,
+        word_state=0b11111,
+        turns=4,
+    )
+
+
+@pytest.mark.asyncio
+async def test_stop_game_keeps_word_state(bot_manager):
+    bot_manager.app.store.game.settle_game = AsyncMock()
+    bot_manager.game_states[123] = make_game_state()
+
+    await bot_manager.stop_game(123)
+
+    settle = bot_manager.app.store.game.settle_game
+    assert settle.await_args.kwargs["word_state"] == 0b00111
+    assert settle.await_args.kwargs["winner_id"] is None
+
+
+@pytest.mark.asyncio
+async def test_start_game_round_loads_round_in_one_call(bot_manager):
+    players = make_game_state()["players"]
+    bot_manager.app.store.game.load_round.return_value = SimpleNamespace(
+        game_id=42, question="Вопрос", answer="слово", players=players
+    )
+    bot_manager.run_game = AsyncMock()
+    bot_manager.chats.start_registration(123, 42, "Вопрос")
+
+    await bot_manager.start_game_round(123, 42)
+
+    bot_manager.app.store.game.load_round.assert_awaited_once_with(42)
+    bot_manager.app.store.game.get_question_by_id.assert_not_called()
+    bot_manager.app.store.game.get_players_by_game_id.assert_not_called()
+    game_state = bot_manager.game_states[123]
+    assert game_state["word"] == "СЛОВО"
+    assert game_state["players"] == players
+    assert game_state["scores"] == {1: 0, 2: 0}
+    assert bot_manager.chats.phase(123) is ChatPhase.PLAYING
+    await bot_manager.game_tasks[123]
@@ -0,0 +1,111 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.store.bot.registry import ChatPhase
+from app.store.bot.roster import Roster
+from app.store.database.query_stats import (
+    QueryStats,
+    instrument_engine,
+    track_queries,
+)
+from app.store.telegram_api.dataclasses import (
+    CallbackQuery,
+    UpdateMessage,
+    UpdateObject,
+)
+
+
+def command(text: str, chat_id: int = 123) -> UpdateObject:
+    return UpdateObject(
+        id=1,
+        type="message",
+        object=UpdateMessage(
+            id=1, chat_id=chat_id, text=text, from_id=3, username="user_3"
+        ),
+    )
+
+
+def test_engine_statements_are_counted_per_context():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with track_queries("test") as queries:
+            conn.execute(text("SELECT 1"))
+            with track_queries("inner") as inner:
+                conn.execute(text("SELECT 2"))
+
+    assert queries.statements == 2
+    assert queries.duration > 0
+    assert inner.statements == 1
+
+
+async def test_updates_are_recorded_by_handler(bot_manager):
+    stats = bot_manager.app.database.query_stats = QueryStats()
+    bot_manager.app.store.users.get_by_id.return_value = AsyncMock(
+        username="user_3", score=1, points=10
+    )
+
+    await bot_manager.handle_chat_updates(
+        [command("/rules"), command("/profile@bot"), command("/nope")]
+    )
+
+    assert sorted(stats.handlers) == ["/profile", "/rules", "unknown"]
+    assert stats.handlers["/profile"].updates == 1
+    assert 'bot_updates_total{handler="/rules"} 1' in stats.render()
+
+
+async def test_profile_fits_query_budget(bot_manager, query_budget):
+    bot_manager.app.store.users.get_by_id.return_value = AsyncMock(
+        username="user_3", score=1, points=10
+    )
+
+    with query_budget(1, "/profile"):
+        await bot_manager.handle_chat_updates([command("/profile")])
+
+
+async def test_question_fits_query_budget(bot_manager, query_budget):
+    bot_manager.chats.start_registration(123, 42, "Вопрос")
+
+    with query_budget(0, "/question"):
+        await bot_manager.handle_chat_updates([command("/question")])
+
+    assert bot_manager.chats.phase(123) is ChatPhase.REGISTERING
+
+
+async def test_participate_fits_query_budget(bot_manager, query_budget):
+    bot_manager.app.store.users.get_by_id.return_value = AsyncMock(
+        username="user_3"
+    )
+    bot_manager.chats.start_registration(123, 42, "Вопрос")
+    bot_manager.registration_tasks[123] = AsyncMock()
+    bot_manager.rosters[123] = Roster(42)
+    query = CallbackQuery(
+        id=1, chat_id=123, from_id=3, username="user_3", data="participate_42"
+    )
+
+    # Пользователь и его вставка в игру.
+    with query_budget(2, "participate"):
+        await bot_manager.handle_chat_updates(
+            [UpdateObject(id=1, type="callback_query", object=query)]
+        )
+        assert await bot_manager.rosters[123].wait_persisted() == {3}
+
+    bot_manager.app.store.game.create_player.assert_awaited_once_with(
+        user_id=3, game_id=42
+    )
+
+
+async def test_budget_overrun_fails(bot_manager, query_budget):
+    store = bot_manager.app.store
+
+    async def over_budget():
+        with query_budget(1):
+            await store.game.get_question_by_id(1)
+            await store.users.get_by_id(1)
+
+    with pytest.raises(AssertionError, match="2 queries, budget is 1"):
+        await over_budget()
@@ -0,0 +1,113 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.store.bot.roster import Roster
+from app.store.telegram_api.dataclasses import CallbackQuery
+
+
+def participate(user_id: int, game_id: int = 42) -> CallbackQuery:
+    return CallbackQuery(
+        id=user_id,
+        chat_id=123,
+        from_id=user_id,
+        username=f"user_{user_id}",
+        data=f"participate_{game_id}",
+    )
+
+
+@pytest.fixture
+def registering(bot_manager):
+    bot_manager.app.store.users.get_by_id.side_effect = lambda user_id: (
+        AsyncMock(id=user_id, username=f"user_{user_id}")
+    )
+    bot_manager.registration_tasks[123] = AsyncMock()
+    bot_manager.rosters[123] = Roster(42)
+    return bot_manager
+
+
+@pytest.mark.asyncio
+async def test_repeated_join_registers_once(registering):
+    await registering.handle_callback_query(participate(1))
+    await registering.handle_callback_query(participate(1))
+    await registering.rosters[123].wait_persisted()
+
+    registering.app.store.game.create_player.assert_awaited_once_with(
+        user_id=1, game_id=42
+    )
+    registering.app.store.telegram_api.send_message.assert_called_once()
+    registering.app.store.game.get_players_by_game_id.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_join_for_other_game_is_rejected(registering):
+    await registering.handle_callback_query(participate(1, game_id=7))
+
+    registering.app.store.game.create_player.assert_not_called()
+    registering.app.store.telegram_api.send_callback_answer.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_game_start_closes_the_game(bot_manager):
+    bot_manager.app.store.game.create_game.return_value = AsyncMock(id=42)
+    bot_manager.app.store.game.get_question_by_id.side_effect = RuntimeError
+    bot_manager.app.store.game.settle_game = AsyncMock()
+
+    with pytest.raises(RuntimeError):
+        await bot_manager.start_new_game(
+            AsyncMock(chat_id=123, from_id=1, username="user_1")
+        )
+
+    bot_manager.app.store.game.settle_game.assert_awaited_once_with(
+        42, totals={}
+    )
+    assert bot_manager.chats.get(123) is None
+
+
+@pytest.mark.asyncio
+async def test_cancelled_registration_closes_the_game(bot_manager):
+    bot_manager.app.store.game.settle_game = AsyncMock()
+    bot_manager.chats.start_registration(123, 42, "Вопрос")
+    task = asyncio.create_task(bot_manager.handle_registration_period(42, 123))
+    await asyncio.sleep(0)
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    bot_manager.app.store.game.settle_game.assert_awaited_once_with(
+        42, totals={}
+    )
+    assert bot_manager.chats.get(123) is None
+
+
+@pytest.mark.asyncio
+async def test_failed_player_insert_is_not_registered(registering):
+    registering.app.store.game.create_player.side_effect = [
+        None,
+        RuntimeError("insert failed"),
+    ]
+    await registering.handle_callback_query(participate(1))
+    await registering.handle_callback_query(participate(2))
+
+    roster = registering.rosters[123]
+    assert await roster.wait_persisted() == {1}
+    assert 2 not in roster
+
+
+@pytest.mark.asyncio
+async def test_round_with_one_player_is_not_started(bot_manager):
+    bot_manager.app.store.game.settle_game = AsyncMock()
+    bot_manager.app.store.game.load_round.return_value = AsyncMock(
+        players=[(AsyncMock(user_id=1), AsyncMock(id=1))]
+    )
+    bot_manager.chats.start_registration(123, 42, "Вопрос")
+
+    await bot_manager.start_game_round(123, 42)
+
+    assert 123 not in bot_manager.game_states
+    bot_manager.app.store.game.settle_game.assert_awaited_once_with(
+        42, totals={}
+    )
+    assert bot_manager.chats.get(123) is None
@@ -0,0 +1,36 @@
+from app.base.broadcast import Broadcast
+from app.store.bot.registry import CHAT_SHARDS, ChatPhase, ChatRegistry
+
+
+def test_counters_follow_transitions():
+    chats = ChatRegistry()
+    events = chats.events.subscribe()
+
+    chats.start_registration(1, 10, "Вопрос")
+    chats.start_registration(CHAT_SHARDS + 1, 11, "Вопрос")
+    chats.start_playing(1, 10)
+    chats.finish(1)
+    chats.finish(1)
+
+    assert chats.count(ChatPhase.REGISTERING) == 1
+    assert chats.count(ChatPhase.PLAYING) == 0
+    assert chats.shards()[1] == 1
+    assert chats.oldest()[0] == CHAT_SHARDS + 1
+    assert [events.get_nowait()["event"] for _ in range(events.qsize())] == [
+        "registration_started",
+        "registration_started",
+        "game_started",
+        "game_finished",
+    ]
+
+
+def test_slow_subscriber_is_dropped():
+    broadcast = Broadcast(max_queue=2)
+    slow = broadcast.subscribe()
+
+    for event in range(3):
+        broadcast.publish(event)
+
+    assert len(broadcast) == 0
+    assert slow.get_nowait() is None
+    assert slow.empty()
@@ -0,0 +1,56 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.store.bot.write_buffer import GameWriteBuffer
+
+
+@pytest.fixture
+def write_buffer(mock_app):
+    mock_app.store.game.apply_game_writes = AsyncMock()
+    return GameWriteBuffer(mock_app)
+
+
+@pytest.mark.asyncio
+async def test_flush_coalesces_turn_writes(write_buffer):
+    write_buffer.record_word_state(42, 1)
+    write_buffer.record_player_points(42, 7, 350)
+    write_buffer.record_word_state(42, 3)
+    write_buffer.record_player_points(42, 7, 700)
+    write_buffer.record_next_player(42, 7, 8)
+
+    await write_buffer.flush(42)
+
+    apply = write_buffer.app.store.game.apply_game_writes
+    apply.assert_awaited_once_with(
+        word_states={42: 3},
+        player_points={7: 700},
+        next_players={7: 8},
+    )
+    assert write_buffer.pending_games == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_keeps_other_games_pending(write_buffer):
+    write_buffer.record_word_state(1, 1)
+    write_buffer.record_word_state(2, 1)
+
+    await write_buffer.flush(1)
+
+    assert write_buffer.pending_games == 1
+    await write_buffer.flush(3)
+    write_buffer.app.store.game.apply_game_writes.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried(write_buffer):
+    apply = write_buffer.app.store.game.apply_game_writes
+    apply.side_effect = [ConnectionError, None]
+    write_buffer.record_player_points(42, 7, 350)
+
+    with pytest.raises(ConnectionError):
+        await write_buffer.flush()
+    write_buffer.record_player_points(42, 8, 400)
+    await write_buffer.flush()
+
+    assert apply.await_args.kwargs["player_points"] == {7: 350, 8: 400}
@@ -1,8 +1,10 @@
-from unittest.mock import AsyncMock
+from contextlib import contextmanager
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
 from app.store.bot.manager import BotManager
+from app.store.database.query_stats import count_query, track_queries
 from app.web.app import Application
 
 
@@ -12,17 +14,56 @@ def mock_app():
     app.store.users.get_by_id = AsyncMock()
     app.store.users.create_user = AsyncMock()
     app.store.telegram_api.send_message = AsyncMock()
-    app.store.game.get_active_game_by_chat_id = AsyncMock()
+    app.store.telegram_api.send_callback_answer = AsyncMock()
     app.store.game.create_game = AsyncMock()
     app.store.game.get_question_by_id = AsyncMock()
     app.store.game.get_players_by_game_id = AsyncMock()
+    app.store.game.load_round = AsyncMock()
+    app.store.game.create_player = AsyncMock()
     app.store.game.update_word_state = AsyncMock()
     app.store.game.update_player_points = AsyncMock()
     app.store.game.update_next_player = AsyncMock()
     app.store.game.end_game = AsyncMock()
+    app.store.game_writes = MagicMock()
+    app.store.game_writes.flush = AsyncMock()
+    app.database = MagicMock()
     return app
 
 
+DB_ACCESSORS = ("game", "users", "stats", "game_writes")
+
+
+def _db_awaits(app) -> int:
+    return sum(
+        child.await_count
+        for name in DB_ACCESSORS
+        for child in getattr(app.store, name)._mock_children.values()
+        if isinstance(child, AsyncMock)
+    )
+
+
+@pytest.fixture
+def query_budget(mock_app):
+    """Проверяет, что обработчик уложился в заявленное число запросов.
+
+    Запросы считаются событиями движка, а с замоканным хранилищем —
+    по одному на каждый вызов метода аксессора, ходящего в БД.
+    """
+
+    @contextmanager
+    def budget(limit: int, label: str = "test"):
+        awaits = _db_awaits(mock_app)
+        with track_queries(label) as queries:
+            yield queries
+            for _ in range(_db_awaits(mock_app) - awaits):
+                count_query(0.0)
+        assert (
+            queries.statements <= limit
+        ), f"{label}: {queries.statements} queries, budget is {limit}"
+
+    return budget
+
+
 @pytest.fixture
 def bot_manager(mock_app):
     return BotManager(mock_app)
@@ -0,0 +1,161 @@
+from datetime import UTC, date, datetime
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from app.game.archiver import (
+    GameArchiver,
+    add_months,
+    parse_partition,
+    partition_name,
+)
+
+
+class FakeSession:
+    """Сессия, которая компилирует запросы для PostgreSQL и записывает их.
+
+    respond(sql) возвращает строки результата запроса.
+    """
+
+    def __init__(self, respond) -> None:
+        self.respond = respond
+        self.executed: list[tuple[str, dict | None]] = []
+        self.commits = 0
+
+    async def execute(self, statement, params=None):
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        self.executed.append((sql, params))
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = self.respond(sql)
+        return result
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    def sql(self) -> list[str]:
+        return [sql for sql, _ in self.executed]
+
+
+def make_archiver(respond=lambda sql: []) -> tuple[GameArchiver, FakeSession]:
+    app = MagicMock()
+    app.config.game.archive_batch_size = 2
+    app.config.game.archive_mode = "detach"
+    session = FakeSession(respond)
+    app.database.session.__aenter__.return_value = session
+    return GameArchiver(app), session
+
+
+def test_partition_names_round_trip():
+    name = partition_name("games_history", date(2025, 3, 1))
+
+    assert name == "games_history_y2025m03"
+    assert parse_partition(name) == ("games_history", date(2025, 3, 1))
+    assert parse_partition("games_history_default") is None
+    assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert add_months(date(2025, 1, 1), -12) == date(2024, 1, 1)
+
+
+async def test_ended_games_move_with_their_players_in_batches():
+    batches = [[1, 2], [3]]
+    archiver, session = make_archiver(
+        lambda sql: batches.pop(0) if "FOR UPDATE SKIP LOCKED" in sql else []
+    )
+    cutoff = datetime(2026, 2, 1, tzinfo=UTC)
+
+    moved = await archiver.move_ended(cutoff)
+
+    assert moved == 3
+    assert session.commits == 2
+    sql = session.sql()
+    assert len(sql) == 10
+    pick, copy_players, copy_games, delete_players, delete_games = sql[:5]
+    assert "games.game_state = %(game_state_1)s" in pick
+    assert "games.ended_at < %(cutoff)s" in pick
+    assert copy_players.startswith("INSERT INTO players_history")
+    # Игроки попадают в секцию месяца своей игры.
+    assert "coalesce(games.created_at, games.ended_at)" in copy_players
+    assert "JOIN games ON games.id = players.game_id" in copy_players
+    assert copy_games.startswith("INSERT INTO games_history")
+    assert delete_players.startswith("DELETE FROM players ")
+    assert delete_games.startswith("DELETE FROM games ")
+    assert session.executed[0][1] == {"cutoff": cutoff, "limit": 2}
+    assert session.executed[1][1] == {"ids": [1, 2]}
+    assert session.executed[6][1] == {"ids": [3]}
+
+
+async def test_partitions_are_created_ahead_and_for_default_rows():
+    def respond(sql):
+        if "pg_inherits" in sql:
+            return ["games_history_y2026m02", "players_history_y2026m02"]
+        if "FROM games_history_default" in sql:
+            return [datetime(2025, 11, 1)]
+        return []
+
+    archiver, session = make_archiver(respond)
+
+    created = await archiver.ensure_partitions(
+        [date(2026, 2, 1), date(2026, 3, 1)]
+    )
+
+    assert created == [
+        "games_history_y2025m11",
+        "games_history_y2026m03",
+        "players_history_y2026m03",
+    ]
+    sql = session.sql()
+    # Строки из секции по умолчанию переезжают до присоединения секции.
+    move = sql.index(
+        "WITH moved AS (DELETE FROM games_history_default "
+        "WHERE created_at >= '2025-11-01+00' "
+        "AND created_at < '2025-12-01+00' RETURNING *) "
+        "INSERT INTO games_history_y2025m11 SELECT * FROM moved"
+    )
+    assert sql[move + 1] == (
+        "ALTER TABLE games_history ATTACH PARTITION games_history_y2025m11 "
+        "FOR VALUES FROM ('2025-11-01+00') TO ('2025-12-01+00')"
+    )
+    assert not any("PARTITION OF" in statement for statement in sql)
+    assert "game_created_at >= '2026-03-01+00'" in " ".join(sql)
+
+
+async def test_old_partitions_are_detached_one_by_one():
+    archiver, session = make_archiver(
+        lambda sql: [
+            "games_history_y2025m01",
+            "players_history_y2025m01",
+            "games_history_y2025m02",
+            "games_history_default",
+        ]
+    )
+
+    archived = await archiver.archive(before=date(2025, 2, 1))
+
+    assert archived == ["games_history_y2025m01", "players_history_y2025m01"]
+    assert session.commits == 2
+    assert session.sql()[1:] == [
+        "ALTER TABLE games_history DETACH PARTITION games_history_y2025m01",
+        "ALTER TABLE games_history_y2025m01 SET SCHEMA archive",
+        "ALTER TABLE players_history DETACH PARTITION players_history_y2025m01",
+        "ALTER TABLE players_history_y2025m01 SET SCHEMA archive",
+    ]
+
+
+async def test_run_archives_months_past_retention():
+    app = MagicMock()
+    app.config.game.archive_after_months = 6
+    app.config.game.archive_months_ahead = 2
+    app.config.game.archive_move_after = 3600.0
+    archiver = GameArchiver(app)
+    archiver.ensure_partitions = AsyncMock()
+    archiver.move_ended = AsyncMock()
+    archiver.archive = AsyncMock(return_value=[])
+
+    await archiver.run(now=datetime(2026, 2, 15, tzinfo=UTC))
+
+    archiver.ensure_partitions.assert_awaited_once_with(
+        [date(2026, 1, 1), date(2026, 2, 1), date(2026, 3, 1), date(2026, 4, 1)]
+    )
+    archiver.move_ended.assert_awaited_once_with(
+        datetime(2026, 2, 14, 23, tzinfo=UTC)
+    )
+    archiver.archive.assert_awaited_once_with(date(2025, 8, 1))
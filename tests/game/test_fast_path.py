@@ -0,0 +1,27 @@
+from unittest.mock import AsyncMock, MagicMock
+
+from app.game.fast_path import GameFastPath
+
+
+def make_fast_path(conn) -> GameFastPath:
+    fast_path = GameFastPath(MagicMock())
+    fast_path._connection = MagicMock()
+    fast_path._connection.return_value.__aenter__.return_value = conn
+    return fast_path
+
+
+async def test_game_writes_are_sent_in_one_transaction():
+    conn = MagicMock()
+    conn.executemany = AsyncMock()
+    fast_path = make_fast_path(conn)
+
+    await fast_path.apply_game_writes(
+        word_states={1: 7}, player_points={10: 300}, next_players={}
+    )
+
+    conn.transaction.assert_called_once()
+    assert [call.args[1] for call in conn.executemany.await_args_list] == [
+        [(1, 7)],
+        [(10, 300)],
+    ]
+    fast_path.app.database.mark_write.assert_called_once()
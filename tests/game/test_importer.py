@@ -0,0 +1,99 @@
+import asyncio
+
+from app.game.importer import (
+    MAX_LINE,
+    QuestionRow,
+    RowError,
+    collect_rows,
+    read_rows,
+    split_lines,
+)
+
+
+async def lines(*items: str):
+    for item in items:
+        await asyncio.sleep(0)
+        yield f"{item}\n".encode()
+
+
+async def test_csv_rows_are_validated_and_normalized():
+    rows, errors = await collect_rows(
+        read_rows(
+            lines(
+                "\ufefftext,answer",
+                "Столица Франции, Париж ",
+                "",
+                '"Река, на которой стоит Рим",Тибр',
+                "Число,42",
+                "Нота,я",
+                "Город на Неве,париж",
+            ),
+            "csv",
+        )
+    )
+
+    assert rows == [
+        QuestionRow(2, "Столица Франции", "париж"),
+        QuestionRow(4, "Река, на которой стоит Рим", "тибр"),
+    ]
+    assert errors == [
+        RowError(5, "answer must consist of letters only"),
+        RowError(6, "answer must be at least 2 letters long"),
+        RowError(7, "duplicate answer in upload"),
+    ]
+
+
+async def test_ndjson_reports_broken_rows():
+    rows, errors = await collect_rows(
+        read_rows(
+            lines(
+                '{"text": "Самая длинная река", "answer": "Нил"}',
+                "{not json",
+                '{"text": "Без ответа"}',
+                "[1, 2]",
+            ),
+            "ndjson",
+        )
+    )
+
+    assert rows == [QuestionRow(1, "Самая длинная река", "нил")]
+    assert [error.row for error in errors] == [2, 3, 4]
+
+
+async def chunks(*items: bytes):
+    for item in items:
+        await asyncio.sleep(0)
+        yield item
+
+
+async def test_lines_are_split_across_chunks():
+    split = [
+        line
+        async for line in split_lines(
+            chunks(b"one\ntw", b"o\nthr", b"ee"), limit=8
+        )
+    ]
+
+    assert split == [b"one\n", b"two\n", b"three"]
+
+
+async def test_overlong_line_is_reported_and_skipped():
+    long_line = b"x" * (MAX_LINE + 1)
+    rows, errors = await collect_rows(
+        read_rows(
+            chunks(
+                '{"text": "Нота", "answer": "до"}\n'.encode(),
+                long_line[: MAX_LINE // 2],
+                long_line[MAX_LINE // 2 :],
+                b"x\n",
+                b'{"text": "Nile", "answer": "nile"}\n',
+            ),
+            "ndjson",
+        )
+    )
+
+    assert rows == [
+        QuestionRow(1, "Нота", "до"),
+        QuestionRow(3, "Nile", "nile"),
+    ]
+    assert errors == [RowError(2, f"line is longer than {MAX_LINE} bytes")]
@@ -0,0 +1,55 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from app.game.accessor import SERIALIZATION_FAILURE, GameAccessor
+
+
+async def test_second_settlement_credits_nobody():
+    app = MagicMock()
+    session = app.database.session.__aenter__.return_value
+    # Игра уже закрыта: UPDATE с условием на статус не вернул строку.
+    result = MagicMock()
+    result.one_or_none.return_value = None
+    session.execute = AsyncMock(return_value=result)
+    app.database.notify_changed = AsyncMock()
+    accessor = GameAccessor(app)
+
+    users = await accessor.settle_game(1, totals={10: (500, 1)}, turns=3)
+
+    assert users == []
+    session.execute.assert_awaited_once()
+    session.commit.assert_not_called()
+    app.database.notify_changed.assert_not_awaited()
+
+
+async def test_settlement_that_lost_a_serialization_race_credits_nobody():
+    app = MagicMock()
+    session = app.database.session.__aenter__.return_value
+    conflict = MagicMock(sqlstate=SERIALIZATION_FAILURE)
+    session.execute = AsyncMock(
+        side_effect=DBAPIError("UPDATE games", None, conflict)
+    )
+    app.database.notify_changed = AsyncMock()
+    accessor = GameAccessor(app)
+
+    users = await accessor.settle_game(1, totals={10: (500, 1)}, turns=3)
+
+    assert users == []
+    session.commit.assert_not_called()
+    app.database.notify_changed.assert_not_awaited()
+
+
+async def test_other_database_errors_are_raised():
+    app = MagicMock()
+    session = app.database.session.__aenter__.return_value
+    session.execute = AsyncMock(
+        side_effect=DBAPIError(
+            "UPDATE games", None, MagicMock(sqlstate="57014")
+        )
+    )
+    accessor = GameAccessor(app)
+
+    with pytest.raises(DBAPIError):
+        await accessor.settle_game(1, totals={})
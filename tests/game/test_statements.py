@@ -0,0 +1,35 @@
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from app.store.database import GameModel
+
+# isort: split
+from app.game.accessor import GAME_BY_ID, GameAccessor
+
+
+def test_game_by_id_binds_the_id():
+    sql = str(GAME_BY_ID.compile(dialect=postgresql.dialect()))
+
+    assert "games.id = %(game_id)s" in sql
+
+
+async def test_game_by_id_reuses_one_statement():
+    app = MagicMock()
+    session = app.database.session.__aenter__.return_value
+    game = GameModel(id=1)
+    found, missing = MagicMock(), MagicMock()
+    found.first.return_value = (game,)
+    missing.first.return_value = None
+    session.execute = AsyncMock(side_effect=[found, missing])
+    accessor = GameAccessor(app)
+
+    assert await accessor.get_game_by_id(1) is game
+    assert await accessor.get_game_by_id(2) is None
+
+    # Меняются только параметры: запрос тот же, и кэш компиляции
+    # SQLAlchemy и подготовленный запрос asyncpg переиспользуются.
+    [first, second] = session.execute.await_args_list
+    assert first.args == (GAME_BY_ID, {"game_id": 1})
+    assert second.args[0] is first.args[0]
+    assert second.args[1] == {"game_id": 2}
@@ -0,0 +1,102 @@
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.stats.accessor import StatsAccessor
+
+
+class FakeSession:
+    """Записывает запросы, скомпилированные для PostgreSQL."""
+
+    def __init__(self, progress=None, ids=(1, 5)) -> None:
+        self.progress = progress
+        self.ids = ids
+        self.executed: list[str] = []
+        self.commits: list[int] = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        self.executed.append(sql)
+        result = MagicMock()
+        result.one_or_none.return_value = self.progress
+        result.one.return_value = self.ids
+        result.scalar_one.return_value = 2
+        return result
+
+    async def commit(self) -> None:
+        self.commits.append(len(self.executed))
+
+
+def make_stats(session: FakeSession) -> StatsAccessor:
+    app = MagicMock()
+    app.database.session.__aenter__.return_value = session
+    return StatsAccessor(app)
+
+
+async def record(stats: StatsAccessor, session: FakeSession, game_id: int):
+    await stats.record_game(
+        session,
+        game_id=game_id,
+        chat_id=1,
+        question_id=2,
+        created_at=datetime(2026, 1, 1, tzinfo=UTC),
+        ended_at=datetime(2026, 1, 1, 0, 5, tzinfo=UTC),
+        winner_id=3,
+        turns=4,
+        user_ids=[3, 4],
+    )
+
+
+@pytest.mark.parametrize(
+    ("game_id", "staged"),
+    [(5, True), (10, False), (25, False), (31, True)],
+)
+async def test_game_settled_during_rebuild_is_counted_once(game_id, staged):
+    progress = SimpleNamespace(running=True, processed_upto=10, high_id=30)
+    session = FakeSession(progress)
+
+    await record(make_stats(session), session, game_id)
+
+    assert "FOR SHARE" in session.executed[0]
+    inserts = [sql for sql in session.executed if sql.startswith("INSERT")]
+    staging = [sql for sql in inserts if "_rebuild " in sql]
+    assert len(inserts) == (8 if staged else 4)
+    assert len(staging) == (4 if staged else 0)
+
+
+async def test_rebuild_fills_staging_and_swaps_in_one_transaction():
+    session = FakeSession(ids=(1, 5))
+    stats = make_stats(session)
+
+    counted = await stats.rebuild(batch_size=3)
+
+    assert counted == 4
+    sql = session.executed
+    first, second, third = session.commits[:3]
+    # До подмены запись идёт только в таблицы *_rebuild.
+    written = {
+        statement.split()[2]
+        for statement in sql[:third]
+        if statement.startswith(("INSERT", "DELETE"))
+    }
+    assert written
+    assert all(table.endswith("_rebuild") for table in written)
+    assert "SET running=%(running)s" in sql[first - 1]
+    for start, stop in ((first, second), (second, third)):
+        batch = sql[start:stop]
+        assert batch[0].endswith("FOR UPDATE")
+        assert "all_games.turns > %(turns_1)s" in batch[1]
+        assert "SET processed_upto=%(processed_upto)s" in batch[-1]
+    swap = sql[third:]
+    assert len(session.commits) == 4
+    assert swap[0].endswith("FOR UPDATE")
+    assert "DELETE FROM user_stats" in swap
+    assert (
+        "INSERT INTO user_stats (user_id, games, games_won) "
+        "SELECT user_stats_rebuild.user_id, user_stats_rebuild.games, "
+        "user_stats_rebuild.games_won \nFROM user_stats_rebuild"
+    ) in swap
+    assert "SET running=%(running)s" in swap[-1]
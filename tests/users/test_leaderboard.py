@@ -0,0 +1,38 @@
+from app.users.leaderboard import Leaderboard, LeaderboardEntry
+
+
+def make_leaderboard() -> Leaderboard:
+    leaderboard = Leaderboard()
+    leaderboard.load(
+        [
+            (1, "alice", 3, 900),
+            (2, "bob", 5, 100),
+            (3, "carol", 3, 900),
+            (4, "dave", 0, 0),
+        ]
+    )
+    return leaderboard
+
+
+def test_rank_orders_by_score_then_points():
+    leaderboard = make_leaderboard()
+
+    assert leaderboard.rank(2) == 1
+    assert leaderboard.rank(1) == 2
+    assert leaderboard.rank(3) == 2
+    assert leaderboard.rank(4) == 4
+    assert len(leaderboard) == 3
+
+
+def test_update_moves_player():
+    leaderboard = make_leaderboard()
+
+    leaderboard.update(4, "dave", 6, 10)
+    leaderboard.update(2, "bob", 0, 0)
+
+    assert leaderboard.rank(4) == 1
+    assert leaderboard.rank(2) == 4
+    assert leaderboard.top(2) == [
+        LeaderboardEntry(1, 4, "dave", 6, 10),
+        LeaderboardEntry(2, 1, "alice", 3, 900),
+    ]